@@ -0,0 +1,217 @@
+import time
+import asyncio
+
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class _RequestFrames:
+    def __init__(self):
+        self.frames: Deque[Tuple[Any, int]] = deque()
+        self.size: int = 0
+
+        self.created_at: float = time.monotonic()
+        self.event: Optional[asyncio.Event] = None
+
+        # Item that is returned after all the frames (error or None), see FrameBuffer.close()
+        self.closed: bool = False
+        self.close_item: Any = None
+
+    def push(self, frame: Any, size: int) -> None:
+        self.frames.append((frame, size))
+        self.size += size
+
+        if self.event is not None:
+            self.event.set()
+
+    def pop_oldest(self) -> int:
+        _, size = self.frames.popleft()
+        self.size -= size
+        return size
+
+
+class FrameBuffer:
+    def __init__(
+        self,
+        max_request_frames: int = 512,
+        max_request_bytes: int = 4 * 1024 * 1024,
+        max_total_frames: int = 8192,
+        max_total_bytes: int = 32 * 1024 * 1024,
+        orphan_ttl: float = 10.0,
+    ):
+        self.max_request_frames = max_request_frames
+        self.max_request_bytes = max_request_bytes
+        self.max_total_frames = max_total_frames
+        self.max_total_bytes = max_total_bytes
+        self.orphan_ttl = orphan_ttl
+
+        # Buffers of requests somebody is waiting on
+        self.__requests: Dict[str, _RequestFrames] = {}
+
+        # Frames whose request_id nobody is waiting on (yet), oldest first
+        self.__orphans: OrderedDict[str, _RequestFrames] = OrderedDict()
+
+        self.__total_frames = 0
+        self.__total_bytes = 0
+
+        self.dropped_frames = 0
+        self.dropped_bytes = 0
+        self.evicted_orphans = 0
+
+    def __len__(self) -> int:
+        return len(self.__requests)
+
+    def is_registered(self, request_key: str) -> bool:
+        return request_key in self.__requests
+
+    def register(self, request_key: str) -> None:
+        previous = self.__requests.pop(request_key, None)
+        if previous is not None:
+            self.__forget(previous)
+
+        # Frames that arrived before anybody asked for them (unless they are too old already)
+        self.__evict_expired_orphans()
+
+        buffer = self.__orphans.pop(request_key, None) or _RequestFrames()
+        self.__requests[request_key] = buffer
+
+    def unregister(self, request_key: str) -> None:
+        buffer = self.__requests.pop(request_key, None)
+
+        if buffer is not None:
+            self.__forget(buffer)
+
+    def put(self, request_key: str, frame: Any, size: int) -> bool:
+        self.__evict_expired_orphans()
+
+        buffer = self.__requests.get(request_key, None)
+
+        if buffer is None:
+            if self.orphan_ttl <= 0:
+                self.__drop(size)
+                return False
+
+            buffer = self.__orphans.get(request_key, None)
+
+            if buffer is None:
+                buffer = _RequestFrames()
+                self.__orphans[request_key] = buffer
+
+        # Per-request limits: the oldest frames go first
+        while buffer.frames and (
+            len(buffer.frames) >= self.max_request_frames or buffer.size + size > self.max_request_bytes
+        ):
+            self.__drop(buffer.pop_oldest(), buffered=True)
+
+        # Global limits: orphans go first, then the oldest frames of this request
+        while self.__total_frames >= self.max_total_frames or self.__total_bytes + size > self.max_total_bytes:
+            if self.__orphans and self.__evict_oldest_orphan(keep=buffer):
+                continue
+
+            if buffer.frames:
+                self.__drop(buffer.pop_oldest(), buffered=True)
+                continue
+
+            break
+
+        if size > self.max_request_bytes or size > self.max_total_bytes:
+            self.__drop(size)
+            return False
+
+        buffer.push(frame, size)
+
+        self.__total_frames += 1
+        self.__total_bytes += size
+
+        return True
+
+    def close(self, item: Any = None) -> None:
+        for buffer in self.__requests.values():
+            buffer.closed = True
+            buffer.close_item = item
+
+            if buffer.event is not None:
+                buffer.event.set()
+
+    async def get(self, request_key: str) -> Any:
+        buffer = self.__requests.get(request_key, None)
+        if buffer is None:
+            raise KeyError(request_key)
+
+        while not buffer.frames:
+            if buffer.closed:
+                buffer.closed = False
+                return buffer.close_item
+
+            if buffer.event is None:
+                buffer.event = asyncio.Event()
+
+            buffer.event.clear()
+            await buffer.event.wait()
+
+        frame, size = buffer.frames.popleft()
+        buffer.size -= size
+
+        self.__total_frames -= 1
+        self.__total_bytes -= size
+
+        return frame
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "requests": len(self.__requests),
+            "orphans": len(self.__orphans),
+            "buffered_frames": self.__total_frames,
+            "buffered_bytes": self.__total_bytes,
+            "dropped_frames": self.dropped_frames,
+            "dropped_bytes": self.dropped_bytes,
+            "evicted_orphans": self.evicted_orphans,
+        }
+
+    def __forget(self, buffer: _RequestFrames) -> None:
+        self.__total_frames -= len(buffer.frames)
+        self.__total_bytes -= buffer.size
+
+        buffer.frames.clear()
+        buffer.size = 0
+
+    def __drop(self, size: int, buffered: bool = False) -> None:
+        if buffered:
+            self.__total_frames -= 1
+            self.__total_bytes -= size
+
+        self.dropped_frames += 1
+        self.dropped_bytes += size
+
+    def __evict_oldest_orphan(self, keep: Optional[_RequestFrames] = None) -> bool:
+        for request_key, buffer in self.__orphans.items():
+            if buffer is keep:
+                continue
+
+            del self.__orphans[request_key]
+
+            self.dropped_frames += len(buffer.frames)
+            self.dropped_bytes += buffer.size
+            self.evicted_orphans += 1
+
+            self.__forget(buffer)
+            return True
+
+        return False
+
+    def __evict_expired_orphans(self) -> None:
+        deadline = time.monotonic() - self.orphan_ttl
+
+        while self.__orphans:
+            request_key, buffer = next(iter(self.__orphans.items()))
+
+            if buffer.created_at > deadline:
+                break
+
+            del self.__orphans[request_key]
+
+            self.dropped_frames += len(buffer.frames)
+            self.dropped_bytes += buffer.size
+            self.evicted_orphans += 1
+
+            self.__forget(buffer)
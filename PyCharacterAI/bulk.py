@@ -0,0 +1,65 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterable, Iterator, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class BulkResult(Generic[T]):
+    # What a bulk method has fetched: key -> result for the keys that succeeded,
+    # and key -> exception for the ones that failed. Keys keep the order they were passed in.
+
+    def __init__(self, results: Dict[str, T], errors: Dict[str, BaseException]):
+        self.results = results
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __iter__(self) -> Iterator[Tuple[str, T]]:
+        return iter(self.results.items())
+
+    def __getitem__(self, key: str) -> T:
+        return self.results[key]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def raise_for_errors(self) -> None:
+        # Re-raises the first error, if any
+        for error in self.errors.values():
+            raise error
+
+
+# Default number of requests a bulk method has in flight at once
+DEFAULT_CONCURRENCY = 8
+
+
+async def fetch_bulk(
+    keys: Iterable[str], fetch: Callable[[str], Awaitable[T]], max_concurrency: int = DEFAULT_CONCURRENCY
+) -> BulkResult[T]:
+    # Every request still goes through the requester, so the rate limiter, retries
+    # and the response cache apply to each of them as usual
+    keys = list(dict.fromkeys(keys))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch_one(key: str) -> Any:
+        async with semaphore:
+            return await fetch(key)
+
+    outcomes = await asyncio.gather(*(fetch_one(key) for key in keys), return_exceptions=True)
+
+    results: Dict[str, T] = {}
+    errors: Dict[str, BaseException] = {}
+
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+
+        if isinstance(outcome, BaseException):
+            errors[key] = outcome
+        else:
+            results[key] = outcome
+
+    return BulkResult(results, errors)
@@ -0,0 +1,308 @@
+import time
+import asyncio
+import pickle
+import sqlite3
+import threading
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+class MemoryCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, max_entries)
+
+        # key -> (expires_at, tags, value), the least recently used first
+        self.__entries: OrderedDict[str, Tuple[float, Tuple[str, ...], Any]] = OrderedDict()
+        # tag -> keys
+        self.__tags: Dict[str, Set[str]] = {}
+
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __remove(self, key: str) -> None:
+        entry = self.__entries.pop(key, None)
+
+        if entry is None:
+            return
+
+        for tag in entry[1]:
+            keys = self.__tags.get(tag, None)
+
+            if keys is not None:
+                keys.discard(key)
+
+                if not keys:
+                    del self.__tags[tag]
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self.__entries.get(key, None)
+
+        if entry is None:
+            return None
+
+        if entry[0] <= time.time():
+            self.__remove(key)
+            return None
+
+        self.__entries.move_to_end(key)
+        return entry[2]
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        self.__remove(key)
+
+        tags = tuple(tags)
+        self.__entries[key] = (time.time() + ttl, tags, value)
+
+        for tag in tags:
+            self.__tags.setdefault(tag, set()).add(key)
+
+        while len(self.__entries) > self.max_entries:
+            self.__remove(next(iter(self.__entries)))
+            self.evicted += 1
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        removed = 0
+
+        for tag in tags:
+            for key in list(self.__tags.get(tag, ())):
+                self.__remove(key)
+                removed += 1
+
+        return removed
+
+    async def clear(self) -> None:
+        self.__entries.clear()
+        self.__tags.clear()
+
+
+class SQLiteCache:
+    # Shared by several processes (e.g. workers of the same application), so they don't have to
+    # fetch the same data each and the cache stays warm after a restart.
+    # Values are pickled: don't point it at a file that someone else can write to.
+
+    # LRU order doesn't need to be exact: the access time of an entry is written at most once
+    # per this many seconds, so most hits are plain reads that don't take the write lock
+    ACCESS_UPDATE_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        busy_timeout: float = 5.0,
+    ):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+
+        # sqlite3 is blocking, so every query goes to a thread. One connection per process is enough,
+        # concurrency between processes is handled by SQLite itself (WAL allows readers during a write).
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+
+        with self.__lock:
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=NORMAL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))"
+            )
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS tags_key ON tags (key)")
+
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return self.__connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT value, accessed_at FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            if now - row[1] >= self.ACCESS_UPDATE_INTERVAL:
+                self.__connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        return row[0]
+
+    def __set(self, key: str, value: bytes, ttl: float, tags: Tuple[str, ...]) -> None:
+        now = time.time()
+
+        with self.__lock:
+            connection = self.__connection
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now + ttl, now),
+                )
+                connection.execute("DELETE FROM tags WHERE key = ?", (key,))
+                connection.executemany(
+                    "INSERT OR IGNORE INTO tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags]
+                )
+
+                self.evicted += self.__evict(now)
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def __evict(self, now: float) -> int:
+        connection = self.__connection
+        evicted = connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+
+        count, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+        # The least recently used entries go first
+        if count > self.max_entries or size > self.max_bytes:
+            keys = []
+
+            for key, entry_size in connection.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                if count <= self.max_entries and size <= self.max_bytes:
+                    break
+
+                keys.append((key,))
+                count -= 1
+                size -= entry_size
+
+            connection.executemany("DELETE FROM entries WHERE key = ?", keys)
+            evicted += len(keys)
+
+        if evicted:
+            connection.execute("DELETE FROM tags WHERE key NOT IN (SELECT key FROM entries)")
+
+        return evicted
+
+    def __invalidate(self, tags: Tuple[str, ...]) -> int:
+        removed = 0
+
+        with self.__lock:
+            connection = self.__connection
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                for tag in tags:
+                    removed += connection.execute(
+                        "DELETE FROM entries WHERE key IN (SELECT key FROM tags WHERE tag = ?)", (tag,)
+                    ).rowcount
+                    connection.execute("DELETE FROM tags WHERE tag = ?", (tag,))
+
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        return removed
+
+    def __clear(self) -> None:
+        with self.__lock:
+            self.__connection.execute("DELETE FROM entries")
+            self.__connection.execute("DELETE FROM tags")
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await asyncio.to_thread(self.__get, key)
+        return pickle.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        await asyncio.to_thread(self.__set, key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ttl, tuple(tags))
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        return await asyncio.to_thread(self.__invalidate, tuple(tags))
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self.__clear)
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
+
+
+class ResponseCache:
+    # Endpoint -> for how many seconds its responses are considered fresh.
+    # Endpoints that are not listed here (or have TTL 0) are not cached.
+    DEFAULT_TTLS: Dict[str, float] = {
+        "character_info": 300.0,
+        "characters_by_category": 600.0,
+        "featured_characters": 600.0,
+        "voice": 600.0,
+        "voice_search": 300.0,
+        "user": 120.0,
+        # Chats and their messages change more often, and not only through this client
+        # (e.g. in the browser), so they are cached only if their TTLs are set explicitly
+        "chat": 0.0,
+        "turns": 0.0,
+    }
+
+    def __init__(self, store: Optional[Any] = None, ttls: Optional[Dict[str, float]] = None, max_entries: int = 1024):
+        self.store = store if store is not None else MemoryCache(max_entries)
+
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+
+        # Incremented on every invalidation, so a response that was requested
+        # before the invalidation is not put back into the cache after it
+        self.generation = 0
+
+        self.__stats: Dict[str, Dict[str, int]] = {}
+
+    def __get_endpoint_stats(self, endpoint: str) -> Dict[str, int]:
+        stats = self.__stats.get(endpoint, None)
+
+        if stats is None:
+            stats = {"hits": 0, "misses": 0}
+            self.__stats[endpoint] = stats
+
+        return stats
+
+    def is_cacheable(self, endpoint: Optional[str]) -> bool:
+        return bool(endpoint) and bool(self.ttls.get(str(endpoint), 0))
+
+    async def get(self, endpoint: str, key: str) -> Optional[Any]:
+        value = await self.store.get(key)
+        self.__get_endpoint_stats(endpoint)["hits" if value is not None else "misses"] += 1
+
+        return value
+
+    async def set(
+        self, endpoint: str, key: str, value: Any, tags: Iterable[str] = (), generation: Optional[int] = None
+    ) -> None:
+        if generation is not None and generation != self.generation:
+            return
+
+        ttl = self.ttls.get(endpoint, 0)
+
+        if ttl:
+            await self.store.set(key, value, ttl, tags)
+
+    async def invalidate(self, *tags: str) -> int:
+        self.generation += 1
+        return await self.store.invalidate(tags)
+
+    async def clear(self) -> None:
+        self.generation += 1
+        await self.store.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "endpoints": {endpoint: dict(values) for endpoint, values in self.__stats.items()},
+            "entries": len(self.store),
+            "evicted": getattr(self.store, "evicted", 0),
+        }
@@ -78,6 +78,34 @@ class AsyncClient(BaseClient):
 
         self.set_account_id(str((await self.account.fetch_me()).account_id))
 
+        if kwargs.get("warmup", False):
+            await self.warmup()
+
+    async def warmup(self) -> None:
+        # Opens websocket connection(s) in advance,
+        # so the first message doesn't have to wait for the handshake
+        await self.__requester.ws_warmup_async(token=str(self.get_token()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        requester = self.__requester
+
+        return {
+            # how many requests are waiting for a response on each websocket connection
+            "ws_in_flight": requester.get_ws_in_flight_counts(),
+            "ws_buffers": requester.get_ws_buffer_stats(),
+            "rate_limit": requester.get_rate_limit_stats(),
+            "hedging": requester.get_hedge_stats(),
+            "coalescing": requester.get_coalesce_stats(),
+            # None if the cache is disabled
+            "cache": requester.get_cache_stats(),
+        }
+
+    async def invalidate_cache(self, *tags: str) -> None:
+        await self.__requester.invalidate_cache(*tags)
+
+    async def clear_cache(self) -> None:
+        await self.__requester.clear_cache()
+
     async def close_session(self) -> None:
         await self.__requester.ws_close_async()
         await self.__requester.close_session()
@@ -85,8 +113,9 @@ class AsyncClient(BaseClient):
 
 async def get_client(token: str, **kwargs: Any) -> AsyncClient:
     web_next_auth: str = str(kwargs.pop("web_next_auth", ""))
+    warmup: bool = bool(kwargs.pop("warmup", False))
 
     client = AsyncClient(**kwargs)
-    await client.authenticate(token=token, web_next_auth=web_next_auth)
+    await client.authenticate(token=token, web_next_auth=web_next_auth, warmup=warmup)
 
     return client
@@ -0,0 +1,140 @@
+import re
+import json
+
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, List, Optional
+
+# Websocket commands with the same layout every time. The constant parts of a command are serialized
+# once, when the module is imported, and only the variable fields are encoded for every message.
+# The result is exactly what json.dumps(message, separators=(",", ":")) gives for the same dict.
+
+_FIELD_RE = re.compile(r'"@@(\w+)@@"')
+
+# All of them are always 0
+_PREVIOUS_ANNOTATIONS = {
+    name: 0
+    for name in [
+        "bad_memory",
+        "boring",
+        "ends_chat_early",
+        "funny",
+        "helpful",
+        "inaccurate",
+        "interesting",
+        "long",
+        "not_bad_memory",
+        "not_boring",
+        "not_ends_chat_early",
+        "not_funny",
+        "not_helpful",
+        "not_inaccurate",
+        "not_interesting",
+        "not_long",
+        "not_out_of_character",
+        "not_repetitive",
+        "not_short",
+        "out_of_character",
+        "repetitive",
+        "short",
+    ]
+}
+
+
+def _field(name: str) -> str:
+    return f"@@{name}@@"
+
+
+def _encode(value: Any) -> str:
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+
+    return json.dumps(value, separators=(",", ":"))
+
+
+class WSCommand:
+    # A serialized command, plus what the requester needs to know about it without parsing it back
+    __slots__ = ("command", "request_id", "chat_id", "data")
+
+    def __init__(self, command: str, request_id: str, chat_id: Optional[str], data: str):
+        self.command = command
+        self.request_id = request_id
+        self.chat_id = chat_id
+        self.data = data
+
+    def to_dict(self) -> Dict:
+        return json.loads(self.data)
+
+
+class CommandTemplate:
+    def __init__(self, command: str, payload: Dict):
+        self.command = command
+
+        message = {"command": command, "origin_id": "web-next", "payload": payload, "request_id": _field("request_id")}
+        parts = _FIELD_RE.split(json.dumps(message, separators=(",", ":")))
+
+        # Constant chunks with the variable fields between them
+        self.__chunks: List[str] = parts[0::2]
+        self.__fields: List[str] = parts[1::2]
+
+    def render(self, request_id: str, chat_id: Optional[str] = None, **values: Any) -> WSCommand:
+        values["request_id"] = request_id
+
+        if chat_id is not None:
+            values["chat_id"] = chat_id
+
+        chunks = self.__chunks
+        data = [chunks[0]]
+
+        for index, field in enumerate(self.__fields):
+            data.append(_encode(values[field]))
+            data.append(chunks[index + 1])
+
+        return WSCommand(self.command, request_id, chat_id, "".join(data))
+
+
+CREATE_AND_GENERATE_TURN = CommandTemplate(
+    "create_and_generate_turn",
+    {
+        "character_id": _field("character_id"),
+        "num_candidates": 1,
+        "previous_annotations": _PREVIOUS_ANNOTATIONS,
+        "selected_language": "",
+        "tts_enabled": False,
+        "turn": {
+            "author": {
+                "author_id": _field("author_id"),
+                "is_human": True,
+                "name": "",
+            },
+            "candidates": [{"candidate_id": _field("candidate_id"), "raw_content": _field("text")}],
+            "primary_candidate_id": _field("candidate_id"),
+            "turn_key": {"chat_id": _field("chat_id"), "turn_id": _field("turn_id")},
+        },
+        "user_name": "",
+    },
+)
+
+GENERATE_TURN_CANDIDATE = CommandTemplate(
+    "generate_turn_candidate",
+    {
+        "character_id": _field("character_id"),
+        "previous_annotations": _PREVIOUS_ANNOTATIONS,
+        "selected_language": "",
+        "tts_enabled": False,
+        "turn_key": {"chat_id": _field("chat_id"), "turn_id": _field("turn_id")},
+        "user_name": "",
+    },
+)
+
+SET_TURN_PIN = CommandTemplate(
+    "set_turn_pin",
+    {
+        "is_pinned": _field("is_pinned"),
+        "turn_key": {"chat_id": _field("chat_id"), "turn_id": _field("turn_id")},
+    },
+)
+
+REMOVE_TURNS = CommandTemplate(
+    "remove_turns",
+    {"chat_id": _field("chat_id"), "turn_ids": _field("turn_ids")},
+)
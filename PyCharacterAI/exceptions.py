@@ -13,6 +13,9 @@ class WebsocketError(RequestError): ...
 class SessionClosedError(RequestError): ...
 
 
+class DeadlineExceededError(RequestError): ...
+
+
 class ServerError(PyCAIError): ...
 
 
@@ -0,0 +1,194 @@
+import os
+import gzip
+import json
+
+from typing import Any, Dict, List, Optional
+
+from .exceptions import InvalidArgumentError
+
+# Parquet export needs pyarrow (pip install PyCharacterAI[parquet])
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FORMATS = {"jsonl": ".jsonl", "jsonl.gz": ".jsonl.gz", "parquet": ".parquet"}
+
+
+class JSONLExporter:
+    # Writes turns to a JSONL file page by page. After every page the file is flushed and
+    # a checkpoint (next_token and the size of the complete part) is saved next to it,
+    # so an interrupted export continues from the last complete page.
+    # Compressed files consist of one gzip member per page, which gzip reads as a single stream.
+
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path
+        self.compress = compress
+
+        self.checkpoint_path = path + ".checkpoint"
+        self.turns = 0
+
+        self.__file: Optional[Any] = None
+
+    def open(self) -> Optional[str]:
+        # Returns the next_token to continue from (None to start from the newest page)
+        checkpoint = None
+
+        if os.path.exists(self.checkpoint_path) and os.path.exists(self.path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as file:
+                checkpoint = json.load(file)
+
+        if checkpoint is None:
+            self.__file = open(self.path, "wb")
+            return None
+
+        self.__file = open(self.path, "r+b")
+
+        # Drop the page that was being written when the export was interrupted
+        self.__file.truncate(checkpoint["offset"])
+        self.__file.seek(0, os.SEEK_END)
+
+        self.turns = checkpoint["turns"]
+        return checkpoint["next_token"]
+
+    def write_page(self, raw_turns: List[Dict], next_token: Optional[str]) -> None:
+        data = "".join(json.dumps(raw_turn, ensure_ascii=False) + "\n" for raw_turn in raw_turns).encode("utf-8")
+
+        if self.compress:
+            data = gzip.compress(data)
+
+        self.__file.write(data)
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+        self.turns += len(raw_turns)
+
+        if next_token:
+            self.__save_checkpoint(next_token)
+
+    def __save_checkpoint(self, next_token: str) -> None:
+        temp_path = self.checkpoint_path + ".tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"next_token": next_token, "offset": self.__file.tell(), "turns": self.turns}, file)
+
+        os.replace(temp_path, self.checkpoint_path)
+
+    def close(self, complete: bool) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+        if complete and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+class ParquetExporter:
+    # Writes the main fields of turns as columns, plus the raw turn as JSON.
+    # Rows are buffered into row groups of row_group_size rows, so memory stays bounded.
+    # A Parquet file cannot be appended to, so an interrupted export starts over;
+    # the file is written under a temporary name and renamed when complete.
+
+    def __init__(self, path: str, row_group_size: int = 10000):
+        if pyarrow is None:
+            raise ImportError("Parquet export requires pyarrow: pip install PyCharacterAI[parquet]")
+
+        self.path = path
+        self.row_group_size = row_group_size
+
+        self.turns = 0
+
+        self.__temp_path = path + ".part"
+        self.__writer: Optional[Any] = None
+        self.__rows: List[Dict] = []
+
+    @staticmethod
+    def __get_schema() -> Any:
+        return pyarrow.schema(
+            [
+                ("chat_id", pyarrow.string()),
+                ("turn_id", pyarrow.string()),
+                ("create_time", pyarrow.string()),
+                ("last_update_time", pyarrow.string()),
+                ("author_id", pyarrow.string()),
+                ("author_name", pyarrow.string()),
+                ("is_human", pyarrow.bool_()),
+                ("is_pinned", pyarrow.bool_()),
+                ("primary_candidate_id", pyarrow.string()),
+                ("text", pyarrow.string()),
+                ("raw", pyarrow.string()),
+            ]
+        )
+
+    @staticmethod
+    def __get_row(raw_turn: Dict) -> Dict:
+        turn_key = raw_turn.get("turn_key", {})
+        author = raw_turn.get("author", {})
+        primary_candidate_id = raw_turn.get("primary_candidate_id", None)
+
+        text = None
+        for candidate in raw_turn.get("candidates", []):
+            if candidate.get("candidate_id", None) == primary_candidate_id:
+                text = candidate.get("raw_content", None)
+                break
+
+        return {
+            "chat_id": turn_key.get("chat_id", None),
+            "turn_id": turn_key.get("turn_id", None),
+            "create_time": raw_turn.get("create_time", None),
+            "last_update_time": raw_turn.get("last_update_time", None),
+            "author_id": author.get("author_id", None),
+            "author_name": author.get("name", None),
+            "is_human": author.get("is_human", False),
+            "is_pinned": raw_turn.get("is_pinned", False),
+            "primary_candidate_id": primary_candidate_id,
+            "text": text,
+            "raw": json.dumps(raw_turn, ensure_ascii=False),
+        }
+
+    def open(self) -> Optional[str]:
+        self.__writer = pyarrow.parquet.ParquetWriter(self.__temp_path, self.__get_schema(), compression="zstd")
+        return None
+
+    def __flush(self) -> None:
+        if self.__rows:
+            self.__writer.write_table(pyarrow.Table.from_pylist(self.__rows, schema=self.__get_schema()))
+            self.__rows = []
+
+    def write_page(self, raw_turns: List[Dict], next_token: Optional[str]) -> None:
+        self.__rows.extend(self.__get_row(raw_turn) for raw_turn in raw_turns)
+        self.turns += len(raw_turns)
+
+        if len(self.__rows) >= self.row_group_size:
+            self.__flush()
+
+    def close(self, complete: bool) -> None:
+        if self.__writer is None:
+            return
+
+        if complete:
+            self.__flush()
+
+        self.__writer.close()
+        self.__writer = None
+        self.__rows = []
+
+        if complete:
+            os.replace(self.__temp_path, self.path)
+        else:
+            os.remove(self.__temp_path)
+
+
+def get_exporter(path: str, export_format: str) -> Any:
+    if export_format == "jsonl":
+        return JSONLExporter(path)
+
+    if export_format == "jsonl.gz":
+        return JSONLExporter(path, compress=True)
+
+    if export_format == "parquet":
+        return ParquetExporter(path)
+
+    raise InvalidArgumentError(f"Unknown export format: {export_format}. Available formats: {', '.join(FORMATS)}.")
@@ -0,0 +1,104 @@
+import asyncio
+
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    def __init__(self, percentile: float = 0.95, window: int = 256, min_samples: int = 20):
+        self.percentile = min(max(percentile, 0.0), 1.0)
+        self.window = window
+        self.min_samples = min_samples
+
+        # host -> latest latencies (in seconds)
+        self.__samples: Dict[str, Deque[float]] = {}
+
+    def add(self, host: str, latency: float) -> None:
+        samples = self.__samples.get(host, None)
+
+        if samples is None:
+            samples = deque(maxlen=self.window)
+            self.__samples[host] = samples
+
+        samples.append(latency)
+
+    def get(self, host: str) -> Optional[float]:
+        samples = self.__samples.get(host, None)
+
+        # Not enough data to say what a "slow" request is
+        if not samples or len(samples) < self.min_samples:
+            return None
+
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+
+    def get_delay(self, host: str, default: float, min_delay: float, max_delay: float) -> float:
+        delay = self.get(host)
+
+        if delay is None:
+            delay = default
+
+        return min(max(delay, min_delay), max_delay)
+
+
+class HedgeStats:
+    def __init__(self):
+        self.requests = 0
+        self.hedged = 0
+        # How many times the second request answered first
+        self.hedge_won = 0
+
+    def get_dict(self) -> Dict[str, int]:
+        return {"requests": self.requests, "hedged": self.hedged, "hedge_won": self.hedge_won}
+
+
+async def send_hedged(
+    send: Callable[[], Awaitable[T]],
+    delay: float,
+    stats: Optional[HedgeStats] = None,
+    send_hedge: Optional[Callable[[], Awaitable[T]]] = None,
+) -> T:
+    # Sends a request, and if there is no answer within `delay` seconds,
+    # sends an identical one (with `send_hedge`, if it's given). The first answer wins, the other request is cancelled.
+    tasks = [asyncio.ensure_future(send())]
+
+    if stats is not None:
+        stats.requests += 1
+
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+
+        if not done:
+            tasks.append(asyncio.ensure_future((send_hedge or send)()))
+
+            if stats is not None:
+                stats.hedged += 1
+
+        pending = set(tasks)
+
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                error = task.exception()
+
+                if error is None:
+                    if stats is not None and len(tasks) > 1 and task is tasks[1]:
+                        stats.hedge_won += 1
+
+                    return task.result()
+
+                # Both requests have failed
+                if not pending:
+                    raise error
+
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+            # The loser's error is not interesting
+            elif not task.cancelled():
+                task.exception()
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class TurnIndex:
+    # chat_id -> where its turns are in the pages of fetch_messages(): turn_id -> (page, position),
+    # plus the next_token of every page. Filled by any pagination, so fetch_following_messages()
+    # knows which pages it needs and can request them all at once instead of one after another.
+
+    def __init__(self, max_chats: int = 128):
+        self.max_chats = max(1, max_chats)
+
+        # chat_id -> (tokens of the pages, turn_id -> (page, position)), the least recently used first
+        self.__chats: OrderedDict[str, Tuple[List[Optional[str]], Dict[str, Tuple[int, int]]]] = OrderedDict()
+
+        # Incremented on every invalidation, so a page that was requested
+        # before the invalidation is not recorded after it
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self.__chats)
+
+    def record(
+        self,
+        chat_id: str,
+        token: Optional[str],
+        raw_turns: List[Dict],
+        next_token: Optional[str],
+        generation: Optional[int] = None,
+    ) -> None:
+        if generation is not None and generation != self.generation:
+            return
+
+        entry = self.__chats.get(chat_id, None)
+
+        if entry is not None:
+            tokens, positions = entry
+
+            if token is None:
+                page = 0
+            elif token in tokens:
+                page = tokens.index(token)
+            else:
+                return
+
+            # The chat has changed since the pages were indexed (e.g. in another client)
+            if page + 1 < len(tokens) and tokens[page + 1] != next_token:
+                del self.__chats[chat_id]
+                entry = None
+
+        if entry is None:
+            # Pages are numbered from the newest one, so indexing can only start from it
+            if token is not None:
+                return
+
+            tokens, positions = [None], {}
+            page = 0
+
+            self.__chats[chat_id] = (tokens, positions)
+
+            while len(self.__chats) > self.max_chats:
+                self.__chats.popitem(last=False)
+
+        self.__chats.move_to_end(chat_id)
+
+        for position, raw_turn in enumerate(raw_turns):
+            positions[raw_turn.get("turn_key", {}).get("turn_id", "")] = (page, position)
+
+        if next_token and page + 1 == len(tokens):
+            tokens.append(next_token)
+
+    def lookup(self, chat_id: str, turn_id: str) -> Optional[Tuple[List[Optional[str]], int]]:
+        # Tokens of the pages from the newest one to the page with the turn, and its position there
+        entry = self.__chats.get(chat_id, None)
+
+        if entry is None:
+            return None
+
+        tokens, positions = entry
+        location = positions.get(turn_id, None)
+
+        if location is None:
+            return None
+
+        self.__chats.move_to_end(chat_id)
+
+        page, position = location
+        return tokens[: page + 1], position
+
+    def invalidate(self, chat_id: str) -> None:
+        self.generation += 1
+        self.__chats.pop(chat_id, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.__chats.clear()
@@ -0,0 +1,42 @@
+import json
+
+from typing import Any, Union
+
+# Faster JSON parsers are used when they are installed (pip install orjson),
+# they take bytes directly, so the body doesn't have to be decoded into str first.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    # orjson.JSONDecodeError is a subclass of ValueError
+    DecodeError: tuple = (ValueError,)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+
+    DecodeError = (ValueError, msgspec.DecodeError)
+    _decoder = msgspec.json.Decoder()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return _decoder.decode(data)
+
+else:
+    BACKEND = "json"
+
+    DecodeError = (ValueError,)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
@@ -24,7 +24,10 @@ class AccountMethods:
     async def fetch_me(self, **kwargs: Any) -> Account:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -35,7 +38,10 @@ class AccountMethods:
     async def fetch_my_settings(self, **kwargs: Any) -> Dict:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/settings/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -46,7 +52,10 @@ class AccountMethods:
     async def fetch_my_followers(self, **kwargs: Any) -> List:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/followers/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -57,7 +66,10 @@ class AccountMethods:
     async def fetch_my_following(self, **kwargs: Any) -> List:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/following/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -68,7 +80,10 @@ class AccountMethods:
     async def fetch_my_persona(self, persona_id: str, **kwargs: Any) -> Persona:
         request = await self.__requester.request_async(
             url=f"https://plus.character.ai/chat/persona/?id={persona_id}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -81,7 +96,10 @@ class AccountMethods:
     async def fetch_my_personas(self, **kwargs: Any) -> List[Persona]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/personas/?force_refresh=1",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -98,7 +116,10 @@ class AccountMethods:
     async def fetch_my_characters(self, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/characters/?scope=user",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -115,7 +136,10 @@ class AccountMethods:
     async def fetch_my_upvoted_characters(self, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/characters/upvoted/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -132,7 +156,10 @@ class AccountMethods:
     async def fetch_my_voices(self, **kwargs: Any) -> List[Voice]:
         request = await self.__requester.request_async(
             url="https://neo.character.ai/multimodal/api/v1/voices/user",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -172,6 +199,7 @@ class AccountMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps(settings),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -220,9 +248,13 @@ class AccountMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps(new_account_info),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        # The username may have changed as well, so every cached profile goes
+        await self.__requester.invalidate_cache("users")
+
         if request.status_code == 200:
             status = request.json().get("status", "")
 
@@ -266,6 +298,7 @@ class AccountMethods:
                         "voice_id": "",
                     }
                 ),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -329,6 +362,7 @@ class AccountMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps(payload),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -374,6 +408,7 @@ class AccountMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps(payload),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -423,9 +458,12 @@ class AccountMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"voice_id": voice_id}) if voice_id else None,
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"character:{character_id}")
+
         if request.status_code == 200:
             if (request.json()).get("success", False):
                 return True
@@ -14,6 +14,7 @@ from ..exceptions import (
     InvalidArgumentError,
 )
 
+from ..bulk import DEFAULT_CONCURRENCY, BulkResult, fetch_bulk
 from ..requester import Requester
 
 
@@ -25,7 +26,12 @@ class CharacterMethods:
     async def fetch_characters_by_category(self, **kwargs: Any) -> Dict[str, List[CharacterShort]]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/curated_categories/characters/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "cache": "characters_by_category",
+                "cache_tags": ["characters"],
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -48,7 +54,10 @@ class CharacterMethods:
     async def fetch_recommended_characters(self, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url="https://neo.character.ai/recommendation/v1/user",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -65,7 +74,12 @@ class CharacterMethods:
     async def fetch_featured_characters(self, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/characters/featured_v2/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "cache": "featured_characters",
+                "cache_tags": ["characters"],
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -82,7 +96,10 @@ class CharacterMethods:
     async def fetch_similar_characters(self, character_id: str, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/recommendation/v1/character/{character_id}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -103,12 +120,19 @@ class CharacterMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"external_id": character_id}),
+                "idempotent": True,
+                "cache": "character_info",
+                "cache_tags": [f"character:{character_id}"],
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
         if request.status_code == 200:
             response = request.json()
             if response.get("status", "") == "NOT_OK":
+                # Errors are not worth remembering
+                await self.__requester.invalidate_cache(f"character:{character_id}")
+
                 error = response.get("error", "")
                 raise FetchError(f"Cannot fetch character information. {error}")
 
@@ -116,6 +140,13 @@ class CharacterMethods:
 
         raise FetchError("Cannot fetch character information.")
 
+    async def fetch_characters_info(
+        self, character_ids: List[str], max_concurrency: int = DEFAULT_CONCURRENCY, **kwargs: Any
+    ) -> BulkResult[Character]:
+        return await fetch_bulk(
+            character_ids, lambda character_id: self.fetch_character_info(character_id, **kwargs), max_concurrency
+        )
+
     async def search_characters(self, character_name: str, **kwargs: Any) -> List[CharacterShort]:
         payload = {
             '0': {
@@ -128,7 +159,10 @@ class CharacterMethods:
         request = await self.__requester.request_async(
             url=f"https://character.ai/api/trpc/search.search?batch=1"
                 f"&input={json.dumps(payload, separators=(',', ':'))}",
-            options={"headers": self.__client.get_headers(authorization=False)},
+            options={
+                "headers": self.__client.get_headers(authorization=False),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
         
         if request.status_code == 200:
@@ -149,7 +183,10 @@ class CharacterMethods:
         request = await self.__requester.request_async(
             url=f"https://character.ai/api/trpc/search.searchCreators?batch=1"
                 f"&input={json.dumps(payload, separators=(',', ':'))}",
-            options={"headers": self.__client.get_headers(authorization=False)},
+            options={
+                "headers": self.__client.get_headers(authorization=False),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -165,9 +202,12 @@ class CharacterMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"external_id": character_id, "vote": vote}),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"character:{character_id}")
+
         if request.status_code == 200:
             return (request.json()).get("status", None) == "OK"
 
@@ -235,6 +275,7 @@ class CharacterMethods:
                         "voice_id": "",
                     }
                 ),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -309,9 +350,12 @@ class CharacterMethods:
                         "voice_id": "",
                     }
                 ),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"character:{character_id}", "characters")
+
         if request.status_code == 200:
             response = request.json()
             if response.get("status", None) == "OK" and response.get("character", None) is not None:
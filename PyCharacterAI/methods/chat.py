@@ -1,10 +1,14 @@
+import os
+import time
 import uuid
 import json
+import asyncio
 
-from typing import Optional, List, Tuple, AsyncGenerator, Any, Union
+from contextlib import aclosing
+from typing import Optional, List, Tuple, AsyncGenerator, Any, Union, Dict, Callable, overload
 from urllib.parse import quote
 
-from ..types import Chat, ChatHistory, Turn
+from ..types import Chat, ChatHistory, Turn, TurnBatch, TurnDelta
 from ..exceptions import (
     FetchError,
     EditError,
@@ -13,9 +17,15 @@ from ..exceptions import (
     ActionError,
     DeleteError,
     SessionClosedError,
+    InvalidArgumentError,
 )
 
+from .. import commands
+from ..bulk import DEFAULT_CONCURRENCY, BulkResult, fetch_bulk
+from ..export import FORMATS, get_exporter
+from ..index import TurnIndex
 from ..requester import Requester
+from ..store import SyncState, TurnChange, TurnStore
 
 
 class ChatMethods:
@@ -23,6 +33,12 @@ class ChatMethods:
         self.__client = client
         self.__requester = requester
 
+        # Set once the chats endpoint has rejected several character ids in one request
+        self.__multi_id_unsupported = False
+
+        # Where the turns of recently paginated chats are, see fetch_following_messages()
+        self.__turn_index = TurnIndex()
+
     async def fetch_histories(self, character_id: str, amount: int = 50, **kwargs: Any) -> List[ChatHistory]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/character/histories/",
@@ -30,6 +46,8 @@ class ChatMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"external_id": character_id, "number": amount}),
+                "idempotent": True,
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -44,32 +62,104 @@ class ChatMethods:
 
         raise FetchError("Cannot fetch histories.")
 
-    async def fetch_chats(self, character_id: str, **kwargs: Any) -> List[Chat]:
+    # Statuses that mean the endpoint doesn't take several character ids in one request
+    # (as opposed to a temporary failure, which is raised as is)
+    MULTI_ID_UNSUPPORTED_STATUS_CODES = (400, 422)
+
+    async def __fetch_raw_chats(self, character_ids: List[str], **kwargs: Any) -> Optional[List[Dict]]:
         num_preview_turns: int = kwargs.get("num_preview_turns", 2)
+        url = (
+            f"https://neo.character.ai/chats/?character_ids={quote(','.join(character_ids), safe=',')}"
+            f"&num_preview_turns={num_preview_turns}"
+        )
 
         request = await self.__requester.request_async(
-            url=f"https://neo.character.ai/chats/?character_ids={character_id}&num_preview_turns={num_preview_turns}",
+            url=url,
             options={
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
         if request.status_code == 200:
-            raw_chats = request.json().get("chats", [])
-            chats = []
+            return request.json().get("chats", [])
+
+        # None: several ids were rejected, they have to be requested one by one
+        if len(character_ids) > 1 and request.status_code in self.MULTI_ID_UNSUPPORTED_STATUS_CODES:
+            return None
 
+        raise FetchError("Cannot fetch chats.")
+
+    @overload
+    async def fetch_chats(self, character_id: str, **kwargs: Any) -> List[Chat]: ...
+
+    @overload
+    async def fetch_chats(
+        self,
+        character_id: List[str],
+        batch_size: int = 1,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs: Any,
+    ) -> Dict[str, List[Chat]]: ...
+
+    async def fetch_chats(
+        self,
+        character_id: Union[str, List[str]],
+        batch_size: int = 1,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        **kwargs: Any,
+    ) -> Union[List[Chat], Dict[str, List[Chat]]]:
+        if isinstance(character_id, str):
+            return [Chat(raw_chat) for raw_chat in await self.__fetch_raw_chats([character_id], **kwargs) or []]
+
+        # Several characters: character id -> chats.
+        # By default, every character gets its own request and the requests are made concurrently.
+        # batch_size > 1 packs several ids into one request: it's not documented whether
+        # the endpoint answers for all of them, so it's up to the caller to enable it.
+        character_ids = list(dict.fromkeys(character_id))
+        chats: Dict[str, List[Chat]] = {character_id: [] for character_id in character_ids}
+
+        if self.__multi_id_unsupported:
+            batch_size = 1
+
+        batch_size = max(1, batch_size)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def fetch_chunk(chunk: List[str]) -> List[Dict]:
+            async with semaphore:
+                raw_chats = await self.__fetch_raw_chats(chunk, **kwargs)
+
+            if raw_chats is not None:
+                return raw_chats
+
+            # The endpoint has rejected several ids: a request per character from now on
+            self.__multi_id_unsupported = True
+
+            return [
+                raw_chat
+                for raw_chunk in await asyncio.gather(*(fetch_chunk([character_id]) for character_id in chunk))
+                for raw_chat in raw_chunk
+            ]
+
+        chunks = [character_ids[index : index + batch_size] for index in range(0, len(character_ids), batch_size)]
+
+        for raw_chats in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
             for raw_chat in raw_chats:
-                chats.append(Chat(raw_chat))
+                chat = Chat(raw_chat)
 
-            return chats
+                if chat.character_id in chats:
+                    chats[chat.character_id].append(chat)
 
-        raise FetchError("Cannot fetch chats.")
+        return chats
 
-    async def fetch_chat(self, chat_id: str, **kwargs: Any) -> Chat:
+    async def __fetch_raw_chat(self, chat_id: str, use_cache: bool = True, **kwargs: Any) -> Dict:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/chat/{chat_id}/",
             options={
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "cache": "chat" if use_cache else None,
+                "cache_tags": [f"chat:{chat_id}"],
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -77,14 +167,25 @@ class ChatMethods:
             response = request.json()
             raw_chat = response.get("chat", None)
             if raw_chat:
-                return Chat(raw_chat)
+                return raw_chat
 
         raise FetchError("Cannot fetch chat.")
 
+    async def fetch_chat(self, chat_id: str, **kwargs: Any) -> Chat:
+        return Chat(await self.__fetch_raw_chat(chat_id, **kwargs))
+
+    async def fetch_chats_by_id(
+        self, chat_ids: List[str], max_concurrency: int = DEFAULT_CONCURRENCY, **kwargs: Any
+    ) -> BulkResult[Chat]:
+        return await fetch_bulk(chat_ids, lambda chat_id: self.fetch_chat(chat_id, **kwargs), max_concurrency)
+
     async def fetch_recent_chats(self, **kwargs: Any) -> List[Chat]:
         request = await self.__requester.request_async(
             url="https://neo.character.ai/chats/recent/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -98,54 +199,209 @@ class ChatMethods:
 
         raise FetchError("Cannot fetch recent chats.")
 
-    async def fetch_messages(
-        self, chat_id, pinned_only: bool = False, next_token: Optional[str] = None, **kwargs: Any
-    ) -> Tuple[List[Turn], Optional[str]]:
+    async def __fetch_raw_messages(
+        self, chat_id, next_token: Optional[str] = None, use_cache: bool = True, **kwargs: Any
+    ) -> Tuple[List[Dict], Optional[str]]:
         url = f"https://neo.character.ai/turns/{chat_id}/"
 
         if next_token:
             url += f"?next_token={quote(next_token)}"
 
+        generation = self.__turn_index.generation
         request = await self.__requester.request_async(
             url=url,
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "cache": "turns" if use_cache else None,
+                "cache_tags": [f"chat:{chat_id}"],
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
-            next_token = request.json().get("meta", {}).get("next_token", None)
+            response = request.json()
+            raw_turns, new_next_token = response.get("turns", []), response.get("meta", {}).get("next_token", None)
 
-            raw_turns = request.json().get("turns", [])
-            turns = []
+            self.__turn_index.record(chat_id, next_token, raw_turns, new_next_token, generation)
+            return raw_turns, new_next_token
 
+        raise FetchError("Cannot fetch messages.")
+
+    async def fetch_messages(
+        self, chat_id, pinned_only: bool = False, next_token: Optional[str] = None, **kwargs: Any
+    ) -> Tuple[List[Turn], Optional[str]]:
+        raw_turns, next_token = await self.__fetch_raw_messages(chat_id, next_token=next_token, **kwargs)
+        turns = []
+
+        for raw_turn in raw_turns:
+            if not pinned_only:
+                turns.append(Turn(raw_turn))
+
+            elif raw_turn.get("is_pinned", False) is True:
+                turns.append(Turn(raw_turn))
+
+        return turns, next_token
+
+    async def __iter_raw_pages(
+        self, chat_id: str, next_token: Optional[str] = None, prefetch: bool = True, **kwargs: Any
+    ) -> AsyncGenerator[Tuple[List[Dict], Optional[str]], Any]:
+        # The next page is requested as soon as the current one arrives,
+        # so it is downloaded while the caller processes the current one.
+        # Not more than two pages are held in memory at once.
+        pending = asyncio.ensure_future(self.__fetch_raw_messages(chat_id, next_token=next_token, **kwargs))
+
+        try:
+            while pending is not None:
+                raw_turns, next_token = await pending
+                pending = None
+
+                if not raw_turns:
+                    break
+
+                if next_token and prefetch:
+                    pending = asyncio.ensure_future(self.__fetch_raw_messages(chat_id, next_token=next_token, **kwargs))
+
+                yield raw_turns, next_token
+
+                if next_token and not prefetch:
+                    pending = asyncio.ensure_future(self.__fetch_raw_messages(chat_id, next_token=next_token, **kwargs))
+
+        finally:
+            # The caller has stopped early
+            if pending is not None:
+                pending.cancel()
+
+                try:
+                    await pending
+                except BaseException:
+                    pass
+
+    async def iter_messages(
+        self, chat_id: str, pinned_only: bool = False, next_token: Optional[str] = None, **kwargs: Any
+    ) -> AsyncGenerator[Turn, Any]:
+        async for raw_turns, _ in self.__iter_raw_pages(chat_id, next_token=next_token, **kwargs):
             for raw_turn in raw_turns:
-                if not pinned_only:
-                    turns.append(Turn(raw_turn))
+                if not pinned_only or raw_turn.get("is_pinned", False) is True:
+                    yield Turn(raw_turn)
 
-                elif raw_turn.get("is_pinned", False) is True:
-                    turns.append(Turn(raw_turn))
+    async def fetch_all_messages(
+        self, chat_id, pinned_only: bool = False, as_batch: bool = False, **kwargs: Any
+    ) -> Union[List[Turn], TurnBatch]:
+        if as_batch:
+            return await self.__fetch_all_messages_batch(chat_id, pinned_only=pinned_only, **kwargs)
+
+        return [turn async for turn in self.iter_messages(chat_id, pinned_only=pinned_only, **kwargs)]
 
-            return turns, next_token
+    async def __fetch_all_messages_batch(self, chat_id, pinned_only: bool = False, **kwargs: Any) -> TurnBatch:
+        # Columns are filled straight from the raw pages, no Turn objects are created
+        batch = TurnBatch(chat_id, keep_raw=kwargs.get("keep_raw", False))
 
-        raise FetchError("Cannot fetch messages.")
+        async for raw_turns, _ in self.__iter_raw_pages(chat_id, **kwargs):
+            if pinned_only:
+                raw_turns = [raw_turn for raw_turn in raw_turns if raw_turn.get("is_pinned", False) is True]
 
-    async def fetch_all_messages(self, chat_id, pinned_only: bool = False, **kwargs: Any) -> List[Turn]:
-        all_turns = []
-        turns, next_token = await self.fetch_messages(chat_id, pinned_only=pinned_only, **kwargs)
+            batch.extend_raw(raw_turns)
+
+        return batch
 
-        while True:
-            if not turns:
-                break
+    async def sync_messages(
+        self, chat_id: str, store: TurnStore, full: bool = False, **kwargs: Any
+    ) -> List[TurnChange]:
+        # Brings the local copy of the chat (see TurnStore) up to date and returns what has changed.
+        # Turns are walked from the newest, and the walk stops at the first page with a turn that is
+        # already stored with the same last_update_time: everything older is already known.
+        # Older edits and deleted turns are picked up only by a full sync.
+        state = await store.get_state(chat_id)
+        changes = []
 
-            all_turns += turns
+        if full or state is None:
+            state = SyncState(chat_id, complete=False, backfill_token=None, synced_at=None)
+            seen_turn_ids = []
 
-            if not next_token:
-                break
+            async for raw_turns, next_token in self.__iter_raw_pages(chat_id, use_cache=False, **kwargs):
+                seen_turn_ids.extend(raw_turn.get("turn_key", {}).get("turn_id", "") for raw_turn in raw_turns)
 
-            turns, next_token = await self.fetch_messages(
-                chat_id, pinned_only=pinned_only, next_token=next_token, **kwargs
-            )
+                # Saved with every page, so an interrupted sync continues where it stopped
+                state.backfill_token = next_token
+                changes.extend(await store.write(chat_id, raw_turns, state))
+
+            # The walk has reached the end, even if the last next_token led to an empty page
+            state.backfill_token = None
+
+            if full:
+                changes.extend(await store.remove_missing(chat_id, seen_turn_ids))
+
+        else:
+            # Only the pages with new turns are downloaded, one at a time
+            async for raw_turns, _ in self.__iter_raw_pages(chat_id, prefetch=False, use_cache=False, **kwargs):
+                turn_ids = [raw_turn.get("turn_key", {}).get("turn_id", "") for raw_turn in raw_turns]
+                versions = await store.get_versions(chat_id, turn_ids)
+
+                changes.extend(await store.write(chat_id, raw_turns))
+
+                if any(
+                    turn_id in versions and versions[turn_id] == raw_turn.get("last_update_time", None)
+                    for turn_id, raw_turn in zip(turn_ids, raw_turns)
+                ):
+                    break
+
+            # The first sync was interrupted, the older part is still missing
+            if not state.complete and state.backfill_token:
+                async for raw_turns, next_token in self.__iter_raw_pages(
+                    chat_id, next_token=state.backfill_token, use_cache=False, **kwargs
+                ):
+                    state.backfill_token = next_token
+                    changes.extend(await store.write(chat_id, raw_turns, state))
+
+                state.backfill_token = None
+
+        state.complete = not state.backfill_token
+        state.backfill_token = None if state.complete else state.backfill_token
+        state.synced_at = time.time()
+        await store.set_state(state)
+
+        return changes
+
+    async def export_messages(self, chat_id: str, path: str, export_format: str = "jsonl", **kwargs: Any) -> int:
+        # Pages go straight to the file, so memory doesn't grow with the history length
+        exporter = get_exporter(path, export_format)
+        next_token = await asyncio.to_thread(exporter.open)
+
+        complete = False
 
-        return all_turns
+        try:
+            async for raw_turns, next_token in self.__iter_raw_pages(
+                chat_id, next_token=next_token, use_cache=False, **kwargs
+            ):
+                await asyncio.to_thread(exporter.write_page, raw_turns, next_token)
+
+            complete = True
+
+        finally:
+            await asyncio.to_thread(exporter.close, complete)
+
+        return exporter.turns
+
+    async def export_chats(
+        self, chat_ids: List[str], directory: str, export_format: str = "jsonl", max_concurrency: int = 4, **kwargs: Any
+    ) -> Dict[str, Union[int, Exception]]:
+        # Every chat goes to {directory}/{chat_id}.{format}, not more than max_concurrency at once.
+        # Chat id -> number of exported turns, or the exception if the export failed
+        # (it can be continued by calling this method again).
+        if export_format not in FORMATS:
+            raise InvalidArgumentError(f"Unknown export format: {export_format}.")
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        extension = FORMATS[export_format]
+
+        async def export(chat_id: str) -> int:
+            async with semaphore:
+                return await self.export_messages(
+                    chat_id, os.path.join(directory, f"{chat_id}{extension}"), export_format, **kwargs
+                )
+
+        results = await asyncio.gather(*(export(chat_id) for chat_id in chat_ids), return_exceptions=True)
+        return dict(zip(chat_ids, results))
 
     async def fetch_pinned_messages(
         self, chat_id, next_token: Optional[str] = None, **kwargs: Any
@@ -158,26 +414,179 @@ class ChatMethods:
     async def fetch_following_messages(
         self, chat_id: str, turn_id: str, pinned_only: bool = False, **kwargs: Any
     ) -> List[Turn]:
-        following_turns = []
+        # The turn has been seen during a previous pagination: the pages up to it are requested
+        # all at once instead of one after another (they are the same pages the scan would request)
+        location = self.__turn_index.lookup(chat_id, turn_id)
 
-        turns, next_token = await self.fetch_messages(chat_id, pinned_only=pinned_only, **kwargs)
+        if location is not None:
+            tokens, position = location
 
-        while True:
-            if turns is None or len(turns) == 0:
-                raise FetchError("Cannot fetch following messages. May be turn_id is invalid?")
+            pages = await asyncio.gather(
+                *(self.__fetch_raw_messages(chat_id, next_token=token, **kwargs) for token in tokens)
+            )
+            last_page = pages[-1][0]
+
+            # Pages still follow each other and the turn is where it was
+            if (
+                all(next_token == tokens[index + 1] for index, (_, next_token) in enumerate(pages[:-1]))
+                and position < len(last_page)
+                and last_page[position].get("turn_key", {}).get("turn_id", None) == turn_id
+            ):
+                raw_turns = [raw_turn for page, _ in pages[:-1] for raw_turn in page] + last_page[:position]
+
+                return [
+                    Turn(raw_turn)
+                    for raw_turn in raw_turns
+                    if not pinned_only or raw_turn.get("is_pinned", False) is True
+                ]
+
+            self.__turn_index.invalidate(chat_id)
 
-            for turn in turns:
+        following_turns = []
+
+        # Turns go from the newest to the oldest, so everything before turn_id is newer.
+        # The scan stops as soon as the turn is found, so the next page is not prefetched.
+        async with aclosing(self.iter_messages(chat_id, pinned_only=pinned_only, prefetch=False, **kwargs)) as turns:
+            async for turn in turns:
                 if turn.turn_id == turn_id:
                     return following_turns
 
                 following_turns.append(turn)
 
-            if next_token is None:
-                raise FetchError("Cannot fetch following messages. May be turn_id is invalid?")
+        raise FetchError("Cannot fetch following messages. May be turn_id is invalid?")
+
+    @staticmethod
+    def __apply_turn_update(turn: Optional[Turn], raw_turn: Dict, incremental: bool) -> Turn:
+        # In incremental mode, the same Turn object is updated by every frame
+        # (see TurnCandidate.delta for the text added by the frame)
+        if incremental and turn is not None and turn.turn_id == raw_turn.get("turn_key", {}).get("turn_id", None):
+            turn.apply_update(raw_turn)
+            return turn
+
+        return Turn(raw_turn)
+
+    @staticmethod
+    async def __stream_deltas(
+        turns: AsyncGenerator[Turn, Any], chunk_size: int, chunk_interval: float
+    ) -> AsyncGenerator[TurnDelta, Any]:
+        # Only the text added by every frame is yielded. With chunk_size / chunk_interval, small pieces
+        # are held back until there are at least chunk_size characters, or chunk_interval seconds
+        # have passed since the first of them. The last piece has is_final=True and the complete Turn.
+        loop = asyncio.get_running_loop()
+
+        received = ""
+        buffered = ""
+        buffered_since = 0.0
+
+        turn_id = ""
+        candidate_id: Optional[str] = None
+
+        pending: Optional[asyncio.Future] = None
+
+        try:
+            while True:
+                if chunk_interval > 0:
+                    # The next frame is awaited in a task, so the buffer can be sent if it takes too long
+                    if pending is None:
+                        pending = asyncio.ensure_future(turns.__anext__())
+
+                    timeout = max(0.0, buffered_since + chunk_interval - loop.time()) if buffered else None
+                    done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+                    if not done:
+                        yield TurnDelta(turn_id, candidate_id or "", buffered)
+                        buffered = ""
+                        continue
 
-            turns, next_token = await self.fetch_messages(
-                chat_id, pinned_only=pinned_only, next_token=next_token, **kwargs
-            )
+                    next_turn, pending = pending, None
+
+                    try:
+                        turn = next_turn.result()
+                    except StopAsyncIteration:
+                        break
+
+                else:
+                    try:
+                        turn = await turns.__anext__()
+                    except StopAsyncIteration:
+                        break
+
+                candidate = turn.get_primary_candidate() or next(iter(turn.candidates.values()), None)
+
+                if candidate is None:
+                    continue
+
+                turn_id = turn.turn_id
+                text = candidate.text
+                is_rewrite = False
+
+                if candidate.candidate_id != candidate_id or not text.startswith(received):
+                    # Another candidate or the text has been rewritten, everything starts over
+                    is_rewrite = candidate_id is not None
+                    candidate_id = candidate.candidate_id
+                    buffered, piece = "", text
+                else:
+                    piece = text[len(received) :]
+
+                received = text
+
+                if candidate.is_final:
+                    yield TurnDelta(turn_id, candidate_id, buffered + piece, True, is_rewrite, turn)
+                    buffered = ""
+                    break
+
+                if is_rewrite:
+                    yield TurnDelta(turn_id, candidate_id, piece, is_rewrite=True)
+                    continue
+
+                if not piece:
+                    continue
+
+                if not buffered:
+                    buffered_since = loop.time()
+
+                buffered += piece
+
+                if (chunk_size <= 0 and chunk_interval <= 0) or (0 < chunk_size <= len(buffered)):
+                    yield TurnDelta(turn_id, candidate_id, buffered)
+                    buffered = ""
+
+            # The response has ended without a final frame
+            if buffered:
+                yield TurnDelta(turn_id, candidate_id or "", buffered)
+
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+                try:
+                    await pending
+                except BaseException:
+                    pass
+
+            await turns.aclose()
+
+    # How many times (and how often) to poll a turn when resuming
+    # a generation after the websocket connection was lost
+    RESUME_POLL_ATTEMPTS = 30
+    RESUME_POLL_INTERVAL = 1.0
+
+    async def __resume_turn(
+        self, chat_id: str, find_turn: Callable[[List[Dict]], Optional[Dict]], **kwargs: Any
+    ) -> AsyncGenerator[Dict, Any]:
+        # The command has already reached the server, so instead of sending it again
+        # (and starting a second generation) we are waiting for its result in the chat history.
+        for _ in range(self.RESUME_POLL_ATTEMPTS):
+            raw_turns, _ = await self.__fetch_raw_messages(chat_id, use_cache=False, **kwargs)
+            raw_turn = find_turn(raw_turns)
+
+            if raw_turn is not None:
+                yield {"command": "update_turn", "turn": raw_turn}
+
+                if raw_turn.get("candidates", [{}])[0].get("is_final", False):
+                    return
+
+            await asyncio.sleep(self.RESUME_POLL_INTERVAL)
 
     async def update_chat_name(self, chat_id: str, name: str, **kwargs: Any) -> bool:
         request = await self.__requester.request_async(
@@ -186,9 +595,12 @@ class ChatMethods:
                 "method": "PATCH",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"name": name}),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"chat:{chat_id}")
+
         if request.status_code == 200:
             return True
 
@@ -202,9 +614,12 @@ class ChatMethods:
                 "method": "PATCH",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": {},
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"chat:{chat_id}")
+
         if request.status_code == 200:
             return True
 
@@ -217,9 +632,12 @@ class ChatMethods:
                 "method": "PATCH",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": {},
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"chat:{chat_id}")
+
         if request.status_code == 200:
             return True
 
@@ -232,6 +650,7 @@ class ChatMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"end_turn_id": end_turn_id}),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -256,6 +675,20 @@ class ChatMethods:
         # MODEL_TYPE_FAMILY_FRIENDLY - “Goro” model
         model_type = kwargs.get("model_type")
 
+        async def resume(_: Optional[Dict]) -> AsyncGenerator[Dict, Any]:
+            try:
+                raw_chat = await self.__fetch_raw_chat(chat_id, use_cache=False, **kwargs)
+            except FetchError:
+                return
+
+            yield {"command": "create_chat_response", "chat": raw_chat}
+
+            if greeting:
+                raw_turns, _ = await self.__fetch_raw_messages(chat_id, use_cache=False, **kwargs)
+
+                if raw_turns:
+                    yield {"command": "add_turn", "turn": raw_turns[-1]}
+
         request = self.__requester.ws_send_and_receive_async(
             {
                 "command": "create_chat",
@@ -274,30 +707,35 @@ class ChatMethods:
                 },
             },
             token=self.__client.get_token(),
+            resume=resume,
+            timeout=kwargs.get("timeout", None),
         )
 
         new_chat: Optional[Chat] = None
         greeting_turn: Optional[Turn] = None
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        # Closing the request right away (instead of leaving it to the garbage collector)
+        # unregisters it and drops the cached responses of the chat
+        async with aclosing(request):
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "create_chat_response":
-                new_chat = Chat(raw_response.get("chat", None))
+                if raw_response["command"] == "create_chat_response":
+                    new_chat = Chat(raw_response.get("chat", None))
 
-                if greeting:
-                    continue
+                    if greeting:
+                        continue
 
-                break
+                    break
 
-            if raw_response["command"] == "add_turn":
-                greeting_turn = Turn(raw_response.get("turn", None))
-                break
+                if raw_response["command"] == "add_turn":
+                    greeting_turn = Turn(raw_response.get("turn", None))
+                    break
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise CreateError(f"Cannot create a new chat. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise CreateError(f"Cannot create a new chat. {error_comment}")
 
         if new_chat is None or (greeting is True and greeting_turn is None):
             raise CreateError("Cannot create a new chat.")
@@ -314,174 +752,193 @@ class ChatMethods:
             },
         }
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        request = self.__requester.ws_send_and_receive_async(
+            ws_message, token=self.__client.get_token(), timeout=kwargs.get("timeout", None)
+        )
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        async with aclosing(request):
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise UpdateError(f"Cannot update primary candidate. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise UpdateError(f"Cannot update primary candidate. {error_comment}")
 
-            if raw_response["command"] == "ok":
-                return True
+                if raw_response["command"] == "ok":
+                    return True
 
         return False
 
     async def send_message(
-        self, character_id: str, chat_id: str, text: str, streaming: bool = False, **kwargs: Any
-    ) -> Union[Turn, AsyncGenerator[Turn, Any]]:
+        self,
+        character_id: str,
+        chat_id: str,
+        text: str,
+        streaming: bool = False,
+        incremental: bool = False,
+        delta_only: bool = False,
+        chunk_size: int = 0,
+        chunk_interval: float = 0.0,
+        **kwargs: Any,
+    ) -> Union[Turn, AsyncGenerator[Turn, Any], AsyncGenerator[TurnDelta, Any]]:
         candidate_id = str(uuid.uuid4())
         turn_id = str(uuid.uuid4())
         request_id = str(uuid.uuid4())
 
-        ws_message = {
-            "command": "create_and_generate_turn",
-            "origin_id": "web-next",
-            "payload": {
-                "character_id": str(character_id),
-                "num_candidates": 1,
-                "previous_annotations": {
-                    "bad_memory": 0,
-                    "boring": 0,
-                    "ends_chat_early": 0,
-                    "funny": 0,
-                    "helpful": 0,
-                    "inaccurate": 0,
-                    "interesting": 0,
-                    "long": 0,
-                    "not_bad_memory": 0,
-                    "not_boring": 0,
-                    "not_ends_chat_early": 0,
-                    "not_funny": 0,
-                    "not_helpful": 0,
-                    "not_inaccurate": 0,
-                    "not_interesting": 0,
-                    "not_long": 0,
-                    "not_out_of_character": 0,
-                    "not_repetitive": 0,
-                    "not_short": 0,
-                    "out_of_character": 0,
-                    "repetitive": 0,
-                    "short": 0,
-                },
-                "selected_language": "",
-                "tts_enabled": False,
-                "turn": {
-                    "author": {
-                        "author_id": self.__client.get_account_id(),
-                        "is_human": True,
-                        "name": "",
-                    },
-                    "candidates": [{"candidate_id": str(candidate_id), "raw_content": f"{text}"}],
-                    "primary_candidate_id": str(candidate_id),
-                    "turn_key": {"chat_id": str(chat_id), "turn_id": str(turn_id)},
-                },
-                "user_name": "",
-            },
-            "request_id": str(request_id),
-        }
+        ws_message = commands.CREATE_AND_GENERATE_TURN.render(
+            request_id,
+            chat_id=str(chat_id),
+            character_id=str(character_id),
+            author_id=self.__client.get_account_id(),
+            candidate_id=candidate_id,
+            text=f"{text}",
+            turn_id=turn_id,
+        )
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        def find_answer(raw_turns: List[Dict]) -> Optional[Dict]:
+            # Turns are sorted from newest to oldest, so the answer is right before our message
+            for index, raw_turn in enumerate(raw_turns):
+                if raw_turn.get("turn_key", {}).get("turn_id", None) == turn_id:
+                    if index > 0 and not raw_turns[index - 1].get("author", {}).get("is_human", False):
+                        return raw_turns[index - 1]
+                    break
 
-        async def responses() -> AsyncGenerator[Turn, Any]:
-            async for raw_response in request:
-                if raw_response is None:
-                    raise SessionClosedError
+            return None
 
-                if raw_response["command"] == "neo_error":
-                    error_comment = raw_response.get("comment", "")
-                    raise ActionError(f"Cannot send message. {error_comment}")
+        async def resume(_: Optional[Dict]) -> AsyncGenerator[Dict, Any]:
+            async for frame in self.__resume_turn(chat_id, find_answer, **kwargs):
+                yield frame
 
-                if raw_response["command"] in ["add_turn", "update_turn"]:
-                    # Skip first response
-                    if raw_response["turn"].get("author", {}).get("is_human", False):
-                        continue
+        request = self.__requester.ws_send_and_receive_async(
+            ws_message, token=self.__client.get_token(), resume=resume, timeout=kwargs.get("timeout", None)
+        )
 
-                    yield Turn(raw_response["turn"])
+        async def responses(incremental: bool) -> AsyncGenerator[Turn, Any]:
+            turn: Optional[Turn] = None
 
-                    if raw_response["turn"].get("candidates")[0].get("is_final", False):
-                        break
+            async with aclosing(request):
+                async for raw_response in request:
+                    if raw_response is None:
+                        raise SessionClosedError
+
+                    if raw_response["command"] == "neo_error":
+                        error_comment = raw_response.get("comment", "")
+                        raise ActionError(f"Cannot send message. {error_comment}")
+
+                    # New turns move the older ones to other pages
+                    if raw_response["command"] == "add_turn":
+                        self.__turn_index.invalidate(chat_id)
+
+                    if raw_response["command"] in ["add_turn", "update_turn"]:
+                        # Skip first response
+                        if raw_response["turn"].get("author", {}).get("is_human", False):
+                            continue
+
+                        turn = self.__apply_turn_update(turn, raw_response["turn"], incremental)
+                        yield turn
+
+                        if raw_response["turn"].get("candidates")[0].get("is_final", False):
+                            break
+
+        if streaming and delta_only:
+            return self.__stream_deltas(responses(incremental=True), chunk_size, chunk_interval)
 
         if streaming:
-            return responses()
+            return responses(incremental)
 
         # else
-        async for response in responses():
-            primary_candidate = response.get_primary_candidate()
-            if primary_candidate and primary_candidate.is_final:
-                return response
+        # (only the final state is returned, so there is no need to create a new Turn for every update)
+        async with aclosing(responses(incremental=True)) as turns:
+            async for response in turns:
+                primary_candidate = response.get_primary_candidate()
+                if primary_candidate and primary_candidate.is_final:
+                    return response
 
         raise ActionError("Cannot send message.")
 
     async def another_response(
-        self, character_id: str, chat_id: str, turn_id: str, streaming: bool = False, **kwargs: Any
-    ) -> Union[Turn, AsyncGenerator[Turn, Any]]:
+        self,
+        character_id: str,
+        chat_id: str,
+        turn_id: str,
+        streaming: bool = False,
+        incremental: bool = False,
+        delta_only: bool = False,
+        chunk_size: int = 0,
+        chunk_interval: float = 0.0,
+        **kwargs: Any,
+    ) -> Union[Turn, AsyncGenerator[Turn, Any], AsyncGenerator[TurnDelta, Any]]:
         request_id = str(uuid.uuid4())
 
-        ws_message = {
-            "command": "generate_turn_candidate",
-            "origin_id": "web-next",
-            "payload": {
-                "character_id": str(character_id),
-                "previous_annotations": {
-                    "bad_memory": 0,
-                    "boring": 0,
-                    "ends_chat_early": 0,
-                    "funny": 0,
-                    "helpful": 0,
-                    "inaccurate": 0,
-                    "interesting": 0,
-                    "long": 0,
-                    "not_bad_memory": 0,
-                    "not_boring": 0,
-                    "not_ends_chat_early": 0,
-                    "not_funny": 0,
-                    "not_helpful": 0,
-                    "not_inaccurate": 0,
-                    "not_interesting": 0,
-                    "not_long": 0,
-                    "not_out_of_character": 0,
-                    "not_repetitive": 0,
-                    "not_short": 0,
-                    "out_of_character": 0,
-                    "repetitive": 0,
-                    "short": 0,
-                },
-                "selected_language": "",
-                "tts_enabled": False,
-                "turn_key": {"chat_id": str(chat_id), "turn_id": str(turn_id)},
-                "user_name": "",
-            },
-            "request_id": str(request_id),
-        }
+        ws_message = commands.GENERATE_TURN_CANDIDATE.render(
+            request_id, chat_id=str(chat_id), character_id=str(character_id), turn_id=str(turn_id)
+        )
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        async def resume(last_frame: Optional[Dict]) -> AsyncGenerator[Dict, Any]:
+            # The new candidate is known only if we have received at least one frame of it
+            new_candidate_id = None
+            if last_frame is not None:
+                new_candidate_id = last_frame.get("turn", {}).get("primary_candidate_id", None)
 
-        async def responses() -> AsyncGenerator[Turn, Any]:
-            async for raw_response in request:
-                if raw_response is None:
-                    raise SessionClosedError
+            if new_candidate_id is None:
+                return
 
-                if raw_response["command"] == "neo_error":
-                    error_comment = raw_response.get("comment", "")
-                    raise ActionError(f"Cannot generate another response. {error_comment}")
+            def find_turn(raw_turns: List[Dict]) -> Optional[Dict]:
+                for raw_turn in raw_turns:
+                    if raw_turn.get("turn_key", {}).get("turn_id", None) != turn_id:
+                        continue
 
-                if raw_response["command"] == "update_turn":
-                    yield Turn(raw_response["turn"])
+                    candidates = [
+                        candidate
+                        for candidate in raw_turn.get("candidates", [])
+                        if candidate.get("candidate_id", None) == new_candidate_id
+                    ]
 
-                    if raw_response["turn"].get("candidates")[0].get("is_final", False):
-                        break
+                    if candidates:
+                        return {**raw_turn, "candidates": candidates}
+
+                return None
+
+            async for frame in self.__resume_turn(chat_id, find_turn, **kwargs):
+                yield frame
+
+        request = self.__requester.ws_send_and_receive_async(
+            ws_message, token=self.__client.get_token(), resume=resume, timeout=kwargs.get("timeout", None)
+        )
+
+        async def responses(incremental: bool) -> AsyncGenerator[Turn, Any]:
+            turn: Optional[Turn] = None
+
+            async with aclosing(request):
+                async for raw_response in request:
+                    if raw_response is None:
+                        raise SessionClosedError
+
+                    if raw_response["command"] == "neo_error":
+                        error_comment = raw_response.get("comment", "")
+                        raise ActionError(f"Cannot generate another response. {error_comment}")
+
+                    if raw_response["command"] == "update_turn":
+                        turn = self.__apply_turn_update(turn, raw_response["turn"], incremental)
+                        yield turn
+
+                        if raw_response["turn"].get("candidates")[0].get("is_final", False):
+                            break
+
+        if streaming and delta_only:
+            return self.__stream_deltas(responses(incremental=True), chunk_size, chunk_interval)
 
         if streaming:
-            return responses()
+            return responses(incremental)
 
         # else
-        async for response in responses():
-            primary_candidate = response.get_primary_candidate()
-            if primary_candidate and primary_candidate.is_final:
-                return response
+        # (only the final state is returned, so there is no need to create a new Turn for every update)
+        async with aclosing(responses(incremental=True)) as turns:
+            async for response in turns:
+                primary_candidate = response.get_primary_candidate()
+                if primary_candidate and primary_candidate.is_final:
+                    return response
 
         raise ActionError("Cannot generate another response.")
 
@@ -499,47 +956,49 @@ class ChatMethods:
             "origin_id": "web-next",
         }
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        request = self.__requester.ws_send_and_receive_async(
+            ws_message, token=self.__client.get_token(), timeout=kwargs.get("timeout", None)
+        )
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        async with aclosing(request):
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise EditError(f"Cannot edit message. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise EditError(f"Cannot edit message. {error_comment}")
 
-            if raw_response["command"] == "update_turn":
-                return Turn(raw_response["turn"])
+                if raw_response["command"] == "update_turn":
+                    return Turn(raw_response["turn"])
 
-            break
+                break
 
         raise EditError("Cannot edit message.")
 
     async def delete_messages(self, chat_id: str, turn_ids: List[str], **kwargs: Any) -> bool:
         request_id = str(uuid.uuid4())
 
-        ws_message = {
-            "command": "remove_turns",
-            "origin_id": "web-next",
-            "payload": {"chat_id": str(chat_id), "turn_ids": turn_ids},
-            "request_id": str(request_id),
-        }
+        ws_message = commands.REMOVE_TURNS.render(request_id, chat_id=str(chat_id), turn_ids=turn_ids)
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        request = self.__requester.ws_send_and_receive_async(
+            ws_message, token=self.__client.get_token(), timeout=kwargs.get("timeout", None)
+        )
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        async with aclosing(request):
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise DeleteError(f"Cannot delete messages. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise DeleteError(f"Cannot delete messages. {error_comment}")
 
-            if raw_response["command"] == "remove_turns_response":
-                return True
+                if raw_response["command"] == "remove_turns_response":
+                    self.__turn_index.invalidate(chat_id)
+                    return True
 
-            break
+                break
 
         raise DeleteError("Cannot delete messages.")
 
@@ -549,59 +1008,53 @@ class ChatMethods:
     async def pin_message(self, chat_id: str, turn_id: str, **kwargs: Any) -> bool:
         request_id = str(uuid.uuid4())
 
-        ws_message = {
-            "command": "set_turn_pin",
-            "origin_id": "web-next",
-            "payload": {
-                "is_pinned": True,
-                "turn_key": {"chat_id": str(chat_id), "turn_id": str(turn_id)},
-            },
-            "request_id": str(request_id),
-        }
+        ws_message = commands.SET_TURN_PIN.render(
+            request_id, chat_id=str(chat_id), is_pinned=True, turn_id=str(turn_id)
+        )
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        request = self.__requester.ws_send_and_receive_async(
+            ws_message, token=self.__client.get_token(), timeout=kwargs.get("timeout", None)
+        )
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        async with aclosing(request):
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise ActionError(f"Cannot pin message. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise ActionError(f"Cannot pin message. {error_comment}")
 
-            if raw_response["command"] == "update_turn":
-                return raw_response["turn"].get("is_pinned", False) is True
+                if raw_response["command"] == "update_turn":
+                    return raw_response["turn"].get("is_pinned", False) is True
 
-            break
+                break
 
         raise ActionError("Cannot pin message.")
 
     async def unpin_message(self, chat_id: str, turn_id: str, **kwargs: Any) -> bool:
         request_id = str(uuid.uuid4())
 
-        ws_message = {
-            "command": "set_turn_pin",
-            "origin_id": "web-next",
-            "payload": {
-                "is_pinned": False,
-                "turn_key": {"chat_id": str(chat_id), "turn_id": str(turn_id)},
-            },
-            "request_id": str(request_id),
-        }
+        ws_message = commands.SET_TURN_PIN.render(
+            request_id, chat_id=str(chat_id), is_pinned=False, turn_id=str(turn_id)
+        )
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        request = self.__requester.ws_send_and_receive_async(
+            ws_message, token=self.__client.get_token(), timeout=kwargs.get("timeout", None)
+        )
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        async with aclosing(request):
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise ActionError(f"Cannot unpin message. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise ActionError(f"Cannot unpin message. {error_comment}")
 
-            if raw_response["command"] == "update_turn":
-                return raw_response["turn"].get("is_pinned", False) is False
+                if raw_response["command"] == "update_turn":
+                    return raw_response["turn"].get("is_pinned", False) is False
 
-            break
+                break
 
         raise ActionError("Cannot unpin message.")
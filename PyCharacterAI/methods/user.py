@@ -4,6 +4,7 @@ from typing import Optional, List, Any
 from ..types import PublicUser, Voice
 from ..exceptions import FetchError, ActionError
 
+from ..bulk import DEFAULT_CONCURRENCY, BulkResult, fetch_bulk
 from ..requester import Requester
 
 
@@ -19,6 +20,10 @@ class UserMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"username": username}),
+                "idempotent": True,
+                "cache": "user",
+                "cache_tags": [f"user:{username}", "users"],
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -30,10 +35,19 @@ class UserMethods:
 
         raise FetchError("Cannot fetch user.")
 
+    async def fetch_users(
+        self, usernames: List[str], max_concurrency: int = DEFAULT_CONCURRENCY, **kwargs: Any
+    ) -> BulkResult[Optional[PublicUser]]:
+        # Users that don't exist get None, as in fetch_user()
+        return await fetch_bulk(usernames, lambda username: self.fetch_user(username, **kwargs), max_concurrency)
+
     async def fetch_user_voices(self, username: str, **kwargs: Any) -> List[Voice]:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/multimodal/api/v1/voices/search?creatorInfo.username={username}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -54,9 +68,12 @@ class UserMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"username": username}),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"user:{username}")
+
         if request.status_code == 200:
             status = request.json().get("status", "")
             return status == "OK"
@@ -70,9 +87,12 @@ class UserMethods:
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": json.dumps({"username": username}),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"user:{username}")
+
         if request.status_code == 200:
             status = request.json().get("status", "")
 
@@ -29,7 +29,10 @@ class UtilsMethods:
     async def ping(self, **kwargs: Any) -> bool:
         request = await self.__requester.request_async(
             url="https://neo.character.ai/ping/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         return request.status_code == 200
@@ -37,7 +40,12 @@ class UtilsMethods:
     async def fetch_voice(self, voice_id, **kwargs: Any) -> Voice:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/multimodal/api/v1/voices/{voice_id}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "cache": "voice",
+                "cache_tags": [f"voice:{voice_id}"],
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -48,7 +56,12 @@ class UtilsMethods:
     async def search_voices(self, voice_name: str, **kwargs: Any) -> List[Voice]:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/multimodal/api/v1/voices/search?query={quote(voice_name)}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "cache": "voice_search",
+                "cache_tags": ["voices"],
+                "timeout": kwargs.get("timeout", None),
+            },
         )
 
         if request.status_code == 200:
@@ -72,6 +85,7 @@ class UtilsMethods:
                         "model_version": "v1",
                     }
                 ),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -98,7 +112,9 @@ class UtilsMethods:
         else:
             parsed_url = urlparse(image)
             if parsed_url.scheme and parsed_url.netloc:
-                image_request = await self.__requester.request_async(image)
+                image_request = await self.__requester.request_async(
+                    image, options={"timeout": kwargs.get("timeout", None)}
+                )
                 data = base64.b64encode(image_request.content)
 
             else:
@@ -117,6 +133,7 @@ class UtilsMethods:
                     include_web_next_auth=True,
                 ),
                 "body": json.dumps({"0": {"json": {"imageDataUrl": image_url}}}),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -128,7 +145,9 @@ class UtilsMethods:
                 avatar = Avatar({"file_name": file_name})
 
                 if check_image:
-                    image_request = await self.__requester.request_async(avatar.get_url())
+                    image_request = await self.__requester.request_async(
+                        avatar.get_url(), options={"timeout": kwargs.get("timeout", None)}
+                    )
 
                     if image_request.status_code != 200:
                         raise UploadError(f"Cannot upload avatar. {image_request.text}")
@@ -165,7 +184,9 @@ class UtilsMethods:
         else:
             parsed_url = urlparse(voice)
             if parsed_url.scheme and parsed_url.netloc:
-                voice_request = await self.__requester.request_async(voice)
+                voice_request = await self.__requester.request_async(
+                    voice, options={"timeout": kwargs.get("timeout", None)}
+                )
                 data = voice_request.content
 
                 mime, _ = mimetypes.guess_type(voice)
@@ -211,6 +232,7 @@ class UtilsMethods:
                     "authorization": f"Token {kwargs.get('token') or self.__client.get_token()}",
                 },
                 "body": body,
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -289,9 +311,12 @@ class UtilsMethods:
                         }
                     }
                 ),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"voice:{voice.voice_id}", "voices")
+
         if request.status_code == 200:
             return Voice(request.json().get("voice"))
 
@@ -303,9 +328,12 @@ class UtilsMethods:
             options={
                 "method": "DELETE",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
+        await self.__requester.invalidate_cache(f"voice:{voice_id}", "voices")
+
         if request.status_code == 200:
             return True
 
@@ -329,6 +357,7 @@ class UtilsMethods:
                         "voiceId": voice_id,
                     }
                 ),
+                "timeout": kwargs.get("timeout", None),
             },
         )
 
@@ -343,7 +372,7 @@ class UtilsMethods:
         if return_url:
             return audio_url
 
-        request = await self.__requester.request_async(url=audio_url, options={})
+        request = await self.__requester.request_async(url=audio_url, options={"timeout": kwargs.get("timeout", None)})
 
         speech = request.content
 
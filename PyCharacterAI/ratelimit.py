@@ -0,0 +1,165 @@
+import time
+import asyncio
+
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from .exceptions import DeadlineExceededError
+from .retry import exponential_backoff
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    # HTTP-date
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: Optional[float], burst: int, min_rate: float):
+        # rate is None means "no limit" (only Retry-After and backoff pauses are respected)
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate) if rate else min_rate
+        self.burst = max(1, burst)
+
+        self.tokens: float = float(self.burst)
+        self.updated: float = time.monotonic()
+        self.paused_until: float = 0.0
+
+        # How many 429/503 in a row, for backoff without Retry-After
+        self.failures: int = 0
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        wait = max(0.0, self.paused_until - now)
+
+        if self.rate:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # Taking a token "in advance" keeps waiting requests in order
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+
+        return wait
+
+    def release(self) -> None:
+        # Gives back a reserved token that won't be used
+        if self.rate:
+            self.tokens = min(float(self.burst), self.tokens + 1)
+
+    def throttle(self, retry_after: Optional[float]) -> float:
+        if retry_after is None:
+            retry_after = exponential_backoff(self.failures, base=1.0, cap=60.0)
+
+        self.failures += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+        # Multiplicative decrease...
+        if self.rate:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+        return retry_after
+
+    def recover(self) -> None:
+        self.failures = 0
+
+        # ...and additive increase
+        if self.rate and self.max_rate and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class RateLimiter:
+    THROTTLING_STATUS_CODES = (429, 503)
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 5, min_rate: float = 0.2):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+
+        # (host, token) -> bucket
+        self.__buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.__stats: Dict[str, Dict[str, float]] = {}
+
+    def __get_bucket(self, host: str, token: str) -> TokenBucket:
+        bucket = self.__buckets.get((host, token), None)
+
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, self.min_rate)
+            self.__buckets[(host, token)] = bucket
+
+        return bucket
+
+    def __get_host_stats(self, host: str) -> Dict[str, float]:
+        stats = self.__stats.get(host, None)
+
+        if stats is None:
+            stats = {"requests": 0, "delayed": 0, "throttled": 0, "wait_time_total": 0.0, "wait_time_max": 0.0}
+            self.__stats[host] = stats
+
+        return stats
+
+    async def acquire(self, host: str, token: str = "", timeout: Optional[float] = None) -> float:
+        bucket = self.__get_bucket(host, token)
+
+        started = time.monotonic()
+        wait = bucket.reserve()
+
+        # The bucket may get paused (429/503) while we are waiting for our turn
+        while wait > 0:
+            # No point in waiting if the request can't be sent before its deadline anyway
+            if timeout is not None and time.monotonic() + wait >= started + timeout:
+                bucket.release()
+                raise DeadlineExceededError(f"Rate limit wait ({wait:.2f}s) exceeds the request deadline.")
+
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                bucket.release()
+                raise
+
+            wait = bucket.paused_until - time.monotonic()
+
+        waited = time.monotonic() - started
+
+        stats = self.__get_host_stats(host)
+        stats["requests"] += 1
+
+        if waited > 0.001:
+            stats["delayed"] += 1
+            stats["wait_time_total"] += waited
+            stats["wait_time_max"] = max(stats["wait_time_max"], waited)
+
+        return waited
+
+    def feedback(self, host: str, token: str, status_code: int, retry_after: Optional[str] = None) -> Optional[float]:
+        bucket = self.__get_bucket(host, token)
+
+        if status_code in self.THROTTLING_STATUS_CODES:
+            self.__get_host_stats(host)["throttled"] += 1
+            return bucket.throttle(parse_retry_after(retry_after))
+
+        bucket.recover()
+        return None
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        stats = {}
+
+        for host, host_stats in self.__stats.items():
+            stats[host] = dict(host_stats)
+
+            rates = [bucket.rate for (bucket_host, _), bucket in self.__buckets.items() if bucket_host == host]
+            stats[host]["current_rate"] = min([rate for rate in rates if rate] or [0.0])
+
+        return stats
@@ -1,12 +1,24 @@
+import time
+import uuid
 import asyncio
+import hashlib
 import json
 
-from typing import Dict, AsyncGenerator, List, Optional, Tuple
+from collections import OrderedDict
+from urllib.parse import urlparse
+from typing import Any, Callable, Dict, AsyncGenerator, List, Optional, Set, Tuple, Union
 
 # for requests
 import curl_cffi
 
-from .exceptions import RequestError, AuthenticationError, WebsocketError
+from .retry import exponential_backoff, RetryPolicy
+from .ratelimit import RateLimiter
+from .hedging import HedgeStats, LatencyTracker, send_hedged
+from .buffers import FrameBuffer
+from .cache import ResponseCache
+from .commands import WSCommand
+from . import jsonlib
+from .exceptions import RequestError, AuthenticationError, WebsocketError, DeadlineExceededError
 
 
 class Requester:
@@ -16,35 +28,122 @@ class Requester:
         self.__impersonate: Optional[curl_cffi.BrowserTypeLiteral] = self.__extra_options.pop("impersonate", None)
         self.__proxy: Optional[str] = self.__extra_options.pop("proxy", None)
 
+        # Requests per second for each host (and token). None means no limit,
+        # but 429/503 responses (and their Retry-After) slow down the following requests anyway.
+        self.__rate_limiter = RateLimiter(
+            rate=self.__extra_options.pop("rate_limit", None),
+            burst=self.__extra_options.pop("rate_limit_burst", 5),
+            min_rate=self.__extra_options.pop("rate_limit_min", 0.2),
+        )
+        self.__rate_limit_retries: int = self.__extra_options.pop("rate_limit_retries", 2)
+
+        # What to do with network errors and 5xx responses
+        self.__retry_policy: RetryPolicy = self.__extra_options.pop("retry_policy", None) or RetryPolicy()
+
+        # Hedging: if an idempotent request is slower than hedge_percentile of the latest requests
+        # to the same host, an identical request is sent and the first answer wins
+        self.__hedging: bool = self.__extra_options.pop("hedging", False)
+        self.__hedge_latencies = LatencyTracker(percentile=self.__extra_options.pop("hedge_percentile", 0.95))
+        self.__hedge_delay: float = self.__extra_options.pop("hedge_delay", 1.0)
+        self.__hedge_min_delay: float = self.__extra_options.pop("hedge_min_delay", 0.05)
+        self.__hedge_max_delay: float = self.__extra_options.pop("hedge_max_delay", 5.0)
+        self.__hedge_stats = HedgeStats()
+
+        # Identical idempotent requests that are sent at the same moment share one round trip
+        self.__coalescing: bool = self.__extra_options.pop("coalesce_requests", True)
+        self.__in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.__coalesce_stats: Dict[str, int] = {"requests": 0, "coalesced": 0}
+
+        # Responses of slowly changing endpoints (characters, voices, users). Disabled by default,
+        # cache=True enables it with default TTLs, or pass your own ResponseCache.
+        cache = self.__extra_options.pop("cache", None)
+        self.__cache: Optional[ResponseCache] = ResponseCache() if cache is True else (cache or None)
+
         # debug information (TO-DO)
         # self.__debug: bool = self.__extra_options.pop("requester_debug", False)
         
         self.__requester_session: Optional[curl_cffi.AsyncSession] = None
-        self.__ws: Optional[curl_cffi.AsyncWebSocket] = None
 
-        self.__ws_response_messages: Dict[str, List] = {}
+        # Every token gets its own pool of websocket connections.
+        self.__ws_pool_size: int = max(1, int(self.__extra_options.pop("ws_pool_size", 1)))
+        self.__ws_pools: Dict[str, List[WebsocketConnection]] = {}
+
+        # Limits for frames that are waiting to be consumed, per connection
+        self.__ws_buffer_options: Dict[str, Any] = {
+            "max_request_frames": self.__extra_options.pop("ws_max_request_frames", 512),
+            "max_request_bytes": self.__extra_options.pop("ws_max_request_bytes", 4 * 1024 * 1024),
+            "max_total_frames": self.__extra_options.pop("ws_max_buffered_frames", 8192),
+            "max_total_bytes": self.__extra_options.pop("ws_max_buffered_bytes", 32 * 1024 * 1024),
+            "orphan_ttl": self.__extra_options.pop("ws_orphan_ttl", 10.0),
+        }
+
+        # Keepalive pings (to find dead connections before requests do) and closing of unused connections
+        self.__ws_ping_interval: Optional[float] = self.__extra_options.pop("ws_ping_interval", 30.0)
+        self.__ws_idle_timeout: Optional[float] = self.__extra_options.pop("ws_idle_timeout", 300.0)
+
+        # How many times to reconnect when the connection is lost in the middle of a request
+        self.__ws_reconnect_attempts: int = self.__extra_options.pop("ws_reconnect_attempts", 3)
+        self.__ws_reconnect_backoff: float = self.__extra_options.pop("ws_reconnect_backoff", 0.5)
+        self.__ws_reconnect_max_backoff: float = self.__extra_options.pop("ws_reconnect_max_backoff", 8.0)
+
+        # chat_id -> connection, so commands for the same chat keep their order.
+        self.__ws_affinity: OrderedDict[str, WebsocketConnection] = OrderedDict()
 
     # ================================================================== #
     #                              Requests                              #
     # ================================================================== #
 
     class Response:
+        # The body is kept only as bytes: text is decoded and JSON is parsed
+        # on the first access, and then reused
+        __NOT_PARSED = object()
+
         def __init__(
             self,
             url: str,
             status_code: int,
             headers: List[Tuple[str, str | None]],
-            text: str,
             content: bytes,
+            encoding: Optional[str] = None,
         ):
             self.url: str = url
             self.status_code: int = status_code
             self.headers: List[Tuple[str, str | None]] = headers
-            self.text: str = text
             self.content: bytes = content
+            self.encoding: str = encoding or "utf-8"
+
+            self.__text: Optional[str] = None
+            self.__json: Any = self.__NOT_PARSED
+
+        @property
+        def text(self) -> str:
+            if self.__text is None:
+                self.__text = self.content.decode(self.encoding, errors="replace")
+
+            return self.__text
 
         def json(self):
-            return json.loads(self.text)
+            if self.__json is self.__NOT_PARSED:
+                self.__json = jsonlib.loads(self.content)
+
+            return self.__json
+
+        def copy(self) -> "Requester.Response":
+            # Shares the body, but not the parsed JSON: whoever gets the response may modify it
+            return type(self)(self.url, self.status_code, list(self.headers), self.content, self.encoding)
+
+        def __getstate__(self) -> Dict[str, Any]:
+            # Only the raw response is worth storing (e.g. in SQLiteCache)
+            return {
+                "url": self.url,
+                "status_code": self.status_code,
+                "headers": self.headers,
+                "content": self.content,
+                "encoding": self.encoding,
+            }
+
+        def __setstate__(self, state: Dict[str, Any]) -> None:
+            self.__init__(**state)
     
     async def open_session(self) -> None: 
         self.__requester_session = curl_cffi.AsyncSession(
@@ -65,45 +164,265 @@ class Requester:
         if not self.__requester_session:
             await self.open_session()
 
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        return self.__rate_limiter.get_stats()
+
+    def get_hedge_stats(self) -> Dict[str, int]:
+        return self.__hedge_stats.get_dict()
+
+    def get_coalesce_stats(self) -> Dict[str, int]:
+        return dict(self.__coalesce_stats)
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        return self.__cache.get_stats() if self.__cache else None
+
+    async def invalidate_cache(self, *tags: str) -> None:
+        if self.__cache:
+            await self.__cache.invalidate(*tags)
+
+    async def clear_cache(self) -> None:
+        if self.__cache:
+            await self.__cache.clear()
+
+    async def __send_request_hedged(
+        self, method: str, url: str, headers: Dict, body, timeout: Optional[float] = None
+    ) -> Optional[curl_cffi.Response]:
+        host = urlparse(url).netloc
+        limiter_key = str(headers.get("authorization", ""))
+        started = time.monotonic()
+
+        async def send():
+            raw_response = await self.__send_request(method, url, headers, body, timeout=timeout)
+
+            # Only the latency of the first request is recorded (if it wins):
+            # the hedge starts later, so its latency would make the host look faster than it is
+            self.__hedge_latencies.add(host, time.monotonic() - started)
+            return raw_response
+
+        async def send_hedge():
+            time_left = None if timeout is None else timeout - (time.monotonic() - started)
+
+            # The second request counts against the rate limit as well
+            await self.__rate_limiter.acquire(host, limiter_key, timeout=time_left)
+            return await self.__send_request(method, url, headers, body, timeout=time_left)
+
+        delay = self.__hedge_latencies.get_delay(
+            host, self.__hedge_delay, self.__hedge_min_delay, self.__hedge_max_delay
+        )
+        return await send_hedged(send, delay, self.__hedge_stats, send_hedge)
+
+    async def __send_request(
+        self, method: str, url: str, headers: Dict, body, timeout: Optional[float] = None
+    ) -> Optional[curl_cffi.Response]:
+        if not self.__requester_session:
+            raise RequestError
+
+        # Otherwise, the session default is used
+        extra = {"timeout": timeout} if timeout is not None else {}
+
+        if method == "GET":
+            return await self.__requester_session.get(url, headers=headers, **extra)
+
+        elif method == "POST":
+            return await self.__requester_session.post(url, headers=headers, data=body, **extra)
+
+        elif method == "PUT":
+            return await self.__requester_session.put(url, headers=headers, data=body, **extra)
+
+        elif method == "PATCH":
+            return await self.__requester_session.patch(url, headers=headers, data=body, **extra)
+
+        elif method == "DELETE":
+            return await self.__requester_session.delete(url, headers=headers, **extra)
+
+        return None
+
+    @staticmethod
+    def __get_request_key(url: str, method: str, headers: Dict, body) -> Tuple:
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body, sort_keys=True)
+
+        # Headers include the token, so requests on behalf of different accounts are never mixed up
+        return method, url, body, tuple(sorted(headers.items()))
+
+    @staticmethod
+    def __get_cache_key(request_key: Tuple) -> str:
+        return hashlib.sha256(repr(request_key).encode("utf-8")).hexdigest()
+
     async def request_async(self, url: str, options=None) -> Response:
         if options is None:
             options = {}
 
+        # Name of the endpoint, see ResponseCache.DEFAULT_TTLS
+        endpoint: Optional[str] = options.get("cache", None)
+
+        if not self.__cache or not self.__cache.is_cacheable(endpoint):
+            return await self.__request_coalesced(url, options)
+
+        cache = self.__cache
+        key = self.__get_cache_key(
+            self.__get_request_key(
+                url, options.get("method", "GET"), options.get("headers", {}), options.get("body", {})
+            )
+        )
+
+        # MemoryCache keeps the objects themselves, so every caller gets its own copy
+        cached = await cache.get(str(endpoint), key)
+        if cached is not None:
+            return cached.copy()
+
+        generation = cache.generation
+        response = await self.__request_coalesced(url, options)
+
+        if response.status_code == 200:
+            await cache.set(str(endpoint), key, response.copy(), options.get("cache_tags", ()), generation=generation)
+
+        return response
+
+    async def __request_coalesced(self, url: str, options: Dict) -> Response:
         method = options.get("method", "GET")
         headers = options.get("headers", {})
         body = options.get("body", {})
 
-        raw_response: Optional[curl_cffi.Response] = None
+        coalesce = (
+            self.__coalescing
+            and options.get("coalesce", True)
+            and self.__retry_policy.is_idempotent(method, options.get("idempotent", None))
+        )
+
+        if not coalesce:
+            return await self.__request_async(url, options)
+
+        key = self.__get_request_key(url, method, headers, body)
+        self.__coalesce_stats["requests"] += 1
+
+        future = self.__in_flight.get(key, None)
+
+        if future is not None:
+            self.__coalesce_stats["coalesced"] += 1
+
+        else:
+            future = asyncio.ensure_future(self.__request_async(url, options))
+            self.__in_flight[key] = future
+
+            def forget(done: asyncio.Future) -> None:
+                if self.__in_flight.get(key, None) is done:
+                    del self.__in_flight[key]
+
+                # Nobody may be waiting for it anymore
+                if not done.cancelled():
+                    done.exception()
+
+            future.add_done_callback(forget)
+
+        # Every caller waits only as long as its own deadline allows
+        timeout: Optional[float] = options.get("timeout", None) or self.__retry_policy.timeout
+
+        # One of the callers being cancelled (or timing out) must not cancel the request for the others
+        try:
+            response = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError(f"Request deadline ({timeout}s) exceeded.")
+
+        # The same response is shared by all the callers
+        return response.copy()
+
+    async def __request_async(self, url: str, options: Dict) -> Response:
+        method = options.get("method", "GET")
+        headers = options.get("headers", {})
+        body = options.get("body", {})
 
         await self.ensure_session()
         if not self.__requester_session:
             raise RequestError
 
-        if method == "GET":
-            raw_response = await self.__requester_session.get(url, headers=headers)
+        # Explicitly marks POST requests that only read data (or the other way around)
+        idempotent: Optional[bool] = options.get("idempotent", None)
 
-        elif method == "POST":
-            raw_response = await self.__requester_session.post(url, headers=headers, data=body)
+        policy = self.__retry_policy
+        timeout: Optional[float] = options.get("timeout", None) or policy.timeout
 
-        elif method == "PUT":
-            raw_response = await self.__requester_session.put(url, headers=headers, data=body)
+        deadline: Optional[float] = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
 
-        elif method == "PATCH":
-            raw_response = await self.__requester_session.patch(url, headers=headers, data=body)
+        def time_left() -> Optional[float]:
+            if deadline is None:
+                return None
 
-        elif method == "DELETE":
-            raw_response = await self.__requester_session.delete(url, headers=headers)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceededError(f"Request deadline ({timeout}s) exceeded.")
 
+            return remaining
 
-        if not raw_response:
-            raise RequestError
+        async def backoff(delay: float) -> None:
+            remaining = time_left()
+
+            # The next attempt wouldn't be in time anyway
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceededError(f"Request deadline ({timeout}s) exceeded.")
+
+            await asyncio.sleep(delay)
+
+        host = urlparse(url).netloc
+        limiter_key = str(headers.get("authorization", ""))
+
+        hedge = self.__hedging and options.get("hedge", True) and policy.is_idempotent(method, idempotent)
+        send = self.__send_request_hedged if hedge else self.__send_request
+
+        attempt = 0
+        throttled = 0
+
+        while True:
+            await self.__rate_limiter.acquire(host, limiter_key, timeout=time_left())
+
+            try:
+                raw_response = await send(method, url, headers, body, timeout=time_left())
+
+            except curl_cffi.CurlError as error:
+                # Timed out because of the deadline
+                time_left()
+
+                if not policy.should_retry_error(method, error, attempt, idempotent):
+                    raise RequestError(str(error)) from error
+
+                await backoff(policy.get_delay(attempt))
+                attempt += 1
+                continue
+
+            if not raw_response:
+                raise RequestError
+
+            retry_after = self.__rate_limiter.feedback(
+                host, limiter_key, raw_response.status_code, raw_response.headers.get("Retry-After", None)
+            )
+
+            # 429: the server has rejected the request without processing it, so it's safe to try again,
+            # whatever the method is (rate limiter will wait for Retry-After before that).
+            # 503 only slows down the following requests, retrying it is up to the retry policy.
+            if raw_response.status_code == 429 and retry_after is not None and throttled < self.__rate_limit_retries:
+                remaining = time_left()
+
+                if remaining is not None and retry_after >= remaining:
+                    raise DeadlineExceededError(f"Request deadline ({timeout}s) exceeded.")
+
+                throttled += 1
+                continue
+
+            if policy.should_retry_status(method, raw_response.status_code, attempt, idempotent):
+                await backoff(policy.get_delay(attempt))
+                attempt += 1
+                continue
+
+            break
 
         response = self.Response(
             url=url,
             status_code=raw_response.status_code,
             headers=raw_response.headers.multi_items(),
-            text=raw_response.text,
             content=raw_response.content,
+            encoding=raw_response.charset_encoding,
         )
 
         if response.status_code == 401:
@@ -116,23 +435,111 @@ class Requester:
     #              (everything bellow is subject to change)              #
     # ================================================================== #
 
+    # How many chat_id -> connection bindings to remember
+    WS_AFFINITY_LIMIT = 4096
+
+    # Commands that can be safely sent again after the connection was lost.
+    # Everything else (e.g. "create_and_generate_turn") may start a second generation,
+    # so such commands are resumed (see ws_send_and_receive_async) instead of being resent.
+    WS_IDEMPOTENT_COMMANDS = frozenset(
+        [
+            "update_primary_candidate",
+            "edit_turn_candidate",
+            "set_turn_pin",
+            "remove_turns",
+        ]
+    )
+
     async def ws_close_async(self) -> None:
-        if self.__ws:
-            try:
-                await self.__ws.close()
-            finally:
-                self.__ws = None
+        pools = self.__ws_pools
+        self.__ws_pools = {}
+        self.__ws_affinity.clear()
+
+        for pool in pools.values():
+            for connection in pool:
+                await connection.close_async()
+
+    async def ws_warmup_async(self, token: str) -> None:
+        # Opens all the connections of the pool in advance,
+        # so the first message doesn't have to wait for the handshake.
+        pool = self.__ws_get_pool(token)
+        await asyncio.gather(*[connection.ensure_connection() for connection in pool])
+
+    def get_ws_in_flight_counts(self, token: Optional[str] = None) -> List[int]:
+        if token is not None:
+            return [connection.in_flight for connection in self.__ws_pools.get(token, [])]
+
+        return [connection.in_flight for pool in self.__ws_pools.values() for connection in pool]
+
+    def get_ws_buffer_stats(self) -> Dict[str, int]:
+        stats: Dict[str, int] = {}
+
+        for pool in self.__ws_pools.values():
+            for connection in pool:
+                for key, value in connection.get_buffer_stats().items():
+                    stats[key] = stats.get(key, 0) + value
+
+        return stats
+
+    @staticmethod
+    def __ws_get_chat_id(message: Dict) -> Optional[str]:
+        payload = message.get("payload", {})
+
+        chat_id = (
+            payload.get("chat_id", None)
+            or payload.get("turn_key", {}).get("chat_id", None)
+            or payload.get("turn", {}).get("turn_key", {}).get("chat_id", None)
+            or payload.get("chat", {}).get("chat_id", None)
+        )
+
+        return str(chat_id) if chat_id else None
+
+    def __ws_get_pool(self, token: str) -> List["WebsocketConnection"]:
+        pool = self.__ws_pools.get(token, None)
+
+        if pool is None:
+            pool = [
+                WebsocketConnection(
+                    self,
+                    token,
+                    FrameBuffer(**self.__ws_buffer_options),
+                    ping_interval=self.__ws_ping_interval,
+                    idle_timeout=self.__ws_idle_timeout,
+                )
+                for _ in range(self.__ws_pool_size)
+            ]
+            self.__ws_pools[token] = pool
+
+        return pool
+
+    def __ws_select_connection(self, token: str, chat_id: Optional[str]) -> "WebsocketConnection":
+        pool = self.__ws_get_pool(token)
+
+        if chat_id:
+            connection = self.__ws_affinity.get(chat_id, None)
+
+            if connection is not None and connection in pool:
+                self.__ws_affinity.move_to_end(chat_id)
+                return connection
+
+        # Least loaded, preferring connections that are already open
+        connection = min(pool, key=lambda conn: (conn.in_flight, not conn.is_connected()))
+
+        if chat_id:
+            self.__ws_affinity[chat_id] = connection
+
+            if len(self.__ws_affinity) > self.WS_AFFINITY_LIMIT:
+                self.__ws_affinity.popitem(last=False)
 
-    async def __ws_connect_async(self, token: str) -> None:
+        return connection
+
+    async def ws_connect_async(self, token: str) -> curl_cffi.AsyncWebSocket:
         await self.ensure_session()
         if not self.__requester_session:
             raise RequestError
 
-        if self.__ws:
-            await self.ws_close_async()
-        
         try:
-            self.__ws = await self.__requester_session.ws_connect(
+            ws = await self.__requester_session.ws_connect(
                 url="wss://neo.character.ai/ws/",
                 cookies={"HTTP_AUTHORIZATION": f"Token {token}"}
             )
@@ -140,94 +547,384 @@ class Requester:
         except curl_cffi.CurlError:
             raise AuthenticationError("maybe your token is invalid?")
 
-        if not self.__ws:
+        if not ws:
             raise AuthenticationError("maybe your token is invalid?")
 
-    async def __ws_ensure_connection(self, token: str) -> None:
-        if not self.__ws:
-            await self.__ws_connect_async(token=token)
-        
-    def __ws_clear_response_messages(self, request_uuid: Optional[str] = None) -> None:
-        if request_uuid:
-            self.__ws_response_messages.pop(request_uuid, None)
+        return ws
+
+    async def ws_send_and_receive_async(
+        self,
+        message: Union[Dict, WSCommand],
+        token: str,
+        resume: Optional[Callable[[Optional[Dict]], AsyncGenerator[Dict, Any]]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncGenerator:
+        if isinstance(message, WSCommand):
+            request_uuid, command, chat_id = message.request_id, message.command, message.chat_id
         else:
-            self.__ws_response_messages = {}
+            request_uuid, command = message.get("request_id", None), message.get("command", None)
+            chat_id = self.__ws_get_chat_id(message)
 
-    async def __ws_send_async(self, message: Dict, token: str) -> None:
-        await self.__ws_ensure_connection(token=token)
-        
-        if not self.__ws:
-            raise RequestError
-        
-        await self.__ws.send_json(message)
+        anonymous = request_uuid is None
+        request_key = str(request_uuid or uuid.uuid4())
+
+        idempotent = command in self.WS_IDEMPOTENT_COMMANDS
+
+        # The request stays on the selected connection, including retries
+        connection = self.__ws_select_connection(token, chat_id)
+
+        # Deadline for the whole command, including reconnects
+        deadline: Optional[float] = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        def time_left() -> Optional[float]:
+            if deadline is None:
+                return None
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceededError(f"Request deadline ({timeout}s) exceeded.")
+
+            return remaining
+
+        async def next_frame(responses: AsyncGenerator) -> Dict:
+            if deadline is None:
+                return await responses.__anext__()
+
+            try:
+                return await asyncio.wait_for(responses.__anext__(), time_left())
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError(f"Request deadline ({timeout}s) exceeded.")
+
+        tracker = _DeliveredFrames()
+        sent = False
+        attempt = 0
 
-    async def __ws_receive_async(self, request_uuid: Optional[str]) -> AsyncGenerator:
         try:
             while True:
-                if request_uuid is not None:
-                    saved_messages = self.__ws_response_messages.get(request_uuid, [])
+                try:
+                    # If the command has never reached the server, it's safe to send it (again)
+                    if not sent or idempotent:
+                        connection.register(request_key, anonymous=anonymous)
 
-                    if len(saved_messages) > 0:
-                        message = saved_messages.pop(0)
-                        self.__ws_response_messages[request_uuid] = saved_messages
+                        await connection.send_async(message)
+                        sent = True
 
-                        yield message
-                        continue
+                        responses = connection.receive_async(request_key, anonymous)
 
-                # else
-                try:
-                    if self.__ws:
-                        try: 
-                            response = await self.__ws.recv_str()
-                        except curl_cffi.WebSocketClosed:
-                            raise WebsocketError
-
-                        except curl_cffi.WebSocketError:
-                            try:
-                                await self.ws_close_async()
-                            finally:
-                                raise RequestError
-                        
-                        response_json = json.loads(response)
+                    # Otherwise, we can only find out what happened to it
+                    elif resume is not None:
+                        responses = resume(tracker.last_frame)
 
                     else:
-                        raise RequestError
+                        raise RequestError("Connection was lost and the request cannot be safely resent.")
+
+                    while True:
+                        try:
+                            response = await next_frame(responses)
+                        except StopAsyncIteration:
+                            break
+
+                        # Frames that were already delivered before the connection was lost
+                        if tracker.is_delivered(response):
+                            continue
+
+                        yield response
+
+                    break
+
+                except DeadlineExceededError:
+                    raise
+
+                # Something went wrong. Probably, connection was closed.
+                except RequestError:
+                    if attempt >= self.__ws_reconnect_attempts or (sent and not idempotent and resume is None):
+                        raise
+
+                    tracker.replaying = True
+
+                    delay = exponential_backoff(attempt, self.__ws_reconnect_backoff, self.__ws_reconnect_max_backoff)
+                    await asyncio.sleep(min(delay, time_left() or float("inf")))
+                    attempt += 1
 
+        finally:
+            connection.unregister(request_key)
+
+            # Every command changes something in the chat (its turns, at least)
+            if chat_id is not None:
+                await self.invalidate_cache(f"chat:{chat_id}")
+
+
+class _DeliveredFrames:
+    def __init__(self):
+        # (turn_id, candidate_id) -> hashes of the texts that were already delivered
+        self.__candidates: Dict[Tuple[str, str], Set[int]] = {}
+        self.last_frame: Optional[Dict] = None
+
+        # Set after the connection was lost: from now on frames can be repeated
+        # (the command was sent again, or its result is polled from the chat history)
+        self.replaying = False
+
+    def is_delivered(self, frame: Optional[Dict]) -> bool:
+        turn = frame.get("turn", None) if frame else None
+
+        if not isinstance(turn, dict):
+            return False
+
+        if not turn.get("candidates", []):
+            self.last_frame = frame
+            return False
+
+        turn_id = str(turn.get("turn_key", {}).get("turn_id", ""))
+        delivered = self.replaying
+
+        for candidate in turn.get("candidates", []):
+            key = (turn_id, str(candidate.get("candidate_id", "")))
+            content = hash(candidate.get("raw_content", "") or "")
+
+            texts = self.__candidates.setdefault(key, set())
+
+            # The text can also get shorter (e.g. when it's filtered), so only an exact repeat counts,
+            # and the final frame is always let through
+            if content not in texts or candidate.get("is_final", False) is True:
+                delivered = False
+
+            texts.add(content)
+
+        if not delivered:
+            self.last_frame = frame
+
+        return delivered
+
+
+class WebsocketConnection:
+    def __init__(
+        self,
+        requester: Requester,
+        token: str,
+        frames: FrameBuffer,
+        ping_interval: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        self.__requester = requester
+        self.__token = token
+
+        self.__ws: Optional[curl_cffi.AsyncWebSocket] = None
+        self.__reader_task: Optional[asyncio.Task] = None
+        self.__connect_lock = asyncio.Lock()
+
+        self.__ping_interval = ping_interval
+        self.__idle_timeout = idle_timeout
+
+        self.__keepalive_task: Optional[asyncio.Task] = None
+        self.__last_activity: float = time.monotonic()
+
+        # Frames are read by a single background task per connection
+        # and routed to the buffer of the request they belong to.
+        self.__frames = frames
+        self.__anonymous: List[str] = []
+        self.__close_reason: Optional[RequestError] = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.__frames)
+
+    def is_connected(self) -> bool:
+        return self.__ws is not None
+
+    def get_buffer_stats(self) -> Dict[str, int]:
+        return self.__frames.get_stats()
+
+    async def close_async(self) -> None:
+        keepalive_task = self.__keepalive_task
+
+        # close_async() can also be called by the keepalive task itself
+        if keepalive_task is not asyncio.current_task():
+            self.__keepalive_task = None
+
+            if keepalive_task and not keepalive_task.done():
+                keepalive_task.cancel()
+
+                try:
+                    await keepalive_task
                 except asyncio.CancelledError:
-                    yield None  # signaling that session is closed
+                    pass
+
+        reader_task = self.__reader_task
+        self.__reader_task = None
+
+        if reader_task and not reader_task.done():
+            reader_task.cancel()
+
+            try:
+                await reader_task
+            except asyncio.CancelledError:
+                pass
+
+        if self.__ws:
+            try:
+                await self.__ws.close()
+            finally:
+                self.__ws = None
+
+    async def __abort_async(self) -> None:
+        # Unlike close_async(), requests that are waiting for a response
+        # get RequestError (and can retry) instead of the "session closed" signal.
+        self.__close_reason = RequestError()
+
+        try:
+            await self.close_async()
+        finally:
+            self.__close_reason = None
+
+    async def ensure_connection(self) -> None:
+        async with self.__connect_lock:
+            if not self.__ws:
+                self.__ws = await self.__requester.ws_connect_async(self.__token)
+                self.__last_activity = time.monotonic()
+
+                self.__reader_task = asyncio.create_task(self.__reader_async(self.__ws))
+
+                if self.__keepalive_task is None and (self.__ping_interval or self.__idle_timeout):
+                    self.__keepalive_task = asyncio.create_task(self.__keepalive_async())
+
+    async def __keepalive_async(self) -> None:
+        interval = min(value for value in [self.__ping_interval, self.__idle_timeout] if value)
+
+        try:
+            while self.__ws is not None:
+                await asyncio.sleep(interval)
+
+                ws = self.__ws
+                if ws is None:
                     break
 
-                command = response_json.get("command", None)
+                idle_for = time.monotonic() - self.__last_activity
+
+                # Nobody has used this connection for a long time
+                if self.__idle_timeout and self.in_flight == 0 and idle_for >= self.__idle_timeout:
+                    await self.close_async()
+                    break
+
+                if not self.__ping_interval or idle_for < self.__ping_interval:
+                    continue
+
+                try:
+                    await ws.ping(b"")
+
+                except curl_cffi.CurlError:
+                    # The connection is dead. Let waiting requests know (they will retry),
+                    # and open a new one right away so the next request doesn't have to.
+                    await self.__abort_async()
+
+                    try:
+                        await self.ensure_connection()
+                    except Exception:
+                        break
+
+        finally:
+            if self.__keepalive_task is asyncio.current_task():
+                self.__keepalive_task = None
+
+    def register(self, request_key: str, anonymous: bool = False) -> None:
+        # (Re)registering always starts from an empty buffer,
+        # so nothing left over from a dropped connection leaks into a new attempt.
+        self.__frames.register(request_key)
+
+        if anonymous and request_key not in self.__anonymous:
+            self.__anonymous.append(request_key)
+
+    def unregister(self, request_key: str) -> None:
+        self.__frames.unregister(request_key)
+
+        if request_key in self.__anonymous:
+            self.__anonymous.remove(request_key)
+
+    def __dispatch(self, response_json: Dict, size: int) -> None:
+        request_key = str(response_json.get("request_id", None) or "")
+
+        # Frames without "request_id" (replies to commands sent without it) go to the oldest request
+        # that is waiting for such a frame. Frames with an unknown id are kept as orphans instead,
+        # their request may register a bit later.
+        if not request_key and self.__anonymous:
+            request_key = self.__anonymous[0]
+
+        self.__frames.put(request_key, response_json, size)
+
+    async def __reader_async(self, ws: curl_cffi.AsyncWebSocket) -> None:
+        # None is the signal that session is closed
+        error: Optional[RequestError] = None
 
-                if command in [None, "ok"] or request_uuid is None:
-                    yield response_json
+        try:
+            while True:
+                try:
+                    # Raw bytes, the JSON parser doesn't need them to be decoded
+                    response, _ = await ws.recv()
+
+                except curl_cffi.WebSocketClosed:
+                    error = WebsocketError()
                     break
 
-                messages = self.__ws_response_messages.get(request_uuid, [])
-                messages.append(response_json)
+                except curl_cffi.WebSocketError:
+                    error = RequestError()
+                    break
+
+                try:
+                    response_json = jsonlib.loads(response)
+                except jsonlib.DecodeError:
+                    continue
+
+                self.__last_activity = time.monotonic()
 
-                self.__ws_response_messages[request_uuid] = messages
+                if isinstance(response_json, dict):
+                    self.__dispatch(response_json, len(response))
 
         finally:
-            if request_uuid:
-                self.__ws_clear_response_messages(request_uuid)
+            if error is not None and self.__ws is ws:
+                self.__ws = None
+                self.__reader_task = None
+
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
 
-    async def ws_send_and_receive_async(self, message: Dict, token: str) -> AsyncGenerator:
-        request_uuid = message.get("request_id", None)
+            if error is None:
+                error = self.__close_reason
+
+            self.__frames.close(error)
+
+    async def send_async(self, message: Union[Dict, WSCommand]) -> None:
+        await self.ensure_connection()
+
+        if not self.__ws:
+            raise RequestError
+
+        self.__last_activity = time.monotonic()
 
         try:
-            await self.__ws_send_async(message=message, token=token)
+            if isinstance(message, WSCommand):
+                # Already serialized
+                await self.__ws.send_str(message.data)
+            else:
+                await self.__ws.send_json(message)
+
+        except curl_cffi.CurlError:
+            await self.__abort_async()
+            raise RequestError
+
+    async def receive_async(self, request_key: str, anonymous: bool) -> AsyncGenerator:
+        if not self.__frames.is_registered(request_key):
+            raise RequestError
 
-            async for message in self.__ws_receive_async(request_uuid=request_uuid):
-                yield message
+        while True:
+            message = await self.__frames.get(request_key)
 
-        # Something went wrong. Probably, connection was closed.
-        # ! There should be a better way of handling this, feel free to open a PR.
+            if isinstance(message, RequestError):
+                raise message
 
-        except RequestError:
-            # Okay, let's try again
-            await self.__ws_connect_async(token=token)
-            await self.__ws_send_async(message=message, token=token)
+            yield message
 
-            async for message in self.__ws_receive_async(request_uuid=request_uuid):
-                yield message
+            if message is None or anonymous or message.get("command", None) in [None, "ok"]:
+                break
@@ -0,0 +1,59 @@
+import random
+
+from typing import Iterable, Optional
+
+
+def exponential_backoff(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    # "Full jitter": a random delay between 0 and the exponential step,
+    # so that clients which failed at the same moment don't retry at the same moment.
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class RetryPolicy:
+    # Methods that can be repeated without changing the result
+    IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        retry_status_codes: Iterable[int] = (502, 503, 504),
+        retry_non_idempotent: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_status_codes = frozenset(retry_status_codes)
+        self.retry_non_idempotent = retry_non_idempotent
+
+        # Default deadline (in seconds) for a call, including all the retries
+        self.timeout = timeout
+
+    def is_idempotent(self, method: str, idempotent: Optional[bool] = None) -> bool:
+        # Some POST requests only read data, such requests can be marked as idempotent explicitly
+        if idempotent is not None:
+            return idempotent
+
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def should_retry_status(
+        self, method: str, status_code: int, attempt: int, idempotent: Optional[bool] = None
+    ) -> bool:
+        if attempt + 1 >= self.max_attempts or status_code not in self.retry_status_codes:
+            return False
+
+        return self.retry_non_idempotent or self.is_idempotent(method, idempotent)
+
+    def should_retry_error(
+        self, method: str, error: Exception, attempt: int, idempotent: Optional[bool] = None
+    ) -> bool:
+        if attempt + 1 >= self.max_attempts:
+            return False
+
+        # We don't know whether the server has received a non-idempotent request
+        return self.retry_non_idempotent or self.is_idempotent(method, idempotent)
+
+    def get_delay(self, attempt: int) -> float:
+        return exponential_backoff(attempt, self.backoff, self.max_backoff)
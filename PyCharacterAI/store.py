@@ -0,0 +1,259 @@
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .types import Turn
+from .types.batch import _to_microseconds
+
+
+class TurnChange:
+    ADDED = "added"
+    UPDATED = "updated"
+    REMOVED = "removed"
+
+    def __init__(self, seq: int, chat_id: str, turn_id: str, kind: str, raw_turn: Optional[Dict], changed_at: float):
+        # Position in the change feed, increases with every change
+        self.seq = seq
+
+        self.chat_id = chat_id
+        self.turn_id = turn_id
+        self.kind = kind
+        self.changed_at = changed_at
+
+        self.__raw_turn = raw_turn
+
+    @property
+    def turn(self) -> Optional[Turn]:
+        # The turn as it was at the moment of the change (None for removed turns)
+        return Turn(self.__raw_turn) if self.__raw_turn is not None else None
+
+
+class SyncState:
+    def __init__(self, chat_id: str, complete: bool, backfill_token: Optional[str], synced_at: Optional[float]):
+        self.chat_id = chat_id
+
+        # Whether the whole history has been downloaded at least once
+        self.complete = complete
+        # Where to continue downloading older turns if the first sync was interrupted
+        self.backfill_token = backfill_token
+
+        self.synced_at = synced_at
+
+
+class TurnStore:
+    # Local copy of chat histories in SQLite, see ChatMethods.sync_messages().
+    # The same file can be used by several processes.
+
+    def __init__(self, path: str = ":memory:", busy_timeout: float = 5.0):
+        self.path = path
+
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+
+        with self.__lock:
+            connection = self.__connection
+
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS turns ("
+                "chat_id TEXT NOT NULL, turn_id TEXT NOT NULL, create_time INTEGER NOT NULL, "
+                "last_update_time TEXT, raw TEXT NOT NULL, PRIMARY KEY (chat_id, turn_id))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS turns_chat_time ON turns (chat_id, create_time)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS changes ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, chat_id TEXT NOT NULL, turn_id TEXT NOT NULL, "
+                "kind TEXT NOT NULL, raw TEXT, changed_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS changes_chat ON changes (chat_id, seq)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                "chat_id TEXT PRIMARY KEY, complete INTEGER NOT NULL, backfill_token TEXT, synced_at REAL)"
+            )
+
+    # ================================================================== #
+    #                   Blocking part (runs in a thread)                 #
+    # ================================================================== #
+
+    def __get_versions(self, chat_id: str, turn_ids: Tuple[str, ...]) -> Dict[str, Optional[str]]:
+        with self.__lock:
+            rows = self.__connection.execute(
+                f"SELECT turn_id, last_update_time FROM turns WHERE chat_id = ? "
+                f"AND turn_id IN ({', '.join('?' * len(turn_ids))})",
+                (chat_id, *turn_ids),
+            ).fetchall()
+
+        return {turn_id: last_update_time for turn_id, last_update_time in rows}
+
+    def __write(self, chat_id: str, raw_turns: List[Dict], state: Optional[SyncState]) -> List[TurnChange]:
+        now = time.time()
+        changes = []
+
+        with self.__lock:
+            connection = self.__connection
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                for raw_turn in raw_turns:
+                    turn_id = raw_turn.get("turn_key", {}).get("turn_id", "")
+                    last_update_time = raw_turn.get("last_update_time", None)
+
+                    row = connection.execute(
+                        "SELECT last_update_time FROM turns WHERE chat_id = ? AND turn_id = ?", (chat_id, turn_id)
+                    ).fetchone()
+
+                    if row is not None and row[0] == last_update_time:
+                        continue
+
+                    raw = json.dumps(raw_turn)
+                    kind = TurnChange.ADDED if row is None else TurnChange.UPDATED
+
+                    connection.execute(
+                        "INSERT OR REPLACE INTO turns (chat_id, turn_id, create_time, last_update_time, raw) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (chat_id, turn_id, _to_microseconds(raw_turn.get("create_time", None)), last_update_time, raw),
+                    )
+                    seq = connection.execute(
+                        "INSERT INTO changes (chat_id, turn_id, kind, raw, changed_at) VALUES (?, ?, ?, ?, ?)",
+                        (chat_id, turn_id, kind, raw, now),
+                    ).lastrowid
+
+                    changes.append(TurnChange(seq, chat_id, turn_id, kind, raw_turn, now))
+
+                if state is not None:
+                    self.__write_state(state)
+
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        return changes
+
+    def __write_state(self, state: SyncState) -> None:
+        self.__connection.execute(
+            "INSERT OR REPLACE INTO sync_state (chat_id, complete, backfill_token, synced_at) VALUES (?, ?, ?, ?)",
+            (state.chat_id, 1 if state.complete else 0, state.backfill_token, state.synced_at),
+        )
+
+    def __remove_missing(self, chat_id: str, seen_turn_ids: Tuple[str, ...]) -> List[TurnChange]:
+        now = time.time()
+        changes = []
+        seen = set(seen_turn_ids)
+
+        with self.__lock:
+            connection = self.__connection
+            connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                stored = [
+                    row[0] for row in connection.execute("SELECT turn_id FROM turns WHERE chat_id = ?", (chat_id,))
+                ]
+
+                for turn_id in stored:
+                    if turn_id in seen:
+                        continue
+
+                    connection.execute("DELETE FROM turns WHERE chat_id = ? AND turn_id = ?", (chat_id, turn_id))
+                    seq = connection.execute(
+                        "INSERT INTO changes (chat_id, turn_id, kind, raw, changed_at) VALUES (?, ?, ?, NULL, ?)",
+                        (chat_id, turn_id, TurnChange.REMOVED, now),
+                    ).lastrowid
+
+                    changes.append(TurnChange(seq, chat_id, turn_id, TurnChange.REMOVED, None, now))
+
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        return changes
+
+    def __get_state(self, chat_id: str) -> Optional[SyncState]:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT complete, backfill_token, synced_at FROM sync_state WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return SyncState(chat_id, bool(row[0]), row[1], row[2])
+
+    def __set_state(self, state: SyncState) -> None:
+        with self.__lock:
+            self.__write_state(state)
+
+    def __get_raw_turns(self, chat_id: str, limit: Optional[int]) -> List[Dict]:
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT raw FROM turns WHERE chat_id = ? ORDER BY create_time DESC, rowid DESC LIMIT ?",
+                (chat_id, limit if limit is not None else -1),
+            ).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def __get_changes(self, chat_id: Optional[str], since: int, limit: Optional[int]) -> List[TurnChange]:
+        query = "SELECT seq, chat_id, turn_id, kind, raw, changed_at FROM changes WHERE seq > ?"
+        params: List = [since]
+
+        if chat_id is not None:
+            query += " AND chat_id = ?"
+            params.append(chat_id)
+
+        query += " ORDER BY seq LIMIT ?"
+        params.append(limit if limit is not None else -1)
+
+        with self.__lock:
+            rows = self.__connection.execute(query, params).fetchall()
+
+        return [
+            TurnChange(seq, row_chat_id, turn_id, kind, json.loads(raw) if raw is not None else None, changed_at)
+            for seq, row_chat_id, turn_id, kind, raw, changed_at in rows
+        ]
+
+    # ================================================================== #
+    #                                 API                                #
+    # ================================================================== #
+
+    async def get_versions(self, chat_id: str, turn_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        # turn_id -> stored last_update_time, only for turns that are stored
+        turn_ids = tuple(turn_ids)
+
+        if not turn_ids:
+            return {}
+
+        return await asyncio.to_thread(self.__get_versions, chat_id, turn_ids)
+
+    async def write(self, chat_id: str, raw_turns: List[Dict], state: Optional[SyncState] = None) -> List[TurnChange]:
+        return await asyncio.to_thread(self.__write, chat_id, raw_turns, state)
+
+    async def remove_missing(self, chat_id: str, seen_turn_ids: Iterable[str]) -> List[TurnChange]:
+        return await asyncio.to_thread(self.__remove_missing, chat_id, tuple(seen_turn_ids))
+
+    async def get_state(self, chat_id: str) -> Optional[SyncState]:
+        return await asyncio.to_thread(self.__get_state, chat_id)
+
+    async def set_state(self, state: SyncState) -> None:
+        await asyncio.to_thread(self.__set_state, state)
+
+    async def get_turns(self, chat_id: str, limit: Optional[int] = None) -> List[Turn]:
+        # From the newest to the oldest, as the API returns them
+        return [Turn(raw_turn) for raw_turn in await asyncio.to_thread(self.__get_raw_turns, chat_id, limit)]
+
+    async def get_changes(
+        self, chat_id: Optional[str] = None, since: int = 0, limit: Optional[int] = None
+    ) -> List[TurnChange]:
+        # Changes with seq greater than `since`, pass the last seen seq to get only the new ones
+        return await asyncio.to_thread(self.__get_changes, chat_id, since, limit)
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
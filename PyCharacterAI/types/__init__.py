@@ -1,6 +1,7 @@
 from .character import Character, CharacterShort
 from .chat import Chat, ChatHistory
-from .message import Turn, TurnCandidate
+from .message import Turn, TurnCandidate, TurnDelta
+from .batch import TurnBatch
 from .user import Account, Persona, PublicUser
 from .media import Avatar, Voice
 
@@ -11,6 +12,8 @@ __all__ = [
     "ChatHistory",
     "Turn",
     "TurnCandidate",
+    "TurnDelta",
+    "TurnBatch",
     "Account",
     "Persona",
     "PublicUser",
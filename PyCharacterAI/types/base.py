@@ -1,14 +1,119 @@
-from typing import Dict
+import re
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+# Fraction of a second with a number of digits other than 3 or 6, which fromisoformat()
+# doesn't accept before Python 3.11 (e.g. "2024-05-01T12:00:00.12345Z")
+_FRACTION_RE = re.compile(r"\.(\d+)")
+
+
+@lru_cache(maxsize=4096)
+def _parse_time_string(value: str) -> Union[datetime, str]:
+    text = value[:-1] + "+00:00" if value.endswith(("Z", "z")) else value
+
+    try:
+        parsed = datetime.fromisoformat(text)
+
+    except ValueError:
+        text = _FRACTION_RE.sub(lambda match: "." + match.group(1)[:6].ljust(6, "0"), text, 1)
+
+        try:
+            parsed = datetime.fromisoformat(text)
+
+        except ValueError:
+            # Values that can't be parsed are kept as they are
+            return value
+
+    # Timestamps of the API are in UTC
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return parsed
+
+
+def parse_time(value: Any) -> Any:
+    # The same timestamps come again and again (e.g. create_time of a turn
+    # in every streaming update), so the results are memoized
+    if not value or not isinstance(value, str):
+        return value
+
+    return _parse_time_string(value)
+
+
+@lru_cache(maxsize=None)
+def _get_slot_fields(cls: type) -> Tuple[str, ...]:
+    fields = []
+
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get("__slots__", ()):
+            # Private names are mangled, the same way as they would be in __dict__
+            if name.startswith("__") and not name.endswith("__"):
+                name = f"_{klass.__name__.lstrip('_')}{name}"
+
+            # "_name" slots are internal state, not fields
+            elif name.startswith("_"):
+                continue
+
+            if name not in ("_BaseCAI__raw", "__dict__", "__weakref__"):
+                fields.append(name)
+
+    return tuple(fields)
+
+
+@lru_cache(maxsize=None)
+def _get_lazy_fields(cls: type) -> Dict[str, str]:
+    # Attribute where the value is stored -> name of the property
+    fields = {}
+
+    for klass in cls.__mro__:
+        for name in klass.__dict__.get("_lazy_fields", ()):
+            fields[f"_{klass.__name__.lstrip('_')}__{name}"] = name
+
+    return fields
 
 
 class BaseCAI:
+    # Models that are created in large numbers (turns, characters) declare their fields
+    # in __slots__ and have no __dict__, the rest work as usual.
+    __slots__ = ("__raw",)
+
+    # Whether to keep the payload the object was created from (see get_dict(raw=True)).
+    # Can be disabled for all models or for one model class to save memory, e.g. Turn.KEEP_RAW = False
+    KEEP_RAW: bool = True
+
+    # In lazy mode, fields listed in _lazy_fields (timestamps, nested objects) are parsed
+    # on the first access instead of in __init__, e.g. BaseCAI.LAZY = True
+    LAZY: bool = False
+    _lazy_fields: Tuple[str, ...] = ()
+
     def __init__(self, options: Dict):
-        self.__raw = options
+        self.__raw: Optional[Dict] = options if self.KEEP_RAW else None
 
-    def get_dict(self, raw: bool = False):
-        fields = self.__dict__.copy()
-        fields.pop("_BaseCAI__raw")
+    def _set_raw(self, options: Dict) -> None:
+        if self.KEEP_RAW:
+            self.__raw = options
+
+    def _materialize(self) -> None:
+        for name in self._lazy_fields:
+            getattr(self, name)
 
+    def get_dict(self, raw: bool = False):
         if raw:
             return self.__raw
+
+        fields = {}
+        lazy_fields = _get_lazy_fields(type(self))
+
+        for name in (*_get_slot_fields(type(self)), *getattr(self, "__dict__", {})):
+            name = lazy_fields.get(name, name)
+
+            try:
+                fields[name] = getattr(self, name)
+
+            except AttributeError:
+                pass
+
         return fields
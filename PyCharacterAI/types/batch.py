@@ -0,0 +1,249 @@
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import compress, repeat
+from operator import eq
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union, overload
+
+from .base import parse_time
+from .message import Turn
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_microseconds(value: Any) -> int:
+    value = parse_time(value)
+
+    if not isinstance(value, datetime):
+        return TurnBatch.NO_TIME
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class ColumnView(Sequence):
+    # Read-only view of one column of a TurnBatch, nothing is copied
+    __slots__ = ("__data", "__selection")
+
+    def __init__(self, data: Sequence, selection: Sequence[int]):
+        self.__data = data
+        self.__selection = selection
+
+    def __len__(self) -> int:
+        return len(self.__selection)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ColumnView(self.__data, self.__selection[index])
+
+        return self.__data[self.__selection[index]]
+
+    def __iter__(self) -> Iterator:
+        # Goes over the indexes, so even a contiguous part of the column is not copied
+        return map(self.__data.__getitem__, self.__selection)
+
+    def to_list(self) -> List:
+        return list(self)
+
+
+class TurnBatch:
+    # Turns of a chat stored by columns (parallel arrays) instead of a Turn object per message.
+    # Slicing and filtering return new batches over the same columns: only the indexes are stored.
+    # Filters still go over every row of the batch, but without running Python code per row
+    # (compress() over map() of a comparison).
+
+    # create_times value for turns without (parsable) create_time
+    NO_TIME = -(2**63)
+
+    def __init__(self, chat_id: Optional[str] = None, keep_raw: bool = False):
+        self.chat_id = chat_id
+
+        self.__turn_ids: List[str] = []
+        self.__author_ids: List[str] = []
+        self.__author_names: List[str] = []
+        self.__primary_candidate_ids: List[Optional[str]] = []
+        self.__texts: List[str] = []
+
+        # int8 flags and int64 microseconds since epoch (UTC)
+        self.__is_human = array("b")
+        self.__is_pinned = array("b")
+        self.__create_times = array("q")
+
+        # Raw turns, to convert rows back into exactly the same Turn objects.
+        # Off by default: keeping them costs more memory than all the columns together.
+        self.__raw: Optional[List[Dict]] = [] if keep_raw else None
+
+        self.__selection: Sequence[int] = range(0)
+
+    @classmethod
+    def from_raw(cls, raw_turns: Iterable[Dict], chat_id: Optional[str] = None, keep_raw: bool = False) -> "TurnBatch":
+        batch = cls(chat_id, keep_raw=keep_raw)
+        batch.extend_raw(raw_turns)
+
+        return batch
+
+    def __view(self, selection: Sequence[int]) -> "TurnBatch":
+        view = object.__new__(TurnBatch)
+        view.__dict__.update(self.__dict__)
+        view.__selection = selection
+
+        return view
+
+    def extend_raw(self, raw_turns: Iterable[Dict]) -> None:
+        if not isinstance(self.__selection, range) or len(self.__selection) != len(self.__turn_ids):
+            raise ValueError("Cannot extend a slice or a filtered batch.")
+
+        for raw_turn in raw_turns:
+            turn_key = raw_turn.get("turn_key", {})
+            author = raw_turn.get("author", {})
+            candidates = raw_turn.get("candidates", [])
+            primary_candidate_id = raw_turn.get("primary_candidate_id", None)
+
+            text = ""
+            for candidate in candidates:
+                if candidate.get("candidate_id", None) == primary_candidate_id:
+                    text = candidate.get("raw_content", "")
+                    break
+
+            if self.chat_id is None:
+                self.chat_id = turn_key.get("chat_id", None)
+
+            self.__turn_ids.append(turn_key.get("turn_id", ""))
+            self.__author_ids.append(author.get("author_id", ""))
+            self.__author_names.append(author.get("name", ""))
+            self.__primary_candidate_ids.append(primary_candidate_id)
+            self.__texts.append(text)
+
+            self.__is_human.append(1 if author.get("is_human", False) else 0)
+            self.__is_pinned.append(1 if raw_turn.get("is_pinned", False) else 0)
+            self.__create_times.append(_to_microseconds(raw_turn.get("create_time", None)))
+
+            if self.__raw is not None:
+                self.__raw.append(raw_turn)
+
+        self.__selection = range(len(self.__turn_ids))
+
+    def __len__(self) -> int:
+        return len(self.__selection)
+
+    @overload
+    def __getitem__(self, index: int) -> Turn: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TurnBatch": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Turn, "TurnBatch"]:
+        if isinstance(index, slice):
+            return self.__view(self.__selection[index])
+
+        return self.__get_turn(self.__selection[index])
+
+    def __iter__(self) -> Iterator[Turn]:
+        for row in self.__selection:
+            yield self.__get_turn(row)
+
+    # ================================================================== #
+    #                              Columns                               #
+    # ================================================================== #
+
+    @property
+    def turn_ids(self) -> ColumnView:
+        return ColumnView(self.__turn_ids, self.__selection)
+
+    @property
+    def author_ids(self) -> ColumnView:
+        return ColumnView(self.__author_ids, self.__selection)
+
+    @property
+    def author_names(self) -> ColumnView:
+        return ColumnView(self.__author_names, self.__selection)
+
+    @property
+    def texts(self) -> ColumnView:
+        return ColumnView(self.__texts, self.__selection)
+
+    @property
+    def is_human(self) -> ColumnView:
+        return ColumnView(self.__is_human, self.__selection)
+
+    @property
+    def is_pinned(self) -> ColumnView:
+        return ColumnView(self.__is_pinned, self.__selection)
+
+    @property
+    def create_times(self) -> ColumnView:
+        return ColumnView(self.__create_times, self.__selection)
+
+    # ================================================================== #
+    #                             Filtering                              #
+    # ================================================================== #
+
+    def __column(self, data: Sequence) -> Iterable:
+        selection = self.__selection
+
+        # A contiguous part of the batch: iterating over a slice is much faster than getting every item
+        if isinstance(selection, range) and selection.step == 1:
+            if selection.start == 0 and selection.stop == len(data):
+                return data
+
+            return data[selection.start : selection.stop]
+
+        return map(data.__getitem__, selection)
+
+    def where(self, mask: Iterable[Any]) -> "TurnBatch":
+        return self.__view(array("q", compress(self.__selection, mask)))
+
+    def filter_author(self, author_id: str) -> "TurnBatch":
+        return self.where(map(eq, self.__column(self.__author_ids), repeat(author_id)))
+
+    def filter_human(self, is_human: bool = True) -> "TurnBatch":
+        flag = 1 if is_human else 0
+        return self.where(map(eq, self.__column(self.__is_human), repeat(flag)))
+
+    def filter_pinned(self, is_pinned: bool = True) -> "TurnBatch":
+        flag = 1 if is_pinned else 0
+        return self.where(map(eq, self.__column(self.__is_pinned), repeat(flag)))
+
+    def filter_time(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> "TurnBatch":
+        # start <= create_time < end, turns without create_time are skipped
+        low = _to_microseconds(start) if start is not None else self.NO_TIME + 1
+        high = _to_microseconds(end) if end is not None else 2**63 - 1
+
+        # Membership in a range of ints is a comparison with its bounds
+        return self.where(map(range(low, high).__contains__, self.__column(self.__create_times)))
+
+    # ================================================================== #
+    #                             Conversion                             #
+    # ================================================================== #
+
+    def __get_turn(self, row: int) -> Turn:
+        if self.__raw is not None:
+            return Turn(self.__raw[row])
+
+        # Only what the columns have
+        primary_candidate_id = self.__primary_candidate_ids[row]
+        create_time = self.__create_times[row]
+
+        raw_turn: Dict[str, Any] = {
+            "turn_key": {"chat_id": self.chat_id, "turn_id": self.__turn_ids[row]},
+            "author": {
+                "author_id": self.__author_ids[row],
+                "name": self.__author_names[row],
+                "is_human": bool(self.__is_human[row]),
+            },
+            "candidates": [{"candidate_id": primary_candidate_id, "raw_content": self.__texts[row]}]
+            if primary_candidate_id is not None
+            else [],
+            "primary_candidate_id": primary_candidate_id,
+            "is_pinned": bool(self.__is_pinned[row]),
+        }
+
+        if create_time != self.NO_TIME:
+            raw_turn["create_time"] = (_EPOCH + create_time * _MICROSECOND).isoformat()
+
+        return Turn(raw_turn)
+
+    def to_turns(self) -> List[Turn]:
+        return list(self)
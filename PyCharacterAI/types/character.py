@@ -1,10 +1,26 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 from .media import Avatar
 from .base import BaseCAI
 
 
 class CharacterShort(BaseCAI):
+    __slots__ = (
+        "character_id",
+        "title",
+        "name",
+        "visibility",
+        "greeting",
+        "description",
+        "definition",
+        "upvotes",
+        "author_username",
+        "num_interactions",
+        "__avatar",
+    )
+
+    _lazy_fields = ("avatar",)
+
     def __init__(self, options: Dict):
         super().__init__(options)
 
@@ -26,14 +42,52 @@ class CharacterShort(BaseCAI):
         self.author_username: Optional[str] = options.get("user__username", None)
         self.num_interactions: Optional[str] = options.get("participant__num_interactions", None)
 
-        self.avatar: Optional[Avatar] = None
+        self.__avatar: Union[str, Avatar, None] = options.get("avatar_file_name", "")
+
+        if not self.LAZY:
+            self._materialize()
+
+    @property
+    def avatar(self) -> Optional[Avatar]:
+        if isinstance(self.__avatar, str):
+            self.__avatar = Avatar({"file_name": self.__avatar}) if self.__avatar else None
 
-        avatar_file_name = options.get("avatar_file_name", "")
-        if avatar_file_name != "":
-            self.avatar = Avatar({"file_name": avatar_file_name})
+        return self.__avatar
+
+    @avatar.setter
+    def avatar(self, value: Optional[Avatar]) -> None:
+        self.__avatar = value
 
 
 class Character(BaseCAI):
+    __slots__ = (
+        "character_id",
+        "title",
+        "name",
+        "visibility",
+        "greeting",
+        "description",
+        "definition",
+        "upvotes",
+        "author_username",
+        "num_interactions",
+        "__avatar",
+        "copyable",
+        "identifier",
+        "img_gen_enabled",
+        "base_img_prompt",
+        "img_prompt_regex",
+        "strip_img_prompt_from_msg",
+        "starter_prompts",
+        "comments_enabled",
+        "internal_id",
+        "voice_id",
+        "default_voice_id",
+        "songs",
+    )
+
+    _lazy_fields = ("avatar",)
+
     def __init__(self, options: Dict):
         super().__init__(options)
 
@@ -53,11 +107,7 @@ class Character(BaseCAI):
         self.author_username: Optional[str] = options.get("user__username", None)
         self.num_interactions: Optional[str] = options.get("participant__num_interactions", None)
 
-        self.avatar: Optional[Avatar] = None
-
-        avatar_file_name = options.get("avatar_file_name", "")
-        if avatar_file_name != "":
-            self.avatar = Avatar({"file_name": avatar_file_name})
+        self.__avatar: Union[str, Avatar, None] = options.get("avatar_file_name", "")
 
         self.copyable = options.get("copyable", False)
         self.identifier = options.get("identifier", "")
@@ -74,3 +124,17 @@ class Character(BaseCAI):
         self.voice_id = options.get("voice_id", "")
         self.default_voice_id = options.get("default_voice_id", "")
         self.songs = options.get("songs", [])
+
+        if not self.LAZY:
+            self._materialize()
+
+    @property
+    def avatar(self) -> Optional[Avatar]:
+        if isinstance(self.__avatar, str):
+            self.__avatar = Avatar({"file_name": self.__avatar}) if self.__avatar else None
+
+        return self.__avatar
+
+    @avatar.setter
+    def avatar(self, value: Optional[Avatar]) -> None:
+        self.__avatar = value
@@ -1,13 +1,15 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Union
 
 from .media import Avatar
-from .base import BaseCAI
+from .base import BaseCAI, parse_time
 from .message import Turn, HistoryMessage
 
 
 # Chat v2
 class Chat(BaseCAI):
+    _lazy_fields = ("create_time", "preview_turns", "character_avatar")
+
     def __init__(self, options: Dict):
         super().__init__(options)
 
@@ -15,15 +17,7 @@ class Chat(BaseCAI):
         self.character_id = options.get("character_id")
         self.creator_id = options.get("creator_id")
 
-        create_time = options.get("create_time")
-        if create_time:
-            try:
-                create_time = datetime.strptime(str(create_time), "%Y-%m-%dT%H:%M:%S.%fZ")
-
-            except ValueError:
-                pass
-
-        self.create_time: Optional[datetime] = create_time
+        self.__create_time: Any = options.get("create_time")
 
         self.state = options.get("state")
         self.chat_type = options.get("type")
@@ -31,18 +25,52 @@ class Chat(BaseCAI):
         visibility = options.get("visibility", "public")
         self.visibility = visibility.lower()
 
-        turns = options.get("preview_turns", [])
-        self.preview_turns: List[Turn] = [Turn(turn_options) for turn_options in turns]
+        # Raw turns until the first access
+        self.__preview_turns: Union[List[Dict], List[Turn]] = options.get("preview_turns", [])
 
         self.chat_name: Optional[str] = options.get("name", None)
 
         # Some character information:
         self.character_name: Optional[str] = options.get("character_name", None)
-        self.character_avatar: Optional[Avatar] = None
+        self.__character_avatar: Union[str, Avatar, None] = options.get("character_avatar_uri", "")
+
+        if not self.LAZY:
+            self._materialize()
+
+    @property
+    def create_time(self) -> Optional[datetime]:
+        if isinstance(self.__create_time, str):
+            self.__create_time = parse_time(self.__create_time)
+
+        return self.__create_time
+
+    @create_time.setter
+    def create_time(self, value: Optional[datetime]) -> None:
+        self.__create_time = value
+
+    @property
+    def preview_turns(self) -> List[Turn]:
+        if self.__preview_turns and isinstance(self.__preview_turns[0], dict):
+            self.__preview_turns = [Turn(turn_options) for turn_options in self.__preview_turns]
 
-        avatar_file_name = options.get("character_avatar_uri", "")
-        if avatar_file_name != "":
-            self.character_avatar = Avatar({"file_name": avatar_file_name})
+        return self.__preview_turns
+
+    @preview_turns.setter
+    def preview_turns(self, value: List[Turn]) -> None:
+        self.__preview_turns = value
+
+    @property
+    def character_avatar(self) -> Optional[Avatar]:
+        if isinstance(self.__character_avatar, str):
+            self.__character_avatar = (
+                Avatar({"file_name": self.__character_avatar}) if self.__character_avatar else None
+            )
+
+        return self.__character_avatar
+
+    @character_avatar.setter
+    def character_avatar(self, value: Optional[Avatar]) -> None:
+        self.__character_avatar = value
 
 
 # Chat v1
@@ -52,25 +80,9 @@ class ChatHistory(BaseCAI):
 
         self.chat_id = options.get("external_id")
 
-        create_time = options.get("created")
-        if create_time:
-            try:
-                create_time = datetime.strptime(str(create_time), "%Y-%m-%dT%H:%M:%S.%fZ")
-
-            except ValueError:
-                pass
-
-        self.create_time: Optional[datetime] = create_time
-
-        last_interaction = options.get("last_interaction")
-        if last_interaction:
-            try:
-                last_interaction = datetime.strptime(str(last_interaction), "%Y-%m-%dT%H:%M:%S.%fZ")
-
-            except ValueError:
-                pass
+        self.create_time: Optional[datetime] = parse_time(options.get("created"))
 
-        self.last_interaction: Optional[datetime] = last_interaction
+        self.last_interaction: Optional[datetime] = parse_time(options.get("last_interaction"))
 
         messages = options.get("msgs", [])
         self.preview_messages: List[HistoryMessage] = [HistoryMessage(message) for message in messages]
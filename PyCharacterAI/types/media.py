@@ -1,10 +1,12 @@
 from datetime import datetime
 from typing import Dict, Optional
 
-from .base import BaseCAI
+from .base import BaseCAI, parse_time
 
 
 class Avatar(BaseCAI):
+    __slots__ = ("__image_file_name",)
+
     def __init__(self, options: Dict):
         super().__init__(options)
 
@@ -41,12 +43,4 @@ class Voice(BaseCAI):
 
         self.internal_status = options.get("internalStatus", "active")
 
-        last_update_time = options.get("lastUpdateTime", None)
-        if last_update_time:
-            try:
-                last_update_time = datetime.strptime(str(last_update_time), "%Y-%m-%dT%H:%M:%S.%fZ")
-
-            except ValueError:
-                pass
-
-        self.last_update_time: Optional[datetime] = last_update_time
+        self.last_update_time: Optional[datetime] = parse_time(options.get("lastUpdateTime", None))
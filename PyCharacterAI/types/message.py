@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Union
 
-from .base import BaseCAI
+from .base import BaseCAI, parse_time
 
 
 # Chat v1
@@ -20,6 +20,18 @@ class HistoryMessage(BaseCAI):
 
 # Chat v2
 class TurnCandidate(BaseCAI):
+    __slots__ = (
+        "candidate_id",
+        "text",
+        "delta",
+        "is_rewrite",
+        "is_final",
+        "is_filtered",
+        "__create_time",
+    )
+
+    _lazy_fields = ("create_time",)
+
     def __init__(self, options: Dict):
         super().__init__(options)
 
@@ -28,18 +40,58 @@ class TurnCandidate(BaseCAI):
         self.is_final = options.get("is_final", False)
         self.is_filtered = options.get("safety_truncated", False)
 
-        create_time = options.get("create_time")
-        if create_time:
-            try:
-                create_time = datetime.strptime(str(create_time), "%Y-%m-%dT%H:%M:%S.%fZ")
+        # Text added by the latest update (see Turn.apply_update), for a new candidate it's the whole text
+        self.delta: str = self.text
+        # The latest update has replaced the text instead of adding to it: delta is the whole new text
+        self.is_rewrite: bool = False
+
+        self.__create_time: Any = options.get("create_time")
+
+        if not self.LAZY:
+            self._materialize()
 
-            except ValueError:
-                pass
+    def apply_update(self, options: Dict) -> None:
+        self._set_raw(options)
 
-        self.create_time: Optional[datetime] = create_time
+        text = options.get("raw_content", "")
+
+        # Normally the text only grows, but it may also be rewritten (e.g. truncated by the filter)
+        self.is_rewrite = not text.startswith(self.text)
+        self.delta = text if self.is_rewrite else text[len(self.text) :]
+        self.text = text
+
+        self.is_final = options.get("is_final", False)
+        self.is_filtered = options.get("safety_truncated", False)
+
+    @property
+    def create_time(self) -> Optional[datetime]:
+        if isinstance(self.__create_time, str):
+            self.__create_time = parse_time(self.__create_time)
+
+        return self.__create_time
+
+    @create_time.setter
+    def create_time(self, value: Optional[datetime]) -> None:
+        self.__create_time = value
 
 
 class Turn(BaseCAI):
+    __slots__ = (
+        "chat_id",
+        "turn_id",
+        "__create_time",
+        "__last_update_time",
+        "state",
+        "author_id",
+        "author_name",
+        "author_is_human",
+        "__candidates",
+        "primary_candidate_id",
+        "_primary_candidate",
+    )
+
+    _lazy_fields = ("create_time", "last_update_time", "candidates")
+
     def __init__(self, options: Dict):
         super().__init__(options)
 
@@ -48,25 +100,8 @@ class Turn(BaseCAI):
         self.chat_id = turn_key["chat_id"]
         self.turn_id = turn_key["turn_id"]
 
-        create_time = options.get("create_time", None)
-        if create_time:
-            try:
-                create_time = datetime.strptime(str(create_time), "%Y-%m-%dT%H:%M:%S.%fZ")
-
-            except ValueError:
-                pass
-
-        self.create_time: Optional[datetime] = create_time
-
-        last_update_time = options.get("last_update_time", None)
-        if last_update_time:
-            try:
-                last_update_time = datetime.strptime(str(last_update_time), "%Y-%m-%dT%H:%M:%S.%fZ")
-
-            except ValueError:
-                pass
-
-        self.last_update_time: Optional[datetime] = last_update_time
+        self.__create_time: Any = options.get("create_time", None)
+        self.__last_update_time: Any = options.get("last_update_time", None)
 
         self.state = options.get("state")
 
@@ -75,18 +110,136 @@ class Turn(BaseCAI):
         self.author_name = author.get("name", "")
         self.author_is_human = author.get("is_human", False)
 
-        self.candidates: Dict[str, TurnCandidate] = {}
+        # Raw candidates until the first access
+        self.__candidates: Union[List[Dict], Dict[str, TurnCandidate]] = options.get("candidates", [])
+
+        self.primary_candidate_id: Optional[str] = options.get("primary_candidate_id")
+
+        # In lazy mode, the primary candidate can be parsed without the others
+        self._primary_candidate: Optional[TurnCandidate] = None
+
+        if not self.LAZY:
+            self._materialize()
+
+    @property
+    def create_time(self) -> Optional[datetime]:
+        if isinstance(self.__create_time, str):
+            self.__create_time = parse_time(self.__create_time)
+
+        return self.__create_time
+
+    @create_time.setter
+    def create_time(self, value: Optional[datetime]) -> None:
+        self.__create_time = value
+
+    @property
+    def last_update_time(self) -> Optional[datetime]:
+        if isinstance(self.__last_update_time, str):
+            self.__last_update_time = parse_time(self.__last_update_time)
+
+        return self.__last_update_time
+
+    @last_update_time.setter
+    def last_update_time(self, value: Optional[datetime]) -> None:
+        self.__last_update_time = value
+
+    @property
+    def candidates(self) -> Dict[str, TurnCandidate]:
+        if isinstance(self.__candidates, list):
+            candidates = {}
+
+            for raw_candidate in self.__candidates:
+                candidate = self._primary_candidate
+
+                if candidate is None or candidate.candidate_id != raw_candidate.get("candidate_id"):
+                    candidate = TurnCandidate(raw_candidate)
+
+                candidates[candidate.candidate_id] = candidate
+
+            self.__candidates = candidates
+            self._primary_candidate = None
+
+        return self.__candidates
+
+    @candidates.setter
+    def candidates(self, value: Dict[str, TurnCandidate]) -> None:
+        self.__candidates = value
+        self._primary_candidate = None
+
+    def apply_update(self, options: Dict) -> None:
+        # Applies a newer state of the same turn (e.g. "update_turn" frame while streaming)
+        # to this object, instead of creating a new one
+        self._set_raw(options)
+
+        self.__last_update_time = options.get("last_update_time", None)
+        self.state = options.get("state")
+        self.primary_candidate_id = options.get("primary_candidate_id")
+
+        candidates = self.candidates
+        updated = set()
 
         for raw_candidate in options.get("candidates", []):
-            candidate = TurnCandidate(raw_candidate)
-            self.candidates[candidate.candidate_id] = candidate
+            candidate_id = raw_candidate["candidate_id"]
+            candidate = candidates.get(candidate_id, None)
 
-        self.primary_candidate_id: Optional[str] = options.get("primary_candidate_id")
+            if candidate is None:
+                candidates[candidate_id] = TurnCandidate(raw_candidate)
+
+            else:
+                candidate.apply_update(raw_candidate)
+
+            updated.add(candidate_id)
+
+        # Nothing was added to the rest
+        for candidate_id, candidate in candidates.items():
+            if candidate_id not in updated:
+                candidate.delta = ""
+                candidate.is_rewrite = False
+
+        if not self.LAZY:
+            self._materialize()
 
     def get_candidates(self) -> List[TurnCandidate]:
         return list(self.candidates.values())
 
     def get_primary_candidate(self) -> Optional[TurnCandidate]:
-        if self.primary_candidate_id:
-            return self.candidates.get(self.primary_candidate_id)
-        return None
+        if not self.primary_candidate_id:
+            return None
+
+        if isinstance(self.__candidates, dict):
+            return self.__candidates.get(self.primary_candidate_id)
+
+        if self._primary_candidate is None:
+            for raw_candidate in self.__candidates:
+                if raw_candidate.get("candidate_id") == self.primary_candidate_id:
+                    self._primary_candidate = TurnCandidate(raw_candidate)
+                    break
+
+        return self._primary_candidate
+
+
+class TurnDelta:
+    # Piece of a streamed response (see send_message(delta_only=True)):
+    # only the text that has been added since the previous piece
+    __slots__ = ("turn_id", "candidate_id", "text", "is_final", "is_rewrite", "turn")
+
+    def __init__(
+        self,
+        turn_id: str,
+        candidate_id: str,
+        text: str,
+        is_final: bool = False,
+        is_rewrite: bool = False,
+        turn: Optional[Turn] = None,
+    ):
+        self.turn_id = turn_id
+        self.candidate_id = candidate_id
+        self.text = text
+
+        self.is_final = is_final
+        # The text was rewritten (e.g. truncated by the filter): `text` is the whole new text,
+        # and what was received before has to be discarded
+        self.is_rewrite = is_rewrite
+
+        # The complete Turn, only in the final piece
+        self.turn = turn
@@ -0,0 +1,122 @@
+# fetch_chats() for many characters: a request per character in a loop (as before),
+# fetch_chats() with a list of character ids (concurrent requests, one per character)
+# and the same with batch_size (several ids in one request).
+#
+# The network is simulated: every request takes `latency` seconds, and the simulated endpoint
+# answers for every id of a multi-id request. Whether the real endpoint does is not known,
+# so the batch_size numbers only show what batching would save if it does.
+#
+#     PYTHONPATH=. python benchmarks/fetch_chats.py [number of characters] [latency in ms] [multi_id|single_id]
+#
+# single_id simulates an endpoint that rejects several ids in one request (400),
+# to measure the fallback to a request per character.
+
+import sys
+import json
+import time
+import asyncio
+
+from urllib.parse import parse_qs, urlparse
+
+from PyCharacterAI import Client
+
+
+class Headers(dict):
+    # Like curl_cffi's Headers
+    def multi_items(self) -> list:
+        return list(self.items())
+
+
+class Response:
+    def __init__(self, status_code: int, content: bytes):
+        self.status_code = status_code
+        self.content = content
+        self.headers = Headers()
+        self.charset_encoding = None
+
+
+class SimulatedSession:
+    def __init__(self, latency: float, multi_id: bool):
+        self.latency = latency
+        self.multi_id = multi_id
+        self.requests = 0
+
+    async def get(self, url: str, **kwargs) -> Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+        character_ids = parse_qs(urlparse(url).query)["character_ids"][0].split(",")
+
+        if len(character_ids) > 1 and not self.multi_id:
+            return Response(400, b"{}")
+
+        chats = [
+            {"chat_id": f"{character_id}-{index}", "character_id": character_id}
+            for character_id in character_ids
+            for index in range(3)
+        ]
+        return Response(200, json.dumps({"chats": chats}).encode())
+
+    async def close(self) -> None:
+        pass
+
+
+def make_client(session: SimulatedSession) -> Client:
+    client = Client()
+    client.set_token("token")
+    client._get_requester()._Requester__requester_session = session
+
+    return client
+
+
+async def per_character_loop(character_ids: list, session: SimulatedSession) -> int:
+    client = make_client(session)
+    chats = {}
+
+    for character_id in character_ids:
+        chats[character_id] = await client.chat.fetch_chats(character_id)
+
+    return sum(len(value) for value in chats.values())
+
+
+async def concurrent(character_ids: list, session: SimulatedSession) -> int:
+    client = make_client(session)
+    chats = await client.chat.fetch_chats(character_ids)
+
+    return sum(len(value) for value in chats.values())
+
+
+async def batched(character_ids: list, session: SimulatedSession) -> int:
+    client = make_client(session)
+    chats = await client.chat.fetch_chats(character_ids, batch_size=20)
+
+    return sum(len(value) for value in chats.values())
+
+
+def main() -> None:
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 80.0) / 1000
+    multi_id = (sys.argv[3] if len(sys.argv) > 3 else "multi_id") == "multi_id"
+
+    character_ids = [f"character-{index}" for index in range(amount)]
+
+    print(f"{amount} characters, {latency * 1000:.0f} ms per request, {'multi' if multi_id else 'single'} id endpoint")
+
+    runs = [
+        ("per-character loop", per_character_loop),
+        ("fetch_chats(list)", concurrent),
+        ("batch_size=20", batched),
+    ]
+
+    for name, run in runs:
+        session = SimulatedSession(latency, multi_id)
+
+        started = time.perf_counter()
+        chats = asyncio.run(run(character_ids, session))
+        elapsed = time.perf_counter() - started
+
+        print(f"{name:<20} {elapsed:>7.3f} s  {session.requests:>4} requests  {chats} chats")
+
+
+if __name__ == "__main__":
+    main()
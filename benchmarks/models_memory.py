@@ -0,0 +1,106 @@
+# Memory taken by Turn objects, e.g. after fetch_all_messages() of a long chat.
+#
+#     PYTHONPATH=. python benchmarks/models_memory.py [number of turns]
+
+import gc
+import sys
+import uuid
+import tracemalloc
+
+from PyCharacterAI.types import Turn, TurnCandidate
+
+
+def make_payload(index: int) -> dict:
+    turn_id = str(uuid.uuid4())
+    candidate_ids = [str(uuid.uuid4()) for _ in range(2)]
+
+    return {
+        "turn_key": {"chat_id": "00000000-0000-0000-0000-000000000000", "turn_id": turn_id},
+        "create_time": "2024-05-01T12:00:00.123456Z",
+        "last_update_time": "2024-05-01T12:00:01.123456Z",
+        "state": "STATE_OK",
+        "author": {"author_id": str(index % 2), "is_human": index % 2 == 0, "name": "Author"},
+        "candidates": [
+            {
+                "candidate_id": candidate_id,
+                "create_time": "2024-05-01T12:00:00.123456Z",
+                "raw_content": f"Message number {index}, " + "lorem ipsum " * 10,
+                "is_final": True,
+            }
+            for candidate_id in candidate_ids
+        ],
+        "primary_candidate_id": candidate_ids[0],
+    }
+
+
+class DictModel:
+    # The same fields in a regular __dict__ plus the raw payload, like models were stored before __slots__
+    def __init__(self, model, raw):
+        self.__dict__.update(model.get_dict())
+        self._BaseCAI__raw = raw
+
+
+def measure(amount: int, build) -> float:
+    gc.collect()
+    tracemalloc.start()
+
+    # Payloads are traced too: they stay in memory as long as the models refer to them
+    payloads = [make_payload(index) for index in range(amount)]
+    models = build(payloads)
+    # Only the models are kept, as after fetch_all_messages()
+    del payloads
+    gc.collect()
+
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del models
+    return size / amount
+
+
+def build_dict_models(payloads):
+    models = []
+
+    for payload in payloads:
+        turn = Turn(payload)
+        turn.candidates = {
+            candidate_id: DictModel(candidate, candidate.get_dict(raw=True))
+            for candidate_id, candidate in turn.candidates.items()
+        }
+        models.append(DictModel(turn, payload))
+
+    return models
+
+
+def build_models(keep_raw: bool):
+    def build(payloads):
+        Turn.KEEP_RAW = keep_raw
+        TurnCandidate.KEEP_RAW = keep_raw
+
+        try:
+            return [Turn(payload) for payload in payloads]
+
+        finally:
+            Turn.KEEP_RAW = True
+            TurnCandidate.KEEP_RAW = True
+
+    return build
+
+
+def main() -> None:
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    results = [
+        ("dict-based (previous layout)", measure(amount, build_dict_models)),
+        ("__slots__", measure(amount, build_models(keep_raw=True))),
+        ("__slots__, KEEP_RAW = False", measure(amount, build_models(keep_raw=False))),
+    ]
+
+    print(f"{amount} turns, 2 candidates each")
+
+    for name, per_turn in results:
+        print(f"{name:<32} {per_turn:>8.0f} bytes per turn  {per_turn * amount / 1024 / 1024:>8.2f} MiB total")
+
+
+if __name__ == "__main__":
+    main()
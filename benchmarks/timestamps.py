@@ -0,0 +1,66 @@
+# Parsing of timestamps of a long chat history (fetch_all_messages):
+# the old strptime() code against parse_time().
+#
+#     PYTHONPATH=. python benchmarks/timestamps.py [number of turns]
+
+import sys
+import time
+
+from datetime import datetime, timedelta
+
+from PyCharacterAI.types.base import parse_time
+
+
+def strptime_parse(value):
+    # As it was done in every model before
+    if value:
+        try:
+            value = datetime.strptime(str(value), "%Y-%m-%dT%H:%M:%S.%fZ")
+
+        except ValueError:
+            pass
+
+    return value
+
+
+def make_timestamps(amount: int) -> list:
+    # create_time and last_update_time of every turn, and create_time of its 2 candidates
+    started = datetime(2024, 5, 1, 12, 0, 0)
+    timestamps = []
+
+    for index in range(amount):
+        create_time = (started + timedelta(seconds=index * 7, microseconds=index)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        update_time = (started + timedelta(seconds=index * 7 + 3)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+        timestamps += [create_time, update_time, create_time, create_time]
+
+    return timestamps
+
+
+def measure(parse, timestamps: list) -> float:
+    started = time.perf_counter()
+
+    for timestamp in timestamps:
+        parse(timestamp)
+
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    timestamps = make_timestamps(amount)
+
+    # The same turn over and over again, like the updates of a streamed answer
+    streaming = [timestamps[0]] * len(timestamps)
+
+    print(f"{amount} turns, {len(timestamps)} timestamps")
+
+    for name, values in (("history", timestamps), ("streaming", streaming)):
+        old = measure(strptime_parse, values)
+        new = measure(parse_time, values)
+
+        print(f"{name:<10} strptime: {old * 1000:>8.1f} ms  parse_time: {new * 1000:>8.1f} ms  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Building and serializing the create_and_generate_turn command of send_message():
+# a nested dict + json.dumps() for every message (as before) against the pre-serialized template.
+#
+#     PYTHONPATH=. python benchmarks/ws_commands.py [number of messages]
+
+import sys
+import json
+import time
+import uuid
+
+from PyCharacterAI import commands
+
+
+def build_dict(request_id: str, chat_id: str, turn_id: str, candidate_id: str, text: str) -> str:
+    message = {
+        "command": "create_and_generate_turn",
+        "origin_id": "web-next",
+        "payload": {
+            "character_id": "character_id",
+            "num_candidates": 1,
+            "previous_annotations": dict(commands._PREVIOUS_ANNOTATIONS),
+            "selected_language": "",
+            "tts_enabled": False,
+            "turn": {
+                "author": {"author_id": "123456", "is_human": True, "name": ""},
+                "candidates": [{"candidate_id": candidate_id, "raw_content": text}],
+                "primary_candidate_id": candidate_id,
+                "turn_key": {"chat_id": chat_id, "turn_id": turn_id},
+            },
+            "user_name": "",
+        },
+        "request_id": request_id,
+    }
+
+    return json.dumps(message, separators=(",", ":"))
+
+
+def build_template(request_id: str, chat_id: str, turn_id: str, candidate_id: str, text: str) -> str:
+    return commands.CREATE_AND_GENERATE_TURN.render(
+        request_id,
+        chat_id=chat_id,
+        character_id="character_id",
+        author_id="123456",
+        candidate_id=candidate_id,
+        text=text,
+        turn_id=turn_id,
+    ).data
+
+
+def main() -> None:
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    ids = [str(uuid.uuid4()) for _ in range(4)]
+    text = "Hello! How are you doing today?"
+
+    assert build_dict(*ids, text) == build_template(*ids, text)
+
+    print(f"{amount} messages")
+
+    for name, build in [("dict + json.dumps", build_dict), ("template", build_template)]:
+        started = time.perf_counter()
+
+        for _ in range(amount):
+            build(*ids, text)
+
+        elapsed = time.perf_counter() - started
+        print(f"{name:<20} {elapsed:>7.3f} s  {elapsed / amount * 1e6:>6.2f} us per message")
+
+
+if __name__ == "__main__":
+    main()
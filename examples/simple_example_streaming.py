@@ -22,17 +22,25 @@ async def main():
             # NOTE: input() is blocking function!
             message = input(f"[{me.name}]: ")
 
-            answer = await client.chat.send_message(character_id, chat.chat_id, message, streaming=True)
+            # incremental=True: the same message object is updated by every part of the answer,
+            # and candidate.delta is the text that has just been added
+            answer = await client.chat.send_message(
+                character_id, chat.chat_id, message, streaming=True, incremental=True
+            )
 
-            printed_length = 0
+            author_printed = False
             async for message in answer:
-                if printed_length == 0:
+                if not author_printed:
                     print(f"[{message.author_name}]: ", end="")
+                    author_printed = True
 
-                text = message.get_primary_candidate().text
-                print(text[printed_length:], end="")
+                candidate = message.get_primary_candidate()
 
-                printed_length = len(text)
+                # The text may also be replaced (e.g. truncated by the filter), then delta is the whole new text
+                if candidate.is_rewrite:
+                    print(f"\n[{message.author_name}]: ", end="")
+
+                print(candidate.delta, end="")
             print("\n")
 
     except SessionClosedError:
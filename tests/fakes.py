@@ -0,0 +1,215 @@
+import json
+import asyncio
+
+from contextlib import aclosing
+from urllib.parse import parse_qs, urlparse
+
+from typing import Any, Callable, Dict, List, Optional
+
+import curl_cffi
+
+from PyCharacterAI import Client
+from PyCharacterAI.requester import Requester
+
+
+class FakeWebSocket:
+    # Stands in for curl_cffi.AsyncWebSocket: every sent command goes to `responder`,
+    # and the frames it returns are received in order. Frames can also be pushed by the test.
+    def __init__(self, responder: Optional[Callable[[Dict], List[Any]]] = None):
+        self.responder = responder
+        self.sent: List[Dict] = []
+        self.closed = False
+
+        self.__inbox: asyncio.Queue = asyncio.Queue()
+
+    def push(self, frame: Any) -> None:
+        # A dict is sent as JSON, an exception is raised by recv()
+        self.__inbox.put_nowait(frame)
+
+    def drop(self) -> None:
+        self.push(curl_cffi.WebSocketError("connection lost"))
+
+    async def send_json(self, message: Dict) -> None:
+        if self.closed:
+            raise curl_cffi.WebSocketError("closed")
+
+        self.sent.append(message)
+
+        for frame in self.responder(message) if self.responder else []:
+            self.push(frame)
+
+    async def send_str(self, data: str) -> None:
+        await self.send_json(json.loads(data))
+
+    async def recv(self):
+        frame = await self.__inbox.get()
+
+        if isinstance(frame, BaseException):
+            raise frame
+
+        return json.dumps(frame).encode(), 1
+
+    async def ping(self, payload: bytes) -> None:
+        if self.closed:
+            raise curl_cffi.WebSocketError("closed")
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeHeaders(dict):
+    def multi_items(self) -> List:
+        return list(self.items())
+
+
+class FakeResponse:
+    # Stands in for curl_cffi.Response
+    def __init__(self, status_code: int = 200, body: Any = None, headers: Optional[Dict] = None):
+        self.status_code = status_code
+        self.content = json.dumps(body if body is not None else {}).encode()
+        self.headers = FakeHeaders(headers or {})
+        self.charset_encoding = None
+
+
+class FakeSession:
+    # Http requests go to `handler(method, url, kwargs)`, which can be a coroutine function
+    def __init__(
+        self,
+        responder: Optional[Callable[[Dict], List[Any]]] = None,
+        handler: Optional[Callable[[str, str, Dict], Any]] = None,
+    ):
+        self.responder = responder
+        self.handler = handler
+
+        self.sockets: List[FakeWebSocket] = []
+        self.requests: List[tuple] = []
+
+    async def ws_connect(self, url: str, **kwargs) -> FakeWebSocket:
+        ws = FakeWebSocket(self.responder)
+        self.sockets.append(ws)
+
+        return ws
+
+    async def __request(self, method: str, url: str, **kwargs) -> FakeResponse:
+        self.requests.append((method, url))
+
+        response = self.handler(method, url, kwargs) if self.handler else FakeResponse()
+        if asyncio.iscoroutine(response):
+            response = await response
+
+        return response
+
+    async def get(self, url: str, **kwargs) -> FakeResponse:
+        return await self.__request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> FakeResponse:
+        return await self.__request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> FakeResponse:
+        return await self.__request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> FakeResponse:
+        return await self.__request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> FakeResponse:
+        return await self.__request("DELETE", url, **kwargs)
+
+    async def close(self) -> None:
+        pass
+
+
+def make_requester(
+    responder: Optional[Callable[[Dict], List[Any]]] = None,
+    handler: Optional[Callable[[str, str, Dict], Any]] = None,
+    **kwargs,
+) -> tuple:
+    kwargs.setdefault("ws_ping_interval", None)
+    kwargs.setdefault("ws_idle_timeout", None)
+    kwargs.setdefault("ws_reconnect_backoff", 0)
+
+    requester = Requester(**kwargs)
+
+    session = FakeSession(responder, handler)
+    requester._Requester__requester_session = session
+
+    return requester, session
+
+
+def make_client(
+    responder: Optional[Callable[[Dict], List[Any]]] = None,
+    handler: Optional[Callable[[str, str, Dict], Any]] = None,
+    **kwargs,
+) -> tuple:
+    kwargs.setdefault("ws_ping_interval", None)
+    kwargs.setdefault("ws_idle_timeout", None)
+    kwargs.setdefault("ws_reconnect_backoff", 0)
+
+    client = Client(**kwargs)
+    client.set_token("token")
+    client.set_account_id("account")
+
+    session = FakeSession(responder, handler)
+    client._get_requester()._Requester__requester_session = session
+
+    return client, session
+
+
+def turn_frame(
+    request_id: Optional[str],
+    text: str,
+    is_final: bool = False,
+    turn_id: str = "turn",
+    candidate_id: str = "candidate",
+    chat_id: str = "chat",
+) -> Dict:
+    frame = {
+        "command": "update_turn" if not is_final else "add_turn",
+        "turn": {
+            "turn_key": {"chat_id": chat_id, "turn_id": turn_id},
+            "author": {"author_id": "character", "is_human": False, "name": "Character"},
+            "candidates": [{"candidate_id": candidate_id, "raw_content": text, "is_final": is_final}],
+            "primary_candidate_id": candidate_id,
+        },
+    }
+
+    if request_id is not None:
+        frame["request_id"] = request_id
+
+    return frame
+
+
+def paged_handler(pages: List[List[Dict]], delay: float = 0.0) -> Callable:
+    # Handler for GET /turns/<chat_id>/: the first page has no next_token, the next ones are "page-1", "page-2"...
+    # and the last one has none. Requests past the last page get an empty page.
+    async def handler(method: str, url: str, kwargs: Dict) -> FakeResponse:
+        token = parse_qs(urlparse(url).query).get("next_token", ["page-0"])[0]
+        index = int(token.split("-")[1])
+
+        await asyncio.sleep(delay)
+
+        next_token = f"page-{index + 1}" if index + 1 < len(pages) else None
+        turns = pages[index] if index < len(pages) else []
+
+        return FakeResponse(200, {"turns": turns, "meta": {"next_token": next_token}})
+
+    return handler
+
+
+def raw_turn(turn_id: str, text: str = "", **fields: Any) -> Dict:
+    turn = turn_frame(None, text, is_final=True, turn_id=turn_id)["turn"]
+    turn.update(fields)
+
+    return turn
+
+
+async def collect(generator, until_final: bool = True) -> List[Dict]:
+    frames = []
+
+    async with aclosing(generator):
+        async for frame in generator:
+            frames.append(frame)
+
+            if until_final and frame and frame.get("turn", {}).get("candidates", [{}])[0].get("is_final", False):
+                break
+
+    return frames
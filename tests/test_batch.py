@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from PyCharacterAI.types import Turn, TurnBatch
+
+
+def raw_turn(index: int, create_time=None, **kwargs):
+    raw = {
+        "turn_key": {"chat_id": "chat", "turn_id": f"turn-{index}"},
+        "author": {"author_id": "user" if index % 2 == 0 else "character", "name": "Name", "is_human": index % 2 == 0},
+        "candidates": [
+            {"candidate_id": f"candidate-{index}", "raw_content": f"text {index}"},
+            {"candidate_id": "other", "raw_content": "other text"},
+        ],
+        "primary_candidate_id": f"candidate-{index}",
+        "is_pinned": index % 3 == 0,
+        "state": "STATE_OK",
+    }
+
+    if create_time is not None:
+        raw["create_time"] = create_time
+
+    raw.update(kwargs)
+    return raw
+
+
+@pytest.fixture
+def batch():
+    raw_turns = [raw_turn(index, f"2024-05-0{index + 1}T12:00:00.000000Z") for index in range(6)]
+    raw_turns.append(raw_turn(6))
+    raw_turns.append(raw_turn(7, "not a time"))
+
+    return TurnBatch.from_raw(raw_turns)
+
+
+def test_columns(batch):
+    assert len(batch) == 8
+    assert batch.chat_id == "chat"
+    assert batch.turn_ids[0] == "turn-0"
+    assert batch.texts.to_list()[:2] == ["text 0", "text 1"]
+    assert list(batch.is_human)[:3] == [1, 0, 1]
+    assert list(batch.is_pinned)[:4] == [1, 0, 0, 1]
+    assert batch.create_times[0] == int(datetime(2024, 5, 1, 12, tzinfo=timezone.utc).timestamp()) * 10**6
+    assert list(batch.create_times)[6:] == [TurnBatch.NO_TIME, TurnBatch.NO_TIME]
+
+
+def test_slicing(batch):
+    part = batch[2:5]
+
+    assert len(part) == 3
+    assert part.turn_ids.to_list() == ["turn-2", "turn-3", "turn-4"]
+    assert part.texts[1:].to_list() == ["text 3", "text 4"]
+    assert batch[::3].turn_ids.to_list() == ["turn-0", "turn-3", "turn-6"]
+    assert batch[-1].turn_id == "turn-7"
+    assert isinstance(part[0], Turn)
+
+
+def test_filters(batch):
+    assert batch.filter_human().turn_ids.to_list() == ["turn-0", "turn-2", "turn-4", "turn-6"]
+    assert batch.filter_human(False).filter_pinned().turn_ids.to_list() == ["turn-3"]
+    assert batch.filter_author("character").turn_ids.to_list() == ["turn-1", "turn-3", "turn-5", "turn-7"]
+    assert batch.where([True, False] * 4).turn_ids.to_list() == ["turn-0", "turn-2", "turn-4", "turn-6"]
+
+
+def test_filters_on_slices(batch):
+    # Contiguous and non-contiguous selections
+    assert batch[1:5].filter_human().turn_ids.to_list() == ["turn-2", "turn-4"]
+    assert batch[::2].filter_pinned().turn_ids.to_list() == ["turn-0", "turn-6"]
+    assert batch.filter_pinned()[1:].filter_author("character").turn_ids.to_list() == ["turn-3"]
+
+
+def test_filter_time_skips_turns_without_time(batch):
+    start = datetime(2024, 5, 2, tzinfo=timezone.utc)
+    end = datetime(2024, 5, 4, 12, tzinfo=timezone.utc)
+
+    assert batch.filter_time(start, end).turn_ids.to_list() == ["turn-1", "turn-2"]
+    assert batch.filter_time(start=start).turn_ids.to_list() == ["turn-1", "turn-2", "turn-3", "turn-4", "turn-5"]
+    assert len(batch.filter_time()) == 6
+
+
+def test_to_turns_without_raw(batch):
+    turns = batch[5:7].to_turns()
+
+    assert [turn.turn_id for turn in turns] == ["turn-5", "turn-6"]
+    assert turns[0].chat_id == "chat"
+    assert turns[0].author_id == "character"
+    assert turns[0].create_time == datetime(2024, 5, 6, 12, tzinfo=timezone.utc)
+    assert turns[0].get_primary_candidate().text == "text 5"
+    assert turns[1].create_time is None
+
+    # Only the columns are kept
+    assert list(turns[0].candidates) == ["candidate-5"]
+    assert turns[0].state is None
+
+
+def test_to_turns_with_raw():
+    raw_turns = [raw_turn(index, "2024-05-01T12:00:00.000000Z") for index in range(3)]
+    turns = TurnBatch.from_raw(raw_turns, keep_raw=True).filter_human().to_turns()
+
+    assert [turn.turn_id for turn in turns] == ["turn-0", "turn-2"]
+    assert list(turns[0].candidates) == ["candidate-0", "other"]
+    assert turns[0].state == "STATE_OK"
+
+
+def test_extend(batch):
+    batch.extend_raw([raw_turn(8)])
+    assert batch.turn_ids[-1] == "turn-8"
+
+    with pytest.raises(ValueError):
+        batch[1:].extend_raw([raw_turn(9)])
+
+    with pytest.raises(ValueError):
+        batch.filter_human().extend_raw([raw_turn(9)])
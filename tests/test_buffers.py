@@ -0,0 +1,54 @@
+import time
+import asyncio
+
+from PyCharacterAI.buffers import FrameBuffer
+
+
+def test_orphan_frames_are_taken_over_by_a_late_request():
+    buffer = FrameBuffer(orphan_ttl=10.0)
+
+    buffer.put("late", {"n": 1}, 10)
+    buffer.register("late")
+
+    assert asyncio.run(buffer.get("late")) == {"n": 1}
+    assert buffer.get_stats()["orphans"] == 0
+
+
+def test_expired_orphans_are_not_taken_over(monkeypatch):
+    buffer = FrameBuffer(orphan_ttl=1.0)
+    buffer.put("late", {"n": 1}, 10)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 5)
+
+    buffer.register("late")
+    stats = buffer.get_stats()
+
+    assert stats["buffered_frames"] == 0
+    assert stats["evicted_orphans"] == 1
+
+
+def test_request_limits_drop_the_oldest_frames():
+    buffer = FrameBuffer(max_request_frames=2)
+    buffer.register("request")
+
+    for index in range(5):
+        buffer.put("request", index, 1)
+
+    assert [asyncio.run(buffer.get("request")) for _ in range(2)] == [3, 4]
+    assert buffer.get_stats()["dropped_frames"] == 3
+
+
+def test_global_limits_evict_orphans_first():
+    buffer = FrameBuffer(max_total_frames=3)
+    buffer.register("request")
+
+    buffer.put("orphan", "o", 1)
+    for index in range(3):
+        buffer.put("request", index, 1)
+
+    stats = buffer.get_stats()
+
+    assert stats["orphans"] == 0
+    assert stats["buffered_frames"] == 3
+    assert stats["evicted_orphans"] == 1
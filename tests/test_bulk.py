@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from fakes import FakeResponse, make_client
+from PyCharacterAI.bulk import BulkResult, fetch_bulk
+from PyCharacterAI.exceptions import FetchError
+
+
+def test_results_and_errors_keep_order():
+    async def fetch(key: str) -> str:
+        if key.startswith("bad"):
+            raise ValueError(key)
+
+        await asyncio.sleep(0.01 if key == "a" else 0)
+        return key.upper()
+
+    result = asyncio.run(fetch_bulk(["a", "bad-1", "b", "a", "bad-2"], fetch))
+
+    assert list(result) == [("a", "A"), ("b", "B")]
+    assert list(result.errors) == ["bad-1", "bad-2"]
+    assert len(result) == 2
+    assert result["b"] == "B"
+    assert not result.ok
+
+    with pytest.raises(ValueError, match="bad-1"):
+        result.raise_for_errors()
+
+
+def test_concurrency_is_limited():
+    running = {"now": 0, "max": 0}
+
+    async def fetch(key: str) -> str:
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+
+        await asyncio.sleep(0.01)
+
+        running["now"] -= 1
+        return key
+
+    result = asyncio.run(fetch_bulk([str(index) for index in range(10)], fetch, max_concurrency=3))
+
+    assert result.ok
+    assert len(result) == 10
+    assert running["max"] == 3
+
+
+def test_cancellation_is_not_an_error():
+    async def fetch(key: str) -> str:
+        raise asyncio.CancelledError
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(fetch_bulk(["a"], fetch))
+
+
+def test_empty():
+    result = asyncio.run(fetch_bulk([], lambda key: None))
+
+    assert isinstance(result, BulkResult)
+    assert result.ok
+    assert list(result) == []
+
+
+def test_fetch_chats_by_id():
+    def handler(method, url, kwargs):
+        chat_id = url.rstrip("/").rsplit("/", 1)[1]
+
+        if chat_id == "missing":
+            return FakeResponse(404, {})
+
+        return FakeResponse(200, {"chat": {"chat_id": chat_id, "character_id": "character"}})
+
+    async def main():
+        client, session = make_client(handler=handler)
+        return await client.chat.fetch_chats_by_id(["first", "missing", "second", "first"]), session
+
+    result, session = asyncio.run(main())
+
+    assert [(chat_id, chat.chat_id) for chat_id, chat in result] == [("first", "first"), ("second", "second")]
+    assert isinstance(result.errors["missing"], FetchError)
+    assert len(session.requests) == 3
@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+import pytest
+
+from fakes import FakeResponse, make_requester
+from PyCharacterAI.cache import MemoryCache, ResponseCache, SQLiteCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCache(max_entries=2)
+        return
+
+    store = SQLiteCache(str(tmp_path / "cache.db"), max_entries=2)
+    # Every access counts for the LRU order
+    store.ACCESS_UPDATE_INTERVAL = 0.0
+
+    yield store
+    store.close()
+
+
+def test_entries_expire(store):
+    async def main():
+        await store.set("a", "value", ttl=0.05)
+        first = await store.get("a")
+
+        await asyncio.sleep(0.06)
+        return first, await store.get("a")
+
+    assert asyncio.run(main()) == ("value", None)
+
+
+def test_least_recently_used_entry_is_evicted(store):
+    async def main():
+        await store.set("a", 1, ttl=60)
+        await store.set("b", 2, ttl=60)
+
+        # "a" becomes the most recently used
+        time.sleep(0.01)
+        await store.get("a")
+
+        time.sleep(0.01)
+        await store.set("c", 3, ttl=60)
+
+        return [await store.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(main()) == [1, None, 3]
+    assert len(store) == 2
+    assert store.evicted == 1
+
+
+def test_invalidate_by_tag(store):
+    async def main():
+        await store.set("a", 1, ttl=60, tags=["chat:1", "user"])
+        await store.set("b", 2, ttl=60, tags=["chat:2"])
+
+        removed = await store.invalidate(["chat:1"])
+        return removed, await store.get("a"), await store.get("b")
+
+    assert asyncio.run(main()) == (1, None, 2)
+
+
+def test_clear(store):
+    async def main():
+        await store.set("a", 1, ttl=60)
+        await store.clear()
+        return await store.get("a")
+
+    assert asyncio.run(main()) is None
+    assert len(store) == 0
+
+
+def test_sqlite_cache_evicts_by_size(tmp_path):
+    async def main():
+        store = SQLiteCache(str(tmp_path / "cache.db"), max_bytes=1000)
+
+        await store.set("a", b"x" * 600, ttl=60)
+        time.sleep(0.01)
+        await store.set("b", b"x" * 600, ttl=60)
+
+        result = await store.get("a"), await store.get("b") is not None
+        store.close()
+        return result
+
+    assert asyncio.run(main()) == (None, True)
+
+
+def test_sqlite_cache_is_shared(tmp_path):
+    async def main():
+        path = str(tmp_path / "cache.db")
+        first, second = SQLiteCache(path), SQLiteCache(path)
+
+        await first.set("a", {"value": 1}, ttl=60)
+        result = await second.get("a")
+
+        first.close()
+        second.close()
+        return result
+
+    assert asyncio.run(main()) == {"value": 1}
+
+
+def test_generation_guard():
+    async def main():
+        cache = ResponseCache(ttls={"user": 60})
+
+        # The response was requested before the invalidation
+        generation = cache.generation
+        await cache.invalidate("user")
+
+        await cache.set("user", "a", "stale", generation=generation)
+        await cache.set("user", "b", "fresh", generation=cache.generation)
+
+        return await cache.get("user", "a"), await cache.get("user", "b")
+
+    assert asyncio.run(main()) == (None, "fresh")
+
+
+def test_uncacheable_endpoints():
+    cache = ResponseCache(ttls={"user": 0})
+
+    assert cache.is_cacheable("character_info")
+    assert not cache.is_cacheable("user")
+    assert not cache.is_cacheable("turns")
+    assert not cache.is_cacheable(None)
+
+
+def counting_handler():
+    async def handler(method, url, kwargs):
+        await asyncio.sleep(0.01)
+        return FakeResponse(200, {"items": [1, 2]})
+
+    return handler
+
+
+def test_cache_hits_do_not_share_parsed_json():
+    async def main():
+        requester, session = make_requester(handler=counting_handler(), cache=True)
+        options = {"cache": "character_info"}
+
+        first = await requester.request_async("https://host/a", options)
+        first.json()["items"].append(3)
+
+        second = await requester.request_async("https://host/a", options)
+        second.json()["items"].append(4)
+
+        third = await requester.request_async("https://host/a", options)
+        return third.json(), session, requester.get_cache_stats()
+
+    data, session, stats = asyncio.run(main())
+
+    assert data == {"items": [1, 2]}
+    assert len(session.requests) == 1
+    assert stats["endpoints"]["character_info"] == {"hits": 2, "misses": 1}
+
+
+def test_coalesced_callers_do_not_share_parsed_json():
+    async def main():
+        requester, session = make_requester(handler=counting_handler())
+
+        responses = await asyncio.gather(*[requester.request_async("https://host/a") for _ in range(3)])
+        responses[0].json()["items"].clear()
+
+        return [response.json() for response in responses[1:]], session
+
+    data, session = asyncio.run(main())
+
+    assert data == [{"items": [1, 2]}, {"items": [1, 2]}]
+    assert len(session.requests) == 1
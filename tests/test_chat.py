@@ -0,0 +1,49 @@
+import asyncio
+
+from fakes import FakeResponse, make_client, turn_frame
+from PyCharacterAI.cache import ResponseCache
+
+
+def test_pin_message_drops_cached_turns():
+    pinned = {"value": False}
+
+    def page():
+        frame = turn_frame(None, "Hello", is_final=True)["turn"]
+        return {**frame, "is_pinned": pinned["value"]}
+
+    def responder(message):
+        pinned["value"] = message["payload"]["is_pinned"]
+        return [{"command": "update_turn", "request_id": message["request_id"], "turn": page()}]
+
+    def handler(method, url, kwargs):
+        return FakeResponse(200, {"turns": [page()], "meta": {"next_token": None}})
+
+    async def main():
+        client, session = make_client(responder, handler, cache=ResponseCache(ttls={"turns": 30}))
+
+        before, _ = await client.chat.fetch_messages("chat", pinned_only=True)
+        assert await client.chat.pin_message("chat", "turn")
+        after, _ = await client.chat.fetch_messages("chat", pinned_only=True)
+
+        return before, after, session
+
+    before, after, session = asyncio.run(main())
+
+    assert before == []
+    assert [turn.turn_id for turn in after] == ["turn"]
+    assert len(session.requests) == 2
+
+
+def test_chat_turns_are_not_cached_by_default():
+    def handler(method, url, kwargs):
+        return FakeResponse(200, {"turns": [turn_frame(None, "Hello")["turn"]], "meta": {"next_token": None}})
+
+    async def main():
+        client, session = make_client(handler=handler, cache=True)
+
+        await client.chat.fetch_messages("chat")
+        await client.chat.fetch_messages("chat")
+
+        return session
+
+    assert len(asyncio.run(main()).requests) == 2
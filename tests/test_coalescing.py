@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from fakes import FakeResponse, make_requester
+from PyCharacterAI.exceptions import DeadlineExceededError
+
+
+def slow_handler(delay: float):
+    async def handler(method, url, kwargs):
+        await asyncio.sleep(delay)
+        return FakeResponse(200, {"url": url})
+
+    return handler
+
+
+def test_identical_requests_share_one_round_trip():
+    async def main():
+        requester, session = make_requester(handler=slow_handler(0.05))
+
+        responses = await asyncio.gather(*[requester.request_async("https://host/a") for _ in range(5)])
+        return responses, session, requester.get_coalesce_stats()
+
+    responses, session, stats = asyncio.run(main())
+
+    assert len(session.requests) == 1
+    assert all(response.json() == {"url": "https://host/a"} for response in responses)
+    assert stats == {"requests": 5, "coalesced": 4}
+
+
+def test_different_requests_are_not_coalesced():
+    async def main():
+        requester, session = make_requester(handler=slow_handler(0.01))
+
+        await asyncio.gather(requester.request_async("https://host/a"), requester.request_async("https://host/b"))
+        await asyncio.gather(
+            requester.request_async("https://host/a", {"method": "POST"}),
+            requester.request_async("https://host/a", {"method": "POST"}),
+        )
+        return session
+
+    session = asyncio.run(main())
+
+    assert len(session.requests) == 4
+
+
+def test_follower_keeps_its_own_deadline():
+    async def main():
+        requester, session = make_requester(handler=slow_handler(0.2))
+
+        leader = asyncio.create_task(requester.request_async("https://host/a"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(DeadlineExceededError):
+            await requester.request_async("https://host/a", {"timeout": 0.05})
+
+        return await leader, session
+
+    response, session = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert len(session.requests) == 1
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def main():
+        requester, session = make_requester(handler=slow_handler(0.05))
+
+        first = asyncio.create_task(requester.request_async("https://host/a"))
+        second = asyncio.create_task(requester.request_async("https://host/a"))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()).status_code == 200
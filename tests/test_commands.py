@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from fakes import make_client, turn_frame
+from PyCharacterAI import commands
+from PyCharacterAI.commands import WSCommand
+
+TEXTS = ["Hello", 'quotes " and \\ backslashes', "new\nline\ttab", "юникод 😀", "@@text@@", ""]
+
+
+def dumps(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+
+def message(command: str, payload: dict, request_id: str) -> dict:
+    return {"command": command, "origin_id": "web-next", "payload": payload, "request_id": request_id}
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_create_and_generate_turn(text):
+    rendered = commands.CREATE_AND_GENERATE_TURN.render(
+        "request",
+        chat_id="chat",
+        character_id="character",
+        author_id="author",
+        candidate_id="candidate",
+        text=text,
+        turn_id="turn",
+    )
+
+    payload = {
+        "character_id": "character",
+        "num_candidates": 1,
+        "previous_annotations": commands._PREVIOUS_ANNOTATIONS,
+        "selected_language": "",
+        "tts_enabled": False,
+        "turn": {
+            "author": {"author_id": "author", "is_human": True, "name": ""},
+            "candidates": [{"candidate_id": "candidate", "raw_content": text}],
+            "primary_candidate_id": "candidate",
+            "turn_key": {"chat_id": "chat", "turn_id": "turn"},
+        },
+        "user_name": "",
+    }
+
+    assert rendered.data == dumps(message("create_and_generate_turn", payload, "request"))
+    assert (rendered.command, rendered.request_id, rendered.chat_id) == ("create_and_generate_turn", "request", "chat")
+    assert rendered.to_dict()["payload"]["turn"]["candidates"][0]["raw_content"] == text
+
+
+def test_generate_turn_candidate():
+    rendered = commands.GENERATE_TURN_CANDIDATE.render(
+        "request", chat_id="chat", character_id="character", turn_id="turn"
+    )
+
+    payload = {
+        "character_id": "character",
+        "previous_annotations": commands._PREVIOUS_ANNOTATIONS,
+        "selected_language": "",
+        "tts_enabled": False,
+        "turn_key": {"chat_id": "chat", "turn_id": "turn"},
+        "user_name": "",
+    }
+
+    assert rendered.data == dumps(message("generate_turn_candidate", payload, "request"))
+
+
+@pytest.mark.parametrize("is_pinned", [True, False])
+def test_set_turn_pin(is_pinned):
+    rendered = commands.SET_TURN_PIN.render("request", chat_id="chat", turn_id="turn", is_pinned=is_pinned)
+    payload = {"is_pinned": is_pinned, "turn_key": {"chat_id": "chat", "turn_id": "turn"}}
+
+    assert rendered.data == dumps(message("set_turn_pin", payload, "request"))
+
+
+def test_remove_turns():
+    rendered = commands.REMOVE_TURNS.render("request", chat_id="chat", turn_ids=["a", 'b"c'])
+    payload = {"chat_id": "chat", "turn_ids": ["a", 'b"c']}
+
+    assert rendered.data == dumps(message("remove_turns", payload, "request"))
+
+
+def test_missing_field():
+    with pytest.raises(KeyError):
+        commands.SET_TURN_PIN.render("request", chat_id="chat", turn_id="turn")
+
+
+def test_send_message_sends_rendered_command():
+    def responder(sent):
+        return [turn_frame(sent["request_id"], "Hi", is_final=True)]
+
+    async def main():
+        client, session = make_client(responder)
+        await client.chat.send_message("character", "chat", 'Say "hi"')
+
+        return session.sockets[0].sent[0]
+
+    sent = asyncio.run(main())
+
+    assert sent["command"] == "create_and_generate_turn"
+    assert sent["payload"]["turn"]["candidates"][0]["raw_content"] == 'Say "hi"'
+    assert sent["payload"]["turn"]["turn_key"]["chat_id"] == "chat"
+    assert sent["payload"]["turn"]["author"]["author_id"] == "account"
+
+
+def test_ws_command_to_dict():
+    command = WSCommand("remove_turns", "request", "chat", '{"command":"remove_turns"}')
+    assert command.to_dict() == {"command": "remove_turns"}
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from fakes import FakeResponse, make_requester
+from PyCharacterAI.exceptions import DeadlineExceededError
+from PyCharacterAI.retry import RetryPolicy
+
+
+class SlowRetryPolicy(RetryPolicy):
+    def get_delay(self, attempt: int) -> float:
+        return 2.0
+
+
+def throttling_handler(retry_after: str):
+    def handler(method, url, kwargs):
+        return FakeResponse(429, {}, {"Retry-After": retry_after})
+
+    return handler
+
+
+def test_retry_after_longer_than_deadline_fails_at_once():
+    async def main():
+        requester, session = make_requester(handler=throttling_handler("2"))
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            await requester.request_async("https://host/a", {"method": "POST", "timeout": 0.3})
+
+        return time.monotonic() - started, session
+
+    elapsed, session = asyncio.run(main())
+
+    assert elapsed < 0.2
+    assert len(session.requests) == 1
+
+
+def test_paused_host_fails_at_once():
+    async def main():
+        requester, session = make_requester(handler=throttling_handler("2"), rate_limit_retries=0)
+
+        # The 429 is not repeated, but the host is paused for 2 seconds
+        await requester.request_async("https://host/a")
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            await requester.request_async("https://host/b", {"timeout": 0.3})
+
+        return time.monotonic() - started, session
+
+    elapsed, session = asyncio.run(main())
+
+    assert elapsed < 0.2
+    assert len(session.requests) == 1
+
+
+def test_retry_backoff_longer_than_deadline_fails_at_once():
+    async def main():
+        requester, session = make_requester(
+            handler=lambda method, url, kwargs: FakeResponse(502), retry_policy=SlowRetryPolicy()
+        )
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            await requester.request_async("https://host/a", {"timeout": 0.3})
+
+        return time.monotonic() - started, session
+
+    elapsed, session = asyncio.run(main())
+
+    assert elapsed < 0.2
+    assert len(session.requests) == 1
@@ -0,0 +1,133 @@
+import asyncio
+import gzip
+import json
+import os
+
+import pytest
+
+from fakes import FakeResponse, make_client, paged_handler, raw_turn
+from PyCharacterAI.exceptions import FetchError, InvalidArgumentError
+from PyCharacterAI.export import JSONLExporter
+
+PAGES = [[raw_turn("a", "Привет"), raw_turn("b")], [raw_turn("c"), raw_turn("d")], [raw_turn("e")]]
+
+
+def read_turn_ids(path: str, compressed: bool = False):
+    opener = gzip.open if compressed else open
+
+    with opener(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line)["turn_key"]["turn_id"] for line in file]
+
+
+def failing_handler(fail_on: str):
+    handler = paged_handler(PAGES)
+    failing = {"value": True}
+
+    async def flaky(method, url, kwargs):
+        if failing["value"] and fail_on in url:
+            return FakeResponse(500)
+
+        return await handler(method, url, kwargs)
+
+    return flaky, failing
+
+
+@pytest.mark.parametrize("export_format", ["jsonl", "jsonl.gz"])
+def test_export(tmp_path, export_format):
+    path = str(tmp_path / f"chat.{export_format}")
+
+    async def main():
+        client, _ = make_client(handler=paged_handler(PAGES))
+        return await client.chat.export_messages("chat", path, export_format)
+
+    assert asyncio.run(main()) == 5
+    assert read_turn_ids(path, compressed=export_format == "jsonl.gz") == ["a", "b", "c", "d", "e"]
+    assert not os.path.exists(path + ".checkpoint")
+
+
+def test_raw_turns_are_written_as_is(tmp_path):
+    path = str(tmp_path / "chat.jsonl")
+
+    async def main():
+        client, _ = make_client(handler=paged_handler(PAGES[:1]))
+        await client.chat.export_messages("chat", path)
+
+    asyncio.run(main())
+
+    with open(path, encoding="utf-8") as file:
+        assert json.loads(file.readline()) == PAGES[0][0]
+
+
+@pytest.mark.parametrize("export_format", ["jsonl", "jsonl.gz"])
+def test_interrupted_export_continues(tmp_path, export_format):
+    path = str(tmp_path / f"chat.{export_format}")
+    handler, failing = failing_handler("page-2")
+
+    async def main():
+        client, session = make_client(handler=handler)
+
+        with pytest.raises(FetchError):
+            await client.chat.export_messages("chat", path, export_format)
+
+        with open(path + ".checkpoint", encoding="utf-8") as file:
+            checkpoint = json.load(file)
+
+        failing["value"] = False
+        return checkpoint, await client.chat.export_messages("chat", path, export_format), session
+
+    checkpoint, turns, session = asyncio.run(main())
+
+    assert checkpoint["next_token"] == "page-2"
+    assert checkpoint["turns"] == 4
+    assert turns == 5
+    assert session.requests[-1][1].endswith("?next_token=page-2")
+    assert read_turn_ids(path, compressed=export_format == "jsonl.gz") == ["a", "b", "c", "d", "e"]
+    assert not os.path.exists(path + ".checkpoint")
+
+
+def test_incomplete_page_is_dropped(tmp_path):
+    path = str(tmp_path / "chat.jsonl")
+
+    exporter = JSONLExporter(path)
+    assert exporter.open() is None
+    exporter.write_page(PAGES[0], "page-1")
+
+    # Interrupted in the middle of the next page
+    with open(path, "ab") as file:
+        file.write(b'{"turn_key": {"tur')
+    exporter.close(complete=False)
+
+    exporter = JSONLExporter(path)
+    assert exporter.open() == "page-1"
+    exporter.write_page(PAGES[1], None)
+    exporter.close(complete=True)
+
+    assert read_turn_ids(path) == ["a", "b", "c", "d"]
+    assert exporter.turns == 4
+
+
+def test_export_chats(tmp_path):
+    handler, _ = failing_handler("/turns/broken/")
+
+    async def main():
+        client, _ = make_client(handler=handler)
+        return await client.chat.export_chats(["chat", "broken"], str(tmp_path), "jsonl.gz")
+
+    results = asyncio.run(main())
+
+    assert results["chat"] == 5
+    assert isinstance(results["broken"], FetchError)
+    assert read_turn_ids(str(tmp_path / "chat.jsonl.gz"), compressed=True) == ["a", "b", "c", "d", "e"]
+
+
+def test_unknown_format(tmp_path):
+    async def main():
+        client, _ = make_client(handler=paged_handler(PAGES))
+
+        with pytest.raises(InvalidArgumentError):
+            await client.chat.export_messages("chat", str(tmp_path / "chat.csv"), "csv")
+
+        with pytest.raises(InvalidArgumentError):
+            await client.chat.export_chats(["chat"], str(tmp_path), "csv")
+
+    asyncio.run(main())
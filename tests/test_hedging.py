@@ -0,0 +1,142 @@
+import asyncio
+
+from fakes import FakeResponse, make_requester
+from PyCharacterAI.hedging import HedgeStats, LatencyTracker, send_hedged
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(percentile=0.9, min_samples=10)
+
+    for latency in range(9):
+        tracker.add("host", latency / 10)
+
+    # Not enough samples yet
+    assert tracker.get("host") is None
+    assert tracker.get_delay("host", default=1.0, min_delay=0.05, max_delay=5.0) == 1.0
+
+    tracker.add("host", 5.0)
+
+    assert tracker.get("host") == 5.0
+    assert tracker.get_delay("host", default=1.0, min_delay=0.05, max_delay=2.0) == 2.0
+    assert tracker.get("other") is None
+
+
+def test_fast_request_is_not_hedged():
+    async def main():
+        stats = HedgeStats()
+        calls = []
+
+        async def send():
+            calls.append(1)
+            return "first"
+
+        return await send_hedged(send, 0.1, stats), calls, stats.get_dict()
+
+    result, calls, stats = asyncio.run(main())
+
+    assert result == "first"
+    assert len(calls) == 1
+    assert stats == {"requests": 1, "hedged": 0, "hedge_won": 0}
+
+
+def test_slow_request_is_hedged_and_loser_cancelled():
+    async def main():
+        stats = HedgeStats()
+        cancelled = []
+
+        async def send():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return "first"
+
+        async def send_hedge():
+            return "hedge"
+
+        result = await send_hedged(send, 0.01, stats, send_hedge)
+        await asyncio.sleep(0)
+
+        return result, cancelled, stats.get_dict()
+
+    result, cancelled, stats = asyncio.run(main())
+
+    assert result == "hedge"
+    assert cancelled == [1]
+    assert stats == {"requests": 1, "hedged": 1, "hedge_won": 1}
+
+
+def test_failed_hedge_waits_for_the_first_request():
+    async def main():
+        async def send():
+            await asyncio.sleep(0.05)
+            return "first"
+
+        async def send_hedge():
+            raise RuntimeError
+
+        return await send_hedged(send, 0.01, None, send_hedge)
+
+    assert asyncio.run(main()) == "first"
+
+
+def delayed_handler(delays):
+    async def handler(method, url, kwargs):
+        await asyncio.sleep(delays.pop(0))
+        return FakeResponse(200)
+
+    return handler
+
+
+def test_hedge_takes_a_rate_limit_token():
+    async def main():
+        requester, session = make_requester(
+            handler=delayed_handler([0.5, 0.0]), hedging=True, hedge_delay=0.05, rate_limit=1.0, rate_limit_burst=2
+        )
+
+        response = await requester.request_async("https://host/a")
+        return response, session, requester.get_rate_limit_stats(), requester.get_hedge_stats()
+
+    response, session, limits, hedges = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert len(session.requests) == 2
+    assert limits["host"]["requests"] == 2
+    assert hedges == {"requests": 1, "hedged": 1, "hedge_won": 1}
+
+
+def test_hedge_waits_for_rate_limit():
+    async def main():
+        requester, session = make_requester(
+            handler=delayed_handler([0.2, 0.0]), hedging=True, hedge_delay=0.05, rate_limit=1.0, rate_limit_burst=1
+        )
+
+        # No token is left for the hedge, so the first request answers before it is sent
+        response = await requester.request_async("https://host/a")
+        return response, session, requester.get_hedge_stats()
+
+    response, session, hedges = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert len(session.requests) == 1
+    assert hedges == {"requests": 1, "hedged": 1, "hedge_won": 0}
+
+
+def test_only_first_request_latency_is_recorded():
+    async def main():
+        requester, session = make_requester(
+            handler=delayed_handler([0.0, 0.3, 0.0, 0.1, 0.5]), hedging=True, hedge_delay=0.05
+        )
+
+        # The first request wins / the hedge wins / the first request wins after the hedge was sent
+        for path in ("a", "b", "c"):
+            await requester.request_async(f"https://host/{path}")
+
+        return requester._Requester__hedge_latencies._LatencyTracker__samples["host"]
+
+    samples = sorted(asyncio.run(main()))
+
+    assert len(samples) == 2
+    assert samples[0] < 0.05
+    assert 0.1 <= samples[1] < 0.2
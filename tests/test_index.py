@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from fakes import make_client, paged_handler, raw_turn
+from PyCharacterAI.index import TurnIndex
+
+
+def page(*turn_ids):
+    return [raw_turn(turn_id) for turn_id in turn_ids]
+
+
+def test_lookup_after_pagination():
+    index = TurnIndex()
+    index.record("chat", None, page("a", "b"), "page-1")
+    index.record("chat", "page-1", page("c", "d"), "page-2")
+    index.record("chat", "page-2", page("e"), None)
+
+    assert index.lookup("chat", "a") == ([None], 0)
+    assert index.lookup("chat", "d") == ([None, "page-1"], 1)
+    assert index.lookup("chat", "e") == ([None, "page-1", "page-2"], 0)
+    assert index.lookup("chat", "x") is None
+    assert index.lookup("other", "a") is None
+
+
+def test_indexing_starts_from_the_newest_page():
+    index = TurnIndex()
+
+    index.record("chat", "page-1", page("c"), "page-2")
+    assert index.lookup("chat", "c") is None
+    assert len(index) == 0
+
+    # A page that doesn't follow the indexed ones
+    index.record("chat", None, page("a"), "page-1")
+    index.record("chat", "page-5", page("z"), None)
+    assert index.lookup("chat", "z") is None
+
+
+def test_changed_chat_is_indexed_again():
+    index = TurnIndex()
+    index.record("chat", None, page("a", "b"), "page-1")
+    index.record("chat", "page-1", page("c"), None)
+
+    # A new turn has moved everything: the first page now leads somewhere else
+    index.record("chat", None, page("new", "a"), "page-1b")
+
+    assert index.lookup("chat", "c") is None
+    assert index.lookup("chat", "a") == ([None], 1)
+
+
+def test_generation_guard_and_invalidation():
+    index = TurnIndex()
+
+    generation = index.generation
+    index.invalidate("chat")
+    index.record("chat", None, page("a"), None, generation)
+    assert index.lookup("chat", "a") is None
+
+    index.record("chat", None, page("a"), None, index.generation)
+    assert index.lookup("chat", "a") is not None
+
+    index.invalidate("chat")
+    assert index.lookup("chat", "a") is None
+
+
+def test_least_recently_used_chat_is_dropped():
+    index = TurnIndex(max_chats=2)
+
+    for chat_id in ("first", "second"):
+        index.record(chat_id, None, page("a"), None)
+
+    index.lookup("first", "a")
+    index.record("third", None, page("a"), None)
+
+    assert len(index) == 2
+    assert index.lookup("second", "a") is None
+    assert index.lookup("first", "a") is not None
+
+
+PAGES = [page("a", "b"), page("c", "d"), page("e", "f")]
+
+
+def test_following_messages_pages_are_requested_at_once():
+    async def main():
+        client, session = make_client(handler=paged_handler(PAGES, delay=0.05))
+
+        # Fills the index
+        await client.chat.fetch_all_messages("chat")
+        requests = len(session.requests)
+
+        started = time.monotonic()
+        turns = await client.chat.fetch_following_messages("chat", "f")
+
+        return [turn.turn_id for turn in turns], time.monotonic() - started, len(session.requests) - requests
+
+    turn_ids, elapsed, requests = asyncio.run(main())
+
+    assert turn_ids == ["a", "b", "c", "d", "e"]
+    assert requests == 3
+    assert elapsed < 0.1
+
+
+def test_following_messages_fall_back_to_a_scan_when_chat_changed():
+    pages = [list(turns) for turns in PAGES]
+
+    async def main():
+        client, session = make_client(handler=paged_handler(pages))
+        await client.chat.fetch_all_messages("chat")
+
+        # Turns have moved between the pages
+        pages[0].insert(0, raw_turn("new"))
+        pages[1].insert(0, pages[0].pop())
+
+        return [turn.turn_id for turn in await client.chat.fetch_following_messages("chat", "d")]
+
+    assert asyncio.run(main()) == ["new", "a", "b", "c"]
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from contextlib import aclosing
+
+from fakes import make_client, paged_handler, raw_turn
+
+
+def pages(count: int, size: int = 2):
+    return [[raw_turn(f"turn-{page}-{index}") for index in range(size)] for page in range(count)]
+
+
+def test_all_pages_are_read():
+    async def main():
+        client, session = make_client(handler=paged_handler(pages(3)))
+        return [turn.turn_id async for turn in client.chat.iter_messages("chat")], session
+
+    turn_ids, session = asyncio.run(main())
+
+    assert turn_ids == ["turn-0-0", "turn-0-1", "turn-1-0", "turn-1-1", "turn-2-0", "turn-2-1"]
+    assert len(session.requests) == 3
+
+
+def test_next_page_is_requested_ahead():
+    async def main(prefetch: bool):
+        client, session = make_client(handler=paged_handler(pages(3), delay=0.01))
+        requested = []
+
+        async with aclosing(client.chat.iter_messages("chat", prefetch=prefetch)) as turns:
+            async for _ in turns:
+                # While the caller is busy with a turn
+                await asyncio.sleep(0.02)
+                requested.append(len(session.requests))
+
+        return requested
+
+    assert asyncio.run(main(prefetch=True)) == [2, 2, 3, 3, 3, 3]
+    assert asyncio.run(main(prefetch=False)) == [1, 1, 2, 2, 3, 3]
+
+
+def test_early_exit_stops_reading_ahead():
+    async def main():
+        client, session = make_client(handler=paged_handler(pages(3), delay=0.05))
+
+        async with aclosing(client.chat.iter_messages("chat")) as turns:
+            async for turn in turns:
+                started = time.monotonic()
+                break
+
+        # The page that was requested ahead is not waited for
+        elapsed = time.monotonic() - started
+
+        await asyncio.sleep(0.15)
+        return turn.turn_id, elapsed, session
+
+    turn_id, elapsed, session = asyncio.run(main())
+
+    assert turn_id == "turn-0-0"
+    assert elapsed < 0.05
+    # Only the first page and the one that was requested ahead
+    assert len(session.requests) == 2
+
+
+def test_starts_from_next_token_and_filters_pinned():
+    raw_pages = pages(3)
+    raw_pages[2][1]["is_pinned"] = True
+
+    async def main():
+        client, session = make_client(handler=paged_handler(raw_pages))
+        turns = [turn async for turn in client.chat.iter_messages("chat", pinned_only=True, next_token="page-1")]
+
+        return [turn.turn_id for turn in turns], session
+
+    turn_ids, session = asyncio.run(main())
+
+    assert turn_ids == ["turn-2-1"]
+    assert len(session.requests) == 2
+
+
+def test_empty_page_ends_iteration():
+    async def main():
+        client, session = make_client(handler=paged_handler([[]]))
+        return [turn async for turn in client.chat.iter_messages("chat")], session
+
+    turns, session = asyncio.run(main())
+
+    assert turns == []
+    assert len(session.requests) == 1
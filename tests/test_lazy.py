@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fakes import turn_frame
+from PyCharacterAI.types import Chat, Turn
+from PyCharacterAI.types.base import BaseCAI, parse_time
+
+
+@pytest.fixture
+def lazy(monkeypatch):
+    monkeypatch.setattr(BaseCAI, "LAZY", True)
+
+
+def raw_turn() -> dict:
+    raw = turn_frame(None, "")["turn"]
+    raw["create_time"] = "2024-05-01T12:00:00.123Z"
+    raw["candidates"] = [
+        {"candidate_id": "a", "raw_content": "first"},
+        {"candidate_id": "b", "raw_content": "second", "create_time": "2024-05-01T12:00:01Z"},
+    ]
+    raw["primary_candidate_id"] = "b"
+
+    return raw
+
+
+def test_parse_time():
+    expected = datetime(2024, 5, 1, 12, 0, 0, 123450, tzinfo=timezone.utc)
+
+    assert parse_time("2024-05-01T12:00:00.12345Z") == expected
+    assert parse_time("2024-05-01T12:00:00.123450+00:00") == expected
+    assert parse_time("2024-05-01T12:00:00.1234567Z") == datetime(2024, 5, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+    assert parse_time("2024-05-01T15:00:00+03:00") == datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+    assert parse_time("2024-05-01T15:00:00+03:00").utcoffset() == timedelta(hours=3)
+
+    # Naive timestamps are in UTC
+    assert parse_time("2024-05-01 12:00:00").tzinfo is timezone.utc
+
+
+def test_parse_time_keeps_what_it_cannot_parse():
+    assert parse_time("yesterday") == "yesterday"
+    assert parse_time("") == ""
+    assert parse_time(None) is None
+    assert parse_time(1714564800) == 1714564800
+
+
+def test_parse_time_is_memoized():
+    assert parse_time("2024-05-01T12:00:00Z") is parse_time("2024-05-01T12:00:00Z")
+
+
+def test_eager_turn():
+    turn = Turn(raw_turn())
+
+    assert isinstance(turn._Turn__candidates, dict)
+    assert isinstance(turn._Turn__create_time, datetime)
+    assert turn.get_primary_candidate() is turn.candidates["b"]
+
+
+def test_lazy_turn_parses_on_first_access(lazy):
+    turn = Turn(raw_turn())
+
+    assert isinstance(turn._Turn__candidates, list)
+    assert turn._Turn__create_time == "2024-05-01T12:00:00.123Z"
+
+    assert turn.create_time == datetime(2024, 5, 1, 12, 0, 0, 123000, tzinfo=timezone.utc)
+    assert turn.create_time is turn.create_time
+
+
+def test_lazy_turn_parses_only_primary_candidate(lazy):
+    turn = Turn(raw_turn())
+
+    primary = turn.get_primary_candidate()
+
+    assert primary.text == "second"
+    assert isinstance(turn._Turn__candidates, list)
+    assert primary._TurnCandidate__create_time == "2024-05-01T12:00:01Z"
+    assert primary.create_time == datetime(2024, 5, 1, 12, 0, 1, tzinfo=timezone.utc)
+
+    # The primary candidate is reused when the others are parsed
+    assert list(turn.candidates) == ["a", "b"]
+    assert turn.candidates["b"] is primary
+    assert turn.get_primary_candidate() is primary
+
+
+def test_lazy_and_eager_get_dict_match(monkeypatch):
+    eager = Turn(raw_turn()).get_dict()
+
+    monkeypatch.setattr(BaseCAI, "LAZY", True)
+    lazy = Turn(raw_turn()).get_dict()
+
+    assert lazy.keys() == eager.keys()
+    assert "create_time" in lazy and "candidates" in lazy
+    assert lazy["create_time"] == eager["create_time"]
+    assert lazy["candidates"].keys() == eager["candidates"].keys()
+
+
+def test_lazy_chat(lazy):
+    chat = Chat(
+        {
+            "chat_id": "chat",
+            "create_time": "2024-05-01T12:00:00Z",
+            "preview_turns": [raw_turn()],
+            "character_avatar_uri": "avatar.png",
+        }
+    )
+
+    assert isinstance(chat._Chat__preview_turns[0], dict)
+    assert chat.preview_turns[0].get_primary_candidate().text == "second"
+    assert chat.create_time == datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+    assert chat.character_avatar.get_file_name() == "avatar.png"
+    assert Chat({"chat_id": "chat"}).character_avatar is None
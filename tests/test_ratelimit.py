@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import pytest
+
+from fakes import FakeResponse, make_requester
+from PyCharacterAI.exceptions import DeadlineExceededError
+from PyCharacterAI.ratelimit import RateLimiter, TokenBucket, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=10.0, burst=3, min_rate=1.0)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+    # Waiting requests keep their order
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_without_rate_only_respects_pauses():
+    bucket = TokenBucket(rate=None, burst=1, min_rate=1.0)
+
+    assert all(bucket.reserve() == 0.0 for _ in range(100))
+
+    bucket.throttle(0.5)
+    assert bucket.reserve() == pytest.approx(0.5, abs=0.01)
+
+
+def test_aimd_decrease_and_recover():
+    bucket = TokenBucket(rate=8.0, burst=1, min_rate=1.0)
+
+    bucket.throttle(0.0)
+    assert bucket.rate == 4.0
+    bucket.throttle(0.0)
+    bucket.throttle(0.0)
+    bucket.throttle(0.0)
+    assert bucket.rate == 1.0
+    assert bucket.failures == 4
+
+    bucket.recover()
+    assert bucket.failures == 0
+    assert bucket.rate == 1.4
+
+    for _ in range(100):
+        bucket.recover()
+    assert bucket.rate == 8.0
+
+
+def test_throttle_without_retry_after_backs_off():
+    bucket = TokenBucket(rate=None, burst=1, min_rate=1.0)
+
+    delay = bucket.throttle(None)
+
+    assert 0.0 <= delay <= 1.0
+    assert bucket.paused_until <= time.monotonic() + delay
+
+
+def test_limiter_separates_hosts_and_tokens():
+    async def main():
+        limiter = RateLimiter(rate=1.0, burst=1)
+
+        limiter.feedback("a", "", 429, "5")
+
+        # Neither another host nor another token has to wait
+        return await limiter.acquire("b"), await limiter.acquire("a", "other")
+
+    assert all(waited < 0.01 for waited in asyncio.run(main()))
+
+
+def test_limiter_acquire_respects_deadline():
+    async def main():
+        limiter = RateLimiter(rate=1.0, burst=1)
+        await limiter.acquire("a")
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            await limiter.acquire("a", timeout=0.1)
+        elapsed = time.monotonic() - started
+
+        # The token has been given back, so the next request is not delayed any longer than before
+        return elapsed, limiter._RateLimiter__get_bucket("a", "").reserve()
+
+    elapsed, wait = asyncio.run(main())
+
+    assert elapsed < 0.05
+    assert wait < 1.0
+
+
+def test_429_is_repeated_after_retry_after():
+    statuses = [429, 200]
+
+    def handler(method, url, kwargs):
+        return FakeResponse(statuses.pop(0), {}, {"Retry-After": "0.1"})
+
+    async def main():
+        requester, session = make_requester(handler=handler)
+
+        started = time.monotonic()
+        response = await requester.request_async("https://host/a", {"method": "POST"})
+
+        return response, time.monotonic() - started, session, requester.get_rate_limit_stats()
+
+    response, elapsed, session, stats = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert len(session.requests) == 2
+    assert elapsed >= 0.1
+    assert stats["host"]["throttled"] == 1
+    assert stats["host"]["delayed"] == 1
+
+
+def test_429_retries_are_limited():
+    def handler(method, url, kwargs):
+        return FakeResponse(429, {}, {"Retry-After": "0"})
+
+    async def main():
+        requester, session = make_requester(handler=handler, rate_limit_retries=2)
+        return await requester.request_async("https://host/a"), session
+
+    response, session = asyncio.run(main())
+
+    assert response.status_code == 429
+    assert len(session.requests) == 3
+
+
+def test_throttled_host_does_not_slow_down_others():
+    def handler(method, url, kwargs):
+        if "slow" in url:
+            return FakeResponse(429, {}, {"Retry-After": "2"})
+        return FakeResponse(200)
+
+    async def main():
+        requester, session = make_requester(handler=handler, rate_limit_retries=0)
+        await requester.request_async("https://slow/a")
+
+        started = time.monotonic()
+        response = await requester.request_async("https://fast/a")
+        return response, time.monotonic() - started
+
+    response, elapsed = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert elapsed < 0.1
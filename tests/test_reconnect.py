@@ -0,0 +1,94 @@
+import asyncio
+
+import curl_cffi
+
+from fakes import collect, make_requester, turn_frame
+
+
+def texts(frames):
+    return [frame["turn"]["candidates"][0]["raw_content"] for frame in frames]
+
+
+def test_truncated_final_frame_is_delivered():
+    # The final text can be shorter than the streamed one (e.g. when the end was filtered)
+    def responder(message):
+        request_id = message["request_id"]
+        return [turn_frame(request_id, "Hello bad words"), turn_frame(request_id, "Hello", is_final=True)]
+
+    async def main():
+        requester, _ = make_requester(responder)
+        message = {"command": "create_and_generate_turn", "request_id": "r"}
+
+        return await asyncio.wait_for(collect(requester.ws_send_and_receive_async(message, "token")), 1)
+
+    assert texts(asyncio.run(main())) == ["Hello bad words", "Hello"]
+
+
+def test_rewritten_frames_are_delivered():
+    def responder(message):
+        request_id = message["request_id"]
+        return [
+            turn_frame(request_id, "Hello"),
+            turn_frame(request_id, "Hel"),
+            turn_frame(request_id, "Help"),
+            turn_frame(request_id, "Help!", is_final=True),
+        ]
+
+    async def main():
+        requester, _ = make_requester(responder)
+        message = {"command": "create_and_generate_turn", "request_id": "r"}
+
+        return await collect(requester.ws_send_and_receive_async(message, "token"))
+
+    assert texts(asyncio.run(main())) == ["Hello", "Hel", "Help", "Help!"]
+
+
+def test_idempotent_command_is_resent_without_repeating_frames():
+    sent = []
+
+    def responder(message):
+        sent.append(message)
+        request_id = message["request_id"]
+
+        if len(sent) == 1:
+            return [
+                turn_frame(request_id, "A"),
+                turn_frame(request_id, "AB"),
+                curl_cffi.WebSocketError("connection lost"),
+            ]
+
+        return [turn_frame(request_id, "A"), turn_frame(request_id, "AB"), turn_frame(request_id, "ABC", is_final=True)]
+
+    async def main():
+        requester, session = make_requester(responder)
+        message = {"command": "set_turn_pin", "request_id": "r"}
+
+        return await collect(requester.ws_send_and_receive_async(message, "token")), session
+
+    frames, session = asyncio.run(main())
+
+    assert texts(frames) == ["A", "AB", "ABC"]
+    assert len(session.sockets) == 2
+
+
+def test_generation_is_resumed_instead_of_resent():
+    def responder(message):
+        return [turn_frame(message["request_id"], "Hi"), curl_cffi.WebSocketError("connection lost")]
+
+    async def resume(last_frame):
+        assert texts([last_frame]) == ["Hi"]
+
+        # Polling the chat history returns the same turn until it changes
+        for text, is_final in [("Hi", False), ("Hi", False), ("Hi there", False), ("Hi there!", True)]:
+            yield turn_frame(None, text, is_final=is_final)
+
+    async def main():
+        requester, session = make_requester(responder)
+        message = {"command": "create_and_generate_turn", "request_id": "r"}
+
+        return await collect(requester.ws_send_and_receive_async(message, "token", resume=resume)), session
+
+    frames, session = asyncio.run(main())
+
+    assert texts(frames) == ["Hi", "Hi there", "Hi there!"]
+    assert sum(len(ws.sent) for ws in session.sockets) == 1
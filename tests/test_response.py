@@ -0,0 +1,46 @@
+import pickle
+
+import pytest
+
+from PyCharacterAI import jsonlib
+from PyCharacterAI.requester import Requester
+
+
+def make_response(content: bytes, encoding=None) -> Requester.Response:
+    return Requester.Response("https://host/a", 200, [("content-type", "application/json")], content, encoding)
+
+
+def test_json_is_parsed_once():
+    response = make_response(b'{"items": [1, 2]}')
+
+    first = response.json()
+    assert first == {"items": [1, 2]}
+    assert response.json() is first
+
+
+def test_text_is_decoded_with_the_encoding():
+    text = '{"name": "Привет"}'
+
+    assert make_response(text.encode("utf-8")).text == text
+    assert make_response(text.encode("cp1251"), encoding="cp1251").text == text
+
+    # Broken bytes don't fail the whole response
+    assert make_response(b"\xff{}").text == "�{}"
+
+
+def test_pickled_response_keeps_only_the_body():
+    response = make_response(b'{"a": 1}')
+    response.json()["a"] = 2
+
+    restored = pickle.loads(pickle.dumps(response))
+
+    assert restored.json() == {"a": 1}
+    assert (restored.url, restored.status_code, restored.headers) == (response.url, 200, response.headers)
+
+
+def test_jsonlib_parses_bytes_and_str():
+    assert jsonlib.loads(b'{"a": [1, "\xd0\xb6"]}') == {"a": [1, "ж"]}
+    assert jsonlib.loads('{"a": null}') == {"a": None}
+
+    with pytest.raises(jsonlib.DecodeError):
+        jsonlib.loads(b"{not json")
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from fakes import FakeResponse, make_client, paged_handler, raw_turn
+from PyCharacterAI.exceptions import FetchError
+from PyCharacterAI.store import TurnChange, TurnStore
+
+
+def turn(number: int, version: str = "v1"):
+    return raw_turn(
+        f"turn-{number}", f"text {number}", create_time=f"2024-05-01T12:00:{number:02d}Z", last_update_time=version
+    )
+
+
+# From the newest to the oldest, as the API returns them
+HISTORY = [[turn(5), turn(4)], [turn(3), turn(2)], [turn(1), turn(0)]]
+
+
+def run_sync(store, pages, **kwargs):
+    async def main():
+        client, session = make_client(handler=paged_handler(pages))
+        changes = await client.chat.sync_messages("chat", store, **kwargs)
+
+        return changes, session
+
+    return asyncio.run(main())
+
+
+def stored(store):
+    return [turn.turn_id for turn in asyncio.run(store.get_turns("chat"))]
+
+
+@pytest.fixture
+def store():
+    store = TurnStore()
+    yield store
+    store.close()
+
+
+def test_first_sync_downloads_everything(store):
+    changes, session = run_sync(store, HISTORY)
+
+    assert len(session.requests) == 3
+    assert [change.kind for change in changes] == [TurnChange.ADDED] * 6
+    assert stored(store) == ["turn-5", "turn-4", "turn-3", "turn-2", "turn-1", "turn-0"]
+
+    state = asyncio.run(store.get_state("chat"))
+    assert state.complete
+    assert state.backfill_token is None
+    assert state.synced_at is not None
+
+
+def test_first_sync_completes_on_empty_last_page(store):
+    run_sync(store, [*HISTORY, []])
+
+    state = asyncio.run(store.get_state("chat"))
+    assert state.complete
+    assert state.backfill_token is None
+
+
+def test_next_sync_stops_at_a_known_turn(store):
+    run_sync(store, HISTORY)
+
+    pages = [[turn(7), turn(6)], [turn(5, "v2"), turn(4)], *HISTORY[1:]]
+    changes, session = run_sync(store, pages)
+
+    assert len(session.requests) == 2
+    assert [(change.turn_id, change.kind) for change in changes] == [
+        ("turn-7", TurnChange.ADDED),
+        ("turn-6", TurnChange.ADDED),
+        ("turn-5", TurnChange.UPDATED),
+    ]
+    assert changes[2].turn.last_update_time == "v2"
+
+
+def test_interrupted_sync_resumes_from_backfill_token(store):
+    handler = paged_handler(HISTORY)
+    failing = {"value": True}
+
+    async def flaky(method, url, kwargs):
+        if failing["value"] and "page-2" in url:
+            return FakeResponse(500)
+
+        return await handler(method, url, kwargs)
+
+    async def main():
+        client, session = make_client(handler=flaky)
+
+        with pytest.raises(FetchError):
+            await client.chat.sync_messages("chat", store)
+
+        state = await store.get_state("chat")
+        failing["value"] = False
+
+        changes = await client.chat.sync_messages("chat", store)
+        return state, changes, session
+
+    state, changes, session = asyncio.run(main())
+
+    assert not state.complete
+    assert state.backfill_token == "page-2"
+
+    # The first page (nothing new there), then the rest from where the first sync stopped
+    assert [url for _, url in session.requests[-2:]] == [
+        "https://neo.character.ai/turns/chat/",
+        "https://neo.character.ai/turns/chat/?next_token=page-2",
+    ]
+    assert [change.turn_id for change in changes] == ["turn-1", "turn-0"]
+    assert asyncio.run(store.get_state("chat")).complete
+    assert len(stored(store)) == 6
+
+
+def test_full_sync_removes_missing_turns(store):
+    run_sync(store, HISTORY)
+
+    changes, _ = run_sync(store, [[turn(5), turn(4)], [turn(3), turn(1)], [turn(0)]], full=True)
+
+    assert [(change.turn_id, change.kind) for change in changes] == [("turn-2", TurnChange.REMOVED)]
+    assert changes[0].turn is None
+    assert "turn-2" not in stored(store)
+
+
+def test_change_feed(store):
+    first, _ = run_sync(store, HISTORY)
+    run_sync(store, [[turn(6), turn(5)], *HISTORY])
+
+    async def main():
+        return await store.get_changes("chat", since=first[-1].seq), await store.get_changes(limit=2)
+
+    since, limited = asyncio.run(main())
+
+    assert [change.turn_id for change in since] == ["turn-6"]
+    assert [change.turn_id for change in limited] == ["turn-5", "turn-4"]
+    assert since[0].turn.get_primary_candidate().text == "text 6"
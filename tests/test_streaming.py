@@ -0,0 +1,60 @@
+import asyncio
+
+from fakes import make_client, turn_frame
+
+
+def stream_responder(*texts: str):
+    # One frame per text, the last one is final
+    def responder(message):
+        request_id = message["request_id"]
+        return [turn_frame(request_id, text, is_final=index == len(texts) - 1) for index, text in enumerate(texts)]
+
+    return responder
+
+
+def send_deltas(responder, **kwargs):
+    async def main():
+        client, _ = make_client(responder)
+        deltas = await client.chat.send_message("character", "chat", "Hi", streaming=True, delta_only=True, **kwargs)
+
+        return [delta async for delta in deltas]
+
+    return asyncio.run(main())
+
+
+def test_deltas_add_up_to_the_final_text():
+    deltas = send_deltas(stream_responder("Hel", "Hello", "Hello wor", "Hello world"))
+
+    assert [delta.text for delta in deltas] == ["Hel", "lo", " wor", "ld"]
+    assert [delta.is_final for delta in deltas] == [False, False, False, True]
+    assert not any(delta.is_rewrite for delta in deltas)
+
+    assert deltas[-1].turn is not None
+    assert deltas[-1].turn.get_primary_candidate().text == "Hello world"
+
+
+def test_truncated_final_text_is_a_rewrite():
+    deltas = send_deltas(stream_responder("Hello", "Hello bad words", "Hello"))
+
+    assert [delta.text for delta in deltas] == ["Hello", " bad words", "Hello"]
+    assert deltas[-1].is_final and deltas[-1].is_rewrite
+
+
+def test_small_pieces_are_coalesced():
+    texts = ["H", "He", "Hel", "Hell", "Hello", "Hello ", "Hello w", "Hello wo", "Hello wor"]
+    deltas = send_deltas(stream_responder(*texts, "Hello world"), chunk_size=4)
+
+    # The rest of the buffer goes with the final piece
+    assert [delta.text for delta in deltas] == ["Hell", "o wo", "rld"]
+    assert deltas[-1].is_final
+
+
+def test_non_streaming_send_message_returns_the_final_turn():
+    async def main():
+        client, _ = make_client(stream_responder("Hello bad words", "Hello"))
+        return await asyncio.wait_for(client.chat.send_message("character", "chat", "Hi"), 1)
+
+    turn = asyncio.run(main())
+
+    assert turn.get_primary_candidate().text == "Hello"
+    assert turn.get_primary_candidate().is_final
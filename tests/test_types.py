@@ -0,0 +1,42 @@
+from fakes import turn_frame
+from PyCharacterAI.types import Turn
+
+
+def raw_turn(*candidates, primary: str = "a") -> dict:
+    raw = turn_frame(None, "")["turn"]
+    raw["candidates"] = [{"candidate_id": candidate_id, "raw_content": text} for candidate_id, text in candidates]
+    raw["primary_candidate_id"] = primary
+
+    return raw
+
+
+def test_incremental_deltas_handle_rewrites():
+    turn = Turn(raw_turn(("a", "Hello")))
+    output = turn.get_primary_candidate().delta
+
+    for text in ["Hello bad words", "Hello"]:
+        turn.apply_update(raw_turn(("a", text)))
+        candidate = turn.get_primary_candidate()
+
+        output = candidate.delta if candidate.is_rewrite else output + candidate.delta
+
+    assert output == "Hello"
+    assert turn.get_primary_candidate().is_rewrite
+
+
+def test_growing_text_is_not_a_rewrite():
+    turn = Turn(raw_turn(("a", "Hel")))
+    turn.apply_update(raw_turn(("a", "Hello")))
+
+    candidate = turn.get_primary_candidate()
+    assert (candidate.delta, candidate.is_rewrite) == ("lo", False)
+
+
+def test_untouched_candidates_are_reset():
+    turn = Turn(raw_turn(("a", "Hello"), ("b", "Bye")))
+    turn.apply_update(raw_turn(("a", "Hi"), ("b", "Bye")))
+    turn.apply_update(raw_turn(("b", "Bye!"), primary="b"))
+
+    candidate = turn.candidates["a"]
+    assert (candidate.delta, candidate.is_rewrite) == ("", False)
+    assert turn.candidates["b"].delta == "!"
@@ -0,0 +1,75 @@
+import asyncio
+
+from fakes import collect, make_requester, turn_frame
+
+
+async def wait_sent(session, amount: int) -> None:
+    while not session.sockets or len(session.sockets[0].sent) < amount:
+        await asyncio.sleep(0)
+
+
+def test_concurrent_requests_get_their_own_frames():
+    async def main():
+        requester, session = make_requester()
+
+        first = asyncio.create_task(
+            collect(requester.ws_send_and_receive_async({"command": "test", "request_id": "a"}, "token"))
+        )
+        second = asyncio.create_task(
+            collect(requester.ws_send_and_receive_async({"command": "test", "request_id": "b"}, "token"))
+        )
+        await wait_sent(session, 2)
+
+        ws = session.sockets[0]
+        ws.push(turn_frame("b", "B", turn_id="b"))
+        ws.push(turn_frame("a", "A", turn_id="a"))
+        ws.push(turn_frame("b", "B!", is_final=True, turn_id="b"))
+        ws.push(turn_frame("a", "A!", is_final=True, turn_id="a"))
+
+        return await first, await second
+
+    first, second = asyncio.run(main())
+
+    assert [frame["turn"]["candidates"][0]["raw_content"] for frame in first] == ["A", "A!"]
+    assert [frame["turn"]["candidates"][0]["raw_content"] for frame in second] == ["B", "B!"]
+
+
+def test_single_connection_is_shared():
+    async def main():
+        requester, session = make_requester(lambda message: [turn_frame(message["request_id"], "Hi", is_final=True)])
+
+        await asyncio.gather(
+            *[
+                collect(requester.ws_send_and_receive_async({"command": "test", "request_id": str(index)}, "token"))
+                for index in range(10)
+            ]
+        )
+
+        return session
+
+    session = asyncio.run(main())
+
+    assert len(session.sockets) == 1
+    assert len(session.sockets[0].sent) == 10
+
+
+def test_frame_with_unknown_request_id_is_not_given_to_anonymous_request():
+    async def main():
+        requester, session = make_requester()
+
+        anonymous = asyncio.create_task(
+            collect(requester.ws_send_and_receive_async({"command": "test"}, "token"), until_final=False)
+        )
+        await wait_sent(session, 1)
+
+        ws = session.sockets[0]
+        ws.push(turn_frame("somebody-else", "not yours", is_final=True))
+        ws.push({"command": "ok"})
+
+        frames = await anonymous
+        return frames, requester.get_ws_buffer_stats()
+
+    frames, stats = asyncio.run(main())
+
+    assert frames == [{"command": "ok"}]
+    assert stats["orphans"] == 1